@@ -23,15 +23,91 @@ ALLOWED_VARIANT_IDS = {"A", "B", "LOSS_BANNER_A", "LOSS_BANNER_B", "SOCIAL_PROOF
 ALLOWED_NOTIFY_TYPES = {"EXPIRY_D2", "EXPIRY_D0", "ATTENDANCE_D2", "TICKET_ZERO", "SOCIAL_PROOF"}
 
 # Admin job types allowed
-ALLOWED_ADMIN_JOB_TYPES = {"EXTEND_EXPIRY", "BULK_UPDATE", "NOTIFY", "DAILY_IMPORT"}
+ALLOWED_ADMIN_JOB_TYPES = {"EXTEND_EXPIRY", "BULK_UPDATE", "NOTIFY", "DAILY_IMPORT", "EXPIRY_SWEEP"}
 
 # Idempotency TTL (hours)
 IDEMPOTENCY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+# IN_PROGRESS keys committed early (batched extend-expiry, streamed CSV import) are touched per batch;
+# one idle this long belongs to a crashed request and a retry with the same body takes it over.
+IDEMPOTENCY_LEASE_SECONDS = int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "120"))
 
 # Compensation retry policy
 COMPENSATION_MAX_RETRIES = int(os.getenv("COMPENSATION_MAX_RETRIES", "5"))
 COMPENSATION_BACKOFF_SECONDS = [1, 5, 30, 300, 900]
+# Rows claimed per worker pass, concurrent external calls per batch, per-call timeout.
+COMPENSATION_BATCH_SIZE = int(os.getenv("COMPENSATION_BATCH_SIZE", "200"))
+COMPENSATION_CONCURRENCY = int(os.getenv("COMPENSATION_CONCURRENCY", "20"))
+COMPENSATION_CALL_TIMEOUT_MS = int(os.getenv("COMPENSATION_CALL_TIMEOUT_MS", "10000"))
+
+# Notification delivery worker (docs/BATCH_NOTIFICATION_VAULT_V2.md: backoff 1s/5s/30s, max 5 then DLQ)
+# Channel: "stdout" or "file:<path>" (JSON lines) until a real provider is wired in.
+NOTIFY_CHANNEL = os.getenv("NOTIFY_CHANNEL", "stdout")
+NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", "500"))
+NOTIFY_CONCURRENCY = int(os.getenv("NOTIFY_CONCURRENCY", "50"))
+NOTIFY_SEND_TIMEOUT_MS = int(os.getenv("NOTIFY_SEND_TIMEOUT_MS", "5000"))
+NOTIFY_MAX_RETRIES = int(os.getenv("NOTIFY_MAX_RETRIES", "5"))
+NOTIFY_BACKOFF_SECONDS = [1, 5, 30]
+# Scheduled campaigns (app/services/campaign_service.py): local send times, audiences, shadow = count only.
+CAMPAIGN_SCHEDULE = os.getenv("CAMPAIGN_SCHEDULE", "09:00,18:00")
+# KST (+9, no DST) by default; also the day basis of every notification dedup_key.
+CAMPAIGN_UTC_OFFSET_HOURS = int(os.getenv("CAMPAIGN_UTC_OFFSET_HOURS", "9"))
+CAMPAIGN_TYPES = [t.strip() for t in os.getenv("CAMPAIGN_TYPES", "EXPIRY_D2,EXPIRY_D0,ATTENDANCE_D2").split(",") if t.strip()]
+CAMPAIGN_SHADOW = os.getenv("CAMPAIGN_SHADOW", "false").lower() in {"1", "true", "yes"}
+# notification_templates cache TTL; changes are pushed via LISTEN/NOTIFY, so this only bounds staleness if the listener is down.
+NOTIFY_TEMPLATE_CACHE_TTL_SECONDS = int(os.getenv("NOTIFY_TEMPLATE_CACHE_TTL_SECONDS", "300"))
+# POST /api/vault/status/batch: max user_ids + external_user_ids per request.
+STATUS_BATCH_MAX_USERS = int(os.getenv("STATUS_BATCH_MAX_USERS", "5000"))
+# In-memory external_user_id -> user_id LRU shared by all identity resolvers (app/services/user_identity_service.py).
+IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", "100000"))
+# Unknown external_user_ids are remembered this long (0 disables); creations elsewhere clear them via LISTEN/NOTIFY.
+IDENTITY_CACHE_NEGATIVE_TTL_SECONDS = int(os.getenv("IDENTITY_CACHE_NEGATIVE_TTL_SECONDS", "30"))
+# /status/stream (SSE): comment line every N seconds keeps proxies from closing idle streams.
+STATUS_STREAM_HEARTBEAT_SECONDS = int(os.getenv("STATUS_STREAM_HEARTBEAT_SECONDS", "15"))
+# Client reconnect delay advertised via the SSE `retry:` field.
+STATUS_STREAM_RETRY_MS = int(os.getenv("STATUS_STREAM_RETRY_MS", "3000"))
+# Streams are closed after this long (client reconnects with Last-Event-ID) to rebalance connections.
+STATUS_STREAM_MAX_SECONDS = int(os.getenv("STATUS_STREAM_MAX_SECONDS", "600"))
+# Reloads after a broadcast ('*') notify are spread over this window; at most N stream reloads hold a pool connection at once.
+STATUS_STREAM_BROADCAST_JITTER_MS = int(os.getenv("STATUS_STREAM_BROADCAST_JITTER_MS", "2000"))
+STATUS_STREAM_RELOAD_CONCURRENCY = int(os.getenv("STATUS_STREAM_RELOAD_CONCURRENCY", "4"))
+# Rows per FETCH from the server-side cursor behind streaming CSV exports.
+EXPORT_FETCH_BATCH_SIZE = int(os.getenv("EXPORT_FETCH_BATCH_SIZE", "2000"))
+
+# Worker idle loop: woken by LISTEN/NOTIFY; otherwise polls with backoff from WORKER_IDLE_MIN_MS up to WORKER_POLL_MAX_SECONDS.
+WORKER_IDLE_MIN_MS = int(os.getenv("WORKER_IDLE_MIN_MS", "500"))
+WORKER_POLL_MAX_SECONDS = int(os.getenv("WORKER_POLL_MAX_SECONDS", "30"))
+
+# Expiry sweep (worker): overdue LOCKED/UNLOCKED tiers -> EXPIRED, in short batches; shadow = report only.
+EXPIRY_SWEEP_INTERVAL_SECONDS = int(os.getenv("EXPIRY_SWEEP_INTERVAL_SECONDS", "600"))
+EXPIRY_SWEEP_BATCH_SIZE = int(os.getenv("EXPIRY_SWEEP_BATCH_SIZE", "2000"))
+EXPIRY_SWEEP_SHADOW = os.getenv("EXPIRY_SWEEP_SHADOW", "false").lower() in {"1", "true", "yes"}
 
 # Job / admin query timeouts (ms)
 JOB_LOCK_TIMEOUT_MS = int(os.getenv("JOB_LOCK_TIMEOUT_MS", "2000"))
 JOB_STATEMENT_TIMEOUT_MS = int(os.getenv("JOB_STATEMENT_TIMEOUT_MS", "20000"))
+# Users per set-based statement in admin bulk operations (bounds lock hold time per statement).
+ADMIN_BULK_BATCH_SIZE = int(os.getenv("ADMIN_BULK_BATCH_SIZE", "5000"))
+# Admin list totals with count=estimate: planner estimate at/above the threshold,
+# otherwise an exact COUNT(*) cached per filter set for the TTL.
+ADMIN_COUNT_ESTIMATE_THRESHOLD = int(os.getenv("ADMIN_COUNT_ESTIMATE_THRESHOLD", "10000"))
+ADMIN_COUNT_CACHE_TTL_SECONDS = int(os.getenv("ADMIN_COUNT_CACHE_TTL_SECONDS", "15"))
+
+# DB connection pool
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+# Bounded wait for a free connection before failing with 503 DB_POOL_TIMEOUT.
+DB_POOL_ACQUIRE_TIMEOUT_MS = int(os.getenv("DB_POOL_ACQUIRE_TIMEOUT_MS", "5000"))
+# Connections older than this are closed on return and replaced on demand.
+DB_POOL_MAX_LIFETIME_SECONDS = int(os.getenv("DB_POOL_MAX_LIFETIME_SECONDS", "1800"))
+# Idle connections above DB_POOL_MIN_SIZE are closed after this long.
+DB_POOL_MAX_IDLE_SECONDS = int(os.getenv("DB_POOL_MAX_IDLE_SECONDS", "300"))
+
+# Daily/admin imports: rows are COPY'd into a staging table and applied set-based per chunk.
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "500000"))
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "50000"))
+# Row errors listed in a CSV import response; the rest are only counted (error_count).
+IMPORT_MAX_REPORTED_ERRORS = int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", "1000"))
+# Chunks of one synchronous admin import applied concurrently (one pooled connection each); 1 = sequential.
+IMPORT_PARALLELISM = int(os.getenv("IMPORT_PARALLELISM", "1"))
+# Process-wide cap on chunks applied at once across all concurrent imports (keeps pool slots for the API).
+IMPORT_MAX_CONCURRENT_CHUNKS = int(os.getenv("IMPORT_MAX_CONCURRENT_CHUNKS", str(max(1, DB_POOL_MAX_SIZE // 2))))
@@ -1,40 +1,487 @@
+import asyncio
+import bisect
 import contextlib
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import psycopg2
 from psycopg2 import pool
 from app import config
 
-_connection_pool: pool.SimpleConnectionPool | None = None
+# Upper bounds (ms) of the acquire-latency histogram buckets; anything slower lands in "+Inf".
+ACQUIRE_LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Marker returned by _try_checkout_locked(): a slot is reserved, caller must open a connection.
+_OPEN = object()
+
+
+class PoolTimeout(pool.PoolError):
+    """No connection became free within the acquire timeout."""
+
+
+class ConnectionPool:
+    """Thread-safe psycopg2 pool with a bounded acquire wait, lifetime/idle limits and counters.
+
+    Unlike psycopg2's built-in pools, an exhausted pool queues callers for up to
+    `acquire_timeout` seconds before raising `PoolTimeout`. `acquire_async()` callers wait
+    in FIFO order and a returned connection is handed straight to the oldest of them, so
+    under contention no request keeps losing the race to newer ones.
+    """
+
+    def __init__(self, dsn, *, min_size, max_size, acquire_timeout, max_lifetime, max_idle):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("invalid pool size")
+        self._dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (conn, idle_since); oldest on the left
+        self._created = {}  # conn -> opened_at
+        self._checked_out = {}  # conn -> checked_out_at
+        self._opening = 0
+        self._waiters = 0
+        self._async_waiters = deque()  # (loop, future) of acquire_async() callers, oldest first
+        self._closed = False
+
+        self._acquire_buckets = [0] * (len(ACQUIRE_LATENCY_BUCKETS_MS) + 1)
+        self._acquire_count = 0
+        self._acquire_total_ms = 0.0
+        self._acquire_timeouts = 0
+        self._checkout_count = 0
+        self._checkout_total_ms = 0.0
+        self._checkout_max_ms = 0.0
+        self._opened_total = 0
+        self._closed_total = 0
+
+        now = time.monotonic()
+        for _ in range(min_size):
+            conn = psycopg2.connect(dsn)
+            self._created[conn] = now
+            self._opened_total += 1
+            self._idle.append((conn, now))
+
+    # -- internals (call with self._cond held) -------------------------------
+
+    def _size_locked(self):
+        return len(self._idle) + len(self._checked_out) + self._opening
+
+    def _discard_locked(self, conn):
+        self._created.pop(conn, None)
+        self._closed_total += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _expired_locked(self, conn, now):
+        return conn.closed or now - self._created.get(conn, now) >= self.max_lifetime
+
+    def _reap_locked(self, now):
+        kept = deque()
+        while self._idle:
+            conn, idle_since = self._idle.popleft()
+            too_idle = now - idle_since >= self.max_idle and self._size_locked() + len(kept) >= self.min_size
+            if too_idle or self._expired_locked(conn, now):
+                self._discard_locked(conn)
+            else:
+                kept.append((conn, idle_since))
+        self._idle = kept
+
+    def _try_checkout_locked(self, now):
+        self._reap_locked(now)
+        if self._idle:
+            conn, _ = self._idle.pop()  # most recently used: warmest connection
+            return conn
+        if self._size_locked() < self.max_size:
+            self._opening += 1
+            return _OPEN
+        return None
+
+    def _record_checkout_locked(self, conn, started):
+        now = time.monotonic()
+        self._checked_out[conn] = now
+        waited_ms = (now - started) * 1000
+        self._acquire_count += 1
+        self._acquire_total_ms += waited_ms
+        self._acquire_buckets[bisect.bisect_left(ACQUIRE_LATENCY_BUCKETS_MS, waited_ms)] += 1
+
+    def _hand_off_locked(self, conn):
+        """Give a returned connection (None: a freed slot) to the oldest live acquire_async() waiter.
+
+        The connection counts as checked out from here on, so the pool never over-opens while
+        the waiter's loop is scheduling it. Returns False when nobody is waiting.
+        """
+        while self._async_waiters and not self._closed:
+            loop, fut = self._async_waiters.popleft()
+            if fut.done():  # timed out or cancelled
+                continue
+            if conn is None:
+                if self._size_locked() >= self.max_size:
+                    self._async_waiters.appendleft((loop, fut))
+                    return False
+                self._opening += 1
+                got = _OPEN
+            else:
+                self._checked_out[conn] = time.monotonic()
+                got = conn
+            try:
+                loop.call_soon_threadsafe(self._deliver, fut, got)
+            except RuntimeError:  # loop already closed
+                self._take_back_locked(got)
+                continue
+            return True
+        return False
+
+    def _take_back_locked(self, got):
+        """Undo a hand-off whose waiter is gone, passing it on to the next waiter if there is one."""
+        if got is _OPEN:
+            self._opening -= 1
+            conn = None
+        else:
+            self._checked_out.pop(got, None)
+            conn = got
+        if not self._hand_off_locked(conn):
+            if conn is not None:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _deliver(self, fut, got):
+        # Runs on the waiter's event loop.
+        if not fut.done():
+            fut.set_result(got)
+            return
+        with self._cond:
+            self._take_back_locked(got)
+
+    def _slot_freed_locked(self):
+        if not self._hand_off_locked(None):
+            self._cond.notify()
+
+    def _open_reserved(self, started):
+        try:
+            conn = psycopg2.connect(self._dsn)
+        except Exception:
+            with self._cond:
+                self._opening -= 1
+                self._slot_freed_locked()
+            raise
+        with self._cond:
+            self._opening -= 1
+            self._created[conn] = time.monotonic()
+            self._opened_total += 1
+            self._record_checkout_locked(conn, started)
+        return conn
+
+    def _timeout_locked(self):
+        self._acquire_timeouts += 1
+        return PoolTimeout(f"no connection available within {self.acquire_timeout:.3f}s")
+
+    # -- public API ----------------------------------------------------------
+
+    def acquire(self, timeout=None):
+        """Check out a connection, waiting up to `timeout` seconds (default: acquire_timeout)."""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise pool.PoolError("connection pool is closed")
+                got = self._try_checkout_locked(time.monotonic())
+                if got is not None:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise self._timeout_locked()
+                self._waiters += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiters -= 1
+            if got is not _OPEN:
+                self._record_checkout_locked(got, started)
+                return got
+        return self._open_reserved(started)
+
+    async def acquire_async(self, timeout=None):
+        """Like `acquire()`, but waits on the event loop instead of blocking a thread."""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise pool.PoolError("connection pool is closed")
+                while self._async_waiters and self._async_waiters[0][1].done():
+                    self._async_waiters.popleft()
+                # Queue behind earlier async waiters instead of barging past them.
+                got = None if self._async_waiters else self._try_checkout_locked(time.monotonic())
+                if got is not None:
+                    if got is not _OPEN:
+                        self._record_checkout_locked(got, started)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise self._timeout_locked()
+                fut = loop.create_future()
+                self._async_waiters.append((loop, fut))
+                self._waiters += 1
+            try:
+                got = await asyncio.wait_for(fut, remaining)
+            except asyncio.TimeoutError:
+                with self._cond:
+                    raise self._timeout_locked() from None
+            except BaseException:
+                # Cancelled after the hand-off already happened: don't leak the connection.
+                if fut.done() and not fut.cancelled():
+                    with self._cond:
+                        self._take_back_locked(fut.result())
+                raise
+            finally:
+                with self._cond:
+                    self._waiters -= 1
+            if got is None:  # woken by close()
+                continue
+            if got is not _OPEN:
+                with self._cond:
+                    self._record_checkout_locked(got, started)
+            break
+        if got is _OPEN:
+            return await run_in_db_thread(self._open_reserved, started)
+        return got
+
+    def release(self, conn):
+        # Ensure no transaction remains open; pending locks can block tests/truncates.
+        broken = False
+        try:
+            conn.rollback()
+        except Exception:
+            broken = True
+        now = time.monotonic()
+        with self._cond:
+            checked_out_at = self._checked_out.pop(conn, None)
+            if checked_out_at is not None:
+                held_ms = (now - checked_out_at) * 1000
+                self._checkout_count += 1
+                self._checkout_total_ms += held_ms
+                self._checkout_max_ms = max(self._checkout_max_ms, held_ms)
+            if broken or self._closed or self._expired_locked(conn, now):
+                self._discard_locked(conn)
+                self._slot_freed_locked()
+            elif not self._hand_off_locked(conn):
+                self._idle.append((conn, now))
+                self._cond.notify()
+            self._reap_locked(now)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.popleft()
+                self._discard_locked(conn)
+            # Checked-out connections are closed as they come back.
+            self._cond.notify_all()
+            while self._async_waiters:
+                loop, fut = self._async_waiters.popleft()
+                with contextlib.suppress(RuntimeError):
+                    loop.call_soon_threadsafe(self._deliver, fut, None)
+
+    def stats(self):
+        with self._cond:
+            buckets = {str(le): n for le, n in zip(ACQUIRE_LATENCY_BUCKETS_MS, self._acquire_buckets)}
+            buckets["+Inf"] = self._acquire_buckets[-1]
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size_locked(),
+                "in_use": len(self._checked_out),
+                "idle": len(self._idle),
+                "waiters": self._waiters,
+                "connections_opened": self._opened_total,
+                "connections_closed": self._closed_total,
+                "acquire_count": self._acquire_count,
+                "acquire_timeouts": self._acquire_timeouts,
+                "acquire_mean_ms": round(self._acquire_total_ms / self._acquire_count, 3) if self._acquire_count else 0.0,
+                "acquire_latency_ms_buckets": buckets,
+                "checkout_count": self._checkout_count,
+                "checkout_mean_ms": round(self._checkout_total_ms / self._checkout_count, 3) if self._checkout_count else 0.0,
+                "checkout_max_ms": round(self._checkout_max_ms, 3),
+            }
+
+
+_connection_pool: ConnectionPool | None = None
+# Threads for AsyncConnection work, one per pool slot: a checked-out connection never queues behind
+# unrelated asyncio.to_thread() calls in the loop's small default executor while holding its slot.
+_db_executor: ThreadPoolExecutor | None = None
 
 
 def init_pool():
-    global _connection_pool
+    global _connection_pool, _db_executor
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(max_workers=config.DB_POOL_MAX_SIZE, thread_name_prefix="db")
     if _connection_pool is None:
-        _connection_pool = psycopg2.pool.SimpleConnectionPool(
-            minconn=1,
-            maxconn=5,
-            dsn=config.DATABASE_URL,
+        _connection_pool = ConnectionPool(
+            config.DATABASE_URL,
+            min_size=config.DB_POOL_MIN_SIZE,
+            max_size=config.DB_POOL_MAX_SIZE,
+            acquire_timeout=config.DB_POOL_ACQUIRE_TIMEOUT_MS / 1000,
+            max_lifetime=config.DB_POOL_MAX_LIFETIME_SECONDS,
+            max_idle=config.DB_POOL_MAX_IDLE_SECONDS,
         )
     return _connection_pool
 
 
 def close_pool():
-    global _connection_pool
+    global _connection_pool, _db_executor
     if _connection_pool:
-        _connection_pool.closeall()
+        _connection_pool.close()
         _connection_pool = None
+    if _db_executor:
+        _db_executor.shutdown(wait=False)
+        _db_executor = None
+
+
+async def run_in_db_thread(fn, *args, **kwargs):
+    """`asyncio.to_thread()` on the DB executor (falls back to the default one before init_pool())."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_db_executor, functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+def pool_stats() -> dict:
+    if _connection_pool is None:
+        raise RuntimeError("DB pool not initialized")
+    return _connection_pool.stats()
 
 
 @contextlib.contextmanager
 def get_conn():
     if _connection_pool is None:
         raise RuntimeError("DB pool not initialized")
-    conn = _connection_pool.getconn()
+    conn = _connection_pool.acquire()
     try:
         yield conn
     finally:
-        # Ensure no transaction remains open; pending locks can block tests/truncates.
+        _connection_pool.release(conn)
+
+
+class AsyncConnection:
+    """Awaitable facade over a pooled psycopg2 connection.
+
+    Every DB round trip runs in a worker thread so that `async def` handlers never
+    block the event loop while waiting on Postgres.
+    """
+
+    def __init__(self, conn):
+        self.raw = conn
+
+    async def run(self, fn, *args, **kwargs):
+        """Run `fn(conn, *args, **kwargs)` in a DB thread and return its result."""
+        return await run_in_db_thread(fn, self.raw, *args, **kwargs)
+
+    async def commit(self):
+        await run_in_db_thread(self.raw.commit)
+
+    async def rollback(self):
+        await run_in_db_thread(self.raw.rollback)
+
+
+@contextlib.asynccontextmanager
+async def get_async_conn():
+    """Async equivalent of `get_conn()`: `async with db.get_async_conn() as conn`."""
+    if _connection_pool is None:
+        raise RuntimeError("DB pool not initialized")
+    pool_ = _connection_pool
+    conn = await pool_.acquire_async()
+    try:
+        yield AsyncConnection(conn)
+    finally:
+        await run_in_db_thread(pool_.release, conn)
+
+
+async def run_with_conn(fn, *args, **kwargs):
+    """Check out a connection, run `fn(conn, *args, **kwargs)` and release it in one DB-thread hop.
+
+    For single-step handlers (e.g. /status) this saves the separate release hop of
+    `get_async_conn()`; under load every hop is another wait for the GIL and the loop.
+    """
+    if _connection_pool is None:
+        raise RuntimeError("DB pool not initialized")
+    pool_ = _connection_pool
+    conn = await pool_.acquire_async()
+
+    def _run():
         try:
-            conn.rollback()
-        except Exception:
-            pass
-        _connection_pool.putconn(conn)
+            return fn(conn, *args, **kwargs)
+        finally:
+            pool_.release(conn)
+
+    return await run_in_db_thread(_run)
+
+
+class Listener(threading.Thread):
+    """Background LISTEN on a dedicated (non-pooled) connection.
+
+    Calls `on_notify(channel, payload)` for every NOTIFY received. After a connection
+    loss it calls `on_reconnect()` (notifications may have been missed) and reconnects
+    with a capped backoff.
+    """
+
+    def __init__(self, channels, on_notify, *, on_reconnect=None, dsn=None, poll_timeout=5.0):
+        super().__init__(name=f"pg-listen-{','.join(channels)}", daemon=True)
+        self.channels = list(channels)
+        self.on_notify = on_notify
+        self.on_reconnect = on_reconnect
+        self.dsn = dsn or config.DATABASE_URL
+        self.poll_timeout = poll_timeout
+        self.ready = threading.Event()
+        self._stopping = threading.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    def _listen(self):
+        conn = psycopg2.connect(self.dsn)
+        conn.autocommit = True
+        cur = conn.cursor()
+        for channel in self.channels:
+            cur.execute(f'LISTEN "{channel}"')
+        return conn
+
+    def run(self):
+        import select
+
+        backoff = 1.0
+        while not self._stopping.is_set():
+            conn = None
+            try:
+                conn = self._listen()
+                if self.ready.is_set() and self.on_reconnect:
+                    self.on_reconnect()
+                self.ready.set()
+                backoff = 1.0
+                while not self._stopping.is_set():
+                    if select.select([conn], [], [], self.poll_timeout) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        n = conn.notifies.pop(0)
+                        self.on_notify(n.channel, n.payload)
+            except Exception:
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
@@ -1,20 +1,20 @@
 from datetime import datetime, date, timedelta, timezone
+from functools import partial
 from typing import Any, Dict, List
 import logging
 import hashlib
 import json
-import io
-import csv
 import secrets
 import uuid
 
 from fastapi import FastAPI, HTTPException, Depends, Request, Response
-from fastapi.responses import StreamingResponse
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from psycopg2.extras import Json
 from psycopg2.extras import execute_values
+from pydantic import ValidationError
 
 from app import config, db
 from app.schemas import (
@@ -42,6 +42,10 @@ from app.schemas import (
     AdminJobItem,
     AdminImportRequest,
     AdminImportResponse,
+    ImportSessionChunkRequest,
+    ImportSessionChunkResponse,
+    ImportSessionCreateRequest,
+    ImportSessionResponse,
     ExtendExpiryRequest,
     ExtendExpiryResponse,
     HealthResponse,
@@ -51,6 +55,7 @@ from app.schemas import (
     UserIdentityBulkResponse,
     DailyUserImportRequest,
     DailyUserImportResponse,
+    DailyUserImportRow,
     UserLoginRequest,
     UserLoginResponse,
     AdminSegmentCreateRequest,
@@ -63,6 +68,7 @@ from app.schemas import (
     AdminBulkUpdateResponse,
 )
 from app.utils.auth import verify_admin_password
+from app.utils.parsers import _iter_csv_records
 from app.utils.audit import _log_admin_action
 from app.utils.sql_builders import _apply_job_timeouts, _build_user_target_sql
 from app.constants.vault_config import (
@@ -84,14 +90,64 @@ from app.services.common import (
     idempotency_scope as _idempotency_scope_v2,
     idempotency_start as _idempotency_start_v2,
     idempotency_finish as _idempotency_finish_v2,
+    idempotency_lookup as _idempotency_lookup,
+    idempotency_release as _idempotency_release,
+    idempotency_take_over as _idempotency_take_over,
+    idempotency_touch as _idempotency_touch,
+    wake_workers as _wake_workers,
 )
 from app.services.user_identity_service import (
-    resolve_user_id as _resolve_user_id_v2,
-    bulk_get_or_create_user_ids_by_external_user_ids as _bulk_get_or_create_user_ids_v2,
+    bulk_get_or_create_user_ids_by_external_user_ids as _bulk_get_or_create_user_ids_by_external_user_ids,
+    get_user_id_by_external_user_id as _get_user_id_by_external_user_id,
+    resolve_user_id as _resolve_user_id,
+    resolve_user_ids_by_external_user_ids as _resolve_user_ids_by_external_user_ids,
+    start_identity_listener as _start_identity_listener,
+    stop_identity_listener as _stop_identity_listener,
 )
 from app.services.vault_service import (
     get_or_create_vault_row as _get_or_create_vault_row_v2,
 )
+from app.services.admin_ops_service import (
+    apply_bulk_update as _apply_bulk_update,
+    count_extend_expiry_candidates as _count_extend_expiry_candidates,
+    extend_expiry_batched as _extend_expiry_batched,
+)
+from app.utils.pagination import (
+    decode_cursor as _decode_cursor,
+    encode_cursor as _encode_cursor,
+    keyset_after as _keyset_after,
+)
+from app.utils.list_counts import count_rows as _count_rows, validate_count_mode as _validate_count_mode
+from app.services.notification_service import (
+    enqueue_notifications as _enqueue_notifications,
+)
+from app.services.notification_templates import (
+    start_template_listener as _start_template_listener,
+    stop_template_listener as _stop_template_listener,
+    template_cache as _template_cache,
+)
+from app.services.expiry_service import EXTENDABLE_TIER_SQL as _EXTENDABLE_TIER_SQL
+from app.services.export_service import csv_response as _csv_response, stream_csv_rows as _stream_csv_rows
+from app.services.status_stream import (
+    start_status_listener as _start_status_listener,
+    stop_status_listener as _stop_status_listener,
+)
+from app.services.import_service import (
+    apply_daily_import_vault_updates as _apply_daily_import_vault_updates,
+    apply_import_chunk as _apply_import_chunk,
+    apply_import_chunks_parallel as _apply_import_chunks_parallel,
+    apply_session_chunk as _apply_session_chunk,
+    create_import_session as _create_import_session,
+    apply_staged_snapshots as _apply_staged_snapshots,
+    bump_platinum_progress as _bump_platinum_progress,
+    enqueue_import_chunks as _enqueue_import_chunks,
+    import_session_summary as _import_session_summary,
+    lock_import_session as _lock_import_session,
+    record_import_chunk_job as _record_import_chunk_job,
+    seal_import_job as _seal_import_job,
+    stage_import_rows as _stage_import_rows,
+    staged_user_ids as _staged_user_ids,
+)
 
 app = FastAPI(title="Vault v3.0 API", version="0.3.0")
 logger = logging.getLogger("vault.idempotency")
@@ -112,6 +168,12 @@ app.include_router(admin_users_router.router)
 app.include_router(admin_vault_router.router)
 
 
+@app.exception_handler(db.PoolTimeout)
+async def _pool_timeout_handler(request: Request, exc: db.PoolTimeout):
+    # Pool exhausted for longer than DB_POOL_ACQUIRE_TIMEOUT_MS: shed load instead of a bare 500.
+    return JSONResponse(status_code=503, content={"detail": "DB_POOL_TIMEOUT"}, headers={"Retry-After": "1"})
+
+
 @app.on_event("startup")
 def _startup():
     db.init_pool()
@@ -119,10 +181,16 @@ def _startup():
     # Running best-effort DDL here can hang if the DB is busy/locked.
     if config.APP_ENV != "test":
         _ensure_schema()
+        _start_template_listener()
+        _start_status_listener()
+        _start_identity_listener()
 
 
 @app.on_event("shutdown")
 def _shutdown():
+    _stop_template_listener()
+    _stop_status_listener()
+    _stop_identity_listener()
     db.close_pool()
 
 
@@ -182,10 +250,6 @@ def _validate_status(value: str | None, field: str) -> str:
     return v
 
 
-def _clamp_attendance_days(value: int) -> int:
-    return max(0, min(365, value))
-
-
 def _parse_iso_datetime(value: str | None) -> datetime | None:
     s = str(value or "").strip()
     if not s:
@@ -205,61 +269,6 @@ def _parse_iso_datetime(value: str | None) -> datetime | None:
         return None
 
 
-def _get_or_create_vault_row(cur, user_id: int, now: datetime):
-    cur.execute(
-        """
-        SELECT expires_at,
-               gold_status,
-               platinum_status,
-               diamond_status,
-               platinum_attendance_days,
-               platinum_deposit_total,
-               platinum_deposit_count,
-               diamond_deposit_total,
-               gold_mission_1_done,
-               gold_mission_2_done,
-               gold_mission_3_done
-          FROM vault_status
-         WHERE user_id=%s
-         FOR UPDATE
-        """,
-        (user_id,),
-    )
-    row = cur.fetchone()
-    if row:
-        return row
-
-    expires_at = now + timedelta(hours=DEFAULT_EXPIRY_HOURS)
-    cur.execute(
-        """
-        INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status)
-        VALUES (%s, %s, 'LOCKED', 'LOCKED', 'LOCKED')
-        ON CONFLICT (user_id) DO NOTHING
-        """,
-        (user_id, expires_at),
-    )
-    cur.execute(
-        """
-        SELECT expires_at,
-               gold_status,
-               platinum_status,
-               diamond_status,
-               platinum_attendance_days,
-               platinum_deposit_total,
-               platinum_deposit_count,
-               diamond_deposit_total,
-               gold_mission_1_done,
-               gold_mission_2_done,
-               gold_mission_3_done
-          FROM vault_status
-         WHERE user_id=%s
-         FOR UPDATE
-        """,
-        (user_id,),
-    )
-    return cur.fetchone()
-
-
 def _parse_joined_date(value: str | None):
     dt = _parse_iso_datetime(value)
     if dt is None:
@@ -267,12 +276,6 @@ def _parse_joined_date(value: str | None):
     return dt.date()
 
 
-def _select_import_date(last_deposit_at: datetime | None) -> datetime.date:
-    if last_deposit_at is not None:
-        return last_deposit_at.date()
-    return _now().date()
-
-
 def _require_non_empty(value: str | None, *, code: str) -> str:
     v = (value or "").strip()
     if not v:
@@ -338,6 +341,9 @@ def _idempotency_start(cur, *, key: str, scope: str, endpoint: str, request_hash
                 "response_status": int(response_status or 200),
                 "response_body": response_body,
             }
+        # heartbeat 없이 lease가 지난 IN_PROGRESS는 죽은 요청의 것 → 같은 요청의 재시도가 이어받는다.
+        if _idempotency_take_over(cur, key=key, scope=scope, endpoint=endpoint):
+            return {"status": "recorded"}
         logger.info(
             "idempotency_in_progress endpoint=%s scope=%s key=%s status=%s",
             endpoint,
@@ -464,8 +470,10 @@ def _dedupe_str_list(values: list[str] | None, *, max_items: int) -> list[str]:
     return out
 
 
+# Import handlers are plain `def`: FastAPI runs them in its threadpool so a large
+# import does not block the event loop serving /api/vault/status.
 @app.post("/api/vault/user-daily-import", response_model=DailyUserImportResponse)
-async def user_daily_import(body: DailyUserImportRequest, request: Request, response: Response, _auth: str = Depends(verify_admin_password)):
+def user_daily_import(body: DailyUserImportRequest, request: Request, response: Response, _auth: str = Depends(verify_admin_password)):
     """?일 ??/CSV ?로???이?로 ?영 ?냅??+ 조건??갱신.
 
     ?력(권장): external_user_id, nickname, deposit_total(?적), joined_at, last_deposit_at, telegram_ok
@@ -481,7 +489,7 @@ async def user_daily_import(body: DailyUserImportRequest, request: Request, resp
     rows = body.rows or []
     if not rows:
         raise HTTPException(status_code=400, detail="EMPTY_ROWS")
-    if len(rows) > 10000:
+    if len(rows) > config.IMPORT_MAX_ROWS:
         raise HTTPException(status_code=400, detail="TOO_MANY_ROWS")
 
     key = _validate_idempotency_key(request.headers.get("x-idempotency-key"))
@@ -500,7 +508,7 @@ async def user_daily_import(body: DailyUserImportRequest, request: Request, resp
             continue
         seen.add(ext)
         external_ids.append(ext)
-        cleaned_rows.append(r)
+        cleaned_rows.append((ext, r))
 
     if not external_ids:
         raise HTTPException(status_code=400, detail="EMPTY_EXTERNAL_USER_IDS")
@@ -519,99 +527,17 @@ async def user_daily_import(body: DailyUserImportRequest, request: Request, resp
         now = _now()
         default_expires = now + timedelta(hours=DEFAULT_EXPIRY_HOURS)
 
-        mapping = _bulk_get_or_create_user_ids_by_external_user_ids(cur, external_ids)
-        identity_created = int(mapping.pop("__created_count__", 0))
-
-        snapshot_values = []
-        vault_update_values = []
-
-        for r in cleaned_rows:
-            ext = _normalize_external_user_id(getattr(r, "external_user_id", None))
-            if not ext:
-                continue
-            user_id = int(mapping[ext])
-            nickname = str(getattr(r, "nickname", "") or "").strip() or None
-            joined_date = _parse_joined_date(getattr(r, "joined_at", None))
-            deposit_total = max(0, _parse_int(getattr(r, "deposit_total", 0), default=0))
-            last_deposit_at = _parse_iso_datetime(getattr(r, "last_deposit_at", None))
-            telegram_ok = _parse_bool(getattr(r, "telegram_ok", False))
-            review_ok = _parse_bool(getattr(r, "review_ok", False))
-            attendance_count = max(0, _parse_int(getattr(r, "cc_attendance_count", 0), default=0))
-
-            import_date = _select_import_date(last_deposit_at)
-
-            snapshot_values.append((user_id, nickname, joined_date, deposit_total, last_deposit_at, telegram_ok, review_ok))
-            vault_update_values.append((user_id, deposit_total, telegram_ok, review_ok, import_date, last_deposit_at, attendance_count))
-
-        if not snapshot_values:
+        identity_created = _stage_import_rows(cur, cleaned_rows)
+        written = _apply_staged_snapshots(cur, default_expires)
+        target_user_ids = _staged_user_ids(cur)
+        processed = len(target_user_ids)
+        if not processed:
             raise HTTPException(status_code=400, detail="NO_VALID_ROWS")
+        # Rows whose snapshot matched what is already stored: nothing downstream changes for them.
+        unchanged = processed - written
 
-        execute_values(
-            cur,
-            """
-            INSERT INTO user_admin_snapshot
-                (user_id, nickname, joined_date, deposit_total, last_deposit_at, telegram_ok, review_ok, updated_at)
-            VALUES %s
-            ON CONFLICT (user_id) DO UPDATE
-               SET nickname=EXCLUDED.nickname,
-                   joined_date=EXCLUDED.joined_date,
-                   deposit_total=EXCLUDED.deposit_total,
-                   last_deposit_at=EXCLUDED.last_deposit_at,
-                   telegram_ok=EXCLUDED.telegram_ok,
-                   review_ok=EXCLUDED.review_ok,
-                   updated_at=NOW()
-            """,
-            snapshot_values,
-            template="(%s,%s,%s,%s,%s,%s,%s,NOW())",
-        )
-
-        ensure_values = [(int(row[0]), default_expires) for row in snapshot_values]
-        execute_values(
-            cur,
-            """
-            INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status)
-            VALUES %s
-            ON CONFLICT (user_id) DO NOTHING
-            """,
-            ensure_values,
-            template="(%s,%s,'LOCKED','LOCKED','LOCKED')",
-        )
-
-        execute_values(
-            cur,
-            f"""
-            UPDATE vault_status AS vs
-               SET diamond_deposit_total = v.deposit_total,
-                   diamond_deposit_current = v.deposit_total,
-                   diamond_attendance_days = GREATEST(COALESCE(vs.diamond_attendance_days, 0), v.attendance_count),
-                   gold_mission_1_done = v.telegram_ok,
-                   gold_status = CASE
-                       WHEN vs.gold_status='CLAIMED' THEN 'CLAIMED'
-                       WHEN v.telegram_ok THEN 'UNLOCKED'
-                       ELSE vs.gold_status
-                   END,
-                   platinum_deposit_total = GREATEST(COALESCE(vs.platinum_deposit_total, 0), v.deposit_total),
-                   diamond_status = CASE
-                       WHEN vs.diamond_status IN ('LOCKED','ACTIVE') 
-                            AND vs.platinum_status = 'CLAIMED'
-                            AND v.deposit_total >= {DIAMOND_UNLOCK['deposit_total']} THEN 'UNLOCKED'
-                       ELSE vs.diamond_status
-                   END,
-                   expires_at = CASE
-                       WHEN v.last_deposit_at IS NOT NULL THEN v.last_deposit_at::timestamptz + INTERVAL '5 days'
-                       ELSE vs.expires_at
-                   END,
-                   updated_at = NOW()
-                            FROM (VALUES %s) AS v(user_id, deposit_total, telegram_ok, review_ok, import_date, last_deposit_at, attendance_count)
-             WHERE vs.user_id = v.user_id
-            """,
-            vault_update_values,
-                        template="(%s::int,%s::bigint,%s::bool,%s::bool,%s::date,%s::timestamptz,%s::int)",
-        )
-        vault_rows_updated = int(cur.rowcount or 0)
-
-        target_user_ids = [int(mapping[ext]) for ext in external_ids]
-        _bump_platinum_progress(cur, target_user_ids)
+        vault_rows_updated = _apply_daily_import_vault_updates(cur)
+        _bump_platinum_progress(cur)
 
         job_id = _generate_job_id()
         cur.execute(
@@ -625,7 +551,7 @@ async def user_daily_import(body: DailyUserImportRequest, request: Request, resp
                 "DAILY_IMPORT",
                 key,
                 len(target_user_ids),
-                len(snapshot_values),
+                processed,
                 Json({"source": "USER_DAILY_IMPORT", "total_rows": len(rows)}),
             ),
         )
@@ -642,7 +568,8 @@ async def user_daily_import(body: DailyUserImportRequest, request: Request, resp
             response_status="SUCCESS",
             response_summary={
                 "total": len(rows),
-                "processed": len(snapshot_values),
+                "processed": processed,
+                "unchanged": unchanged,
                 "identity_created": identity_created,
                 "vault_rows_updated": vault_rows_updated,
                 "job_id": job_id,
@@ -653,7 +580,8 @@ async def user_daily_import(body: DailyUserImportRequest, request: Request, resp
 
         response_body = {
             "total": len(rows),
-            "processed": len(snapshot_values),
+            "processed": processed,
+            "unchanged": unchanged,
             "identity_created": identity_created,
             "vault_rows_updated": vault_rows_updated,
             "job_id": job_id,
@@ -674,133 +602,19 @@ async def user_daily_import(body: DailyUserImportRequest, request: Request, resp
     return DailyUserImportResponse(**response_body)
 
 
-def _bump_platinum_progress(cur, user_ids: list[int]):
-    if not user_ids:
-        return
+def _create_import_job(cur, *, job_id: str, key: str, target_count: int, payload: dict[str, Any]):
     cur.execute(
-        f"""
-        UPDATE vault_status AS vs
-           SET platinum_attendance_days = LEAST(3, vs.platinum_attendance_days + 1),
-               last_attended_at = COALESCE(vs.last_attended_at, NOW()),
-               platinum_deposit_total = GREATEST(COALESCE(vs.platinum_deposit_total, 0), uas.deposit_total),
-               platinum_status = CASE
-                   WHEN vs.platinum_status IN ('LOCKED','ACTIVE')
-                        AND uas.review_ok
-                        AND (GREATEST(COALESCE(vs.platinum_deposit_total, 0), uas.deposit_total) >= {PLATINUM_UNLOCK['deposit_total']})
-                        AND LEAST(3, vs.platinum_attendance_days + 1) >= 3
-                   THEN 'UNLOCKED'
-                   ELSE vs.platinum_status
-               END
-          FROM user_admin_snapshot uas
-         WHERE vs.user_id = uas.user_id
-           AND vs.user_id = ANY(%s)
-        """,
-        (user_ids,),
-    )
-
-
-def _apply_import_chunk(cur, cleaned_rows: list[tuple[int, Any, str]], request) -> dict[str, Any]:
-    """Apply import chunk (<=10k rows) and return stats."""
-    if not cleaned_rows:
-        return {"processed": 0, "identity_created": 0, "vault_rows_updated": 0, "target_user_ids": []}
-
-    now = _now()
-    default_expires = now + timedelta(hours=DEFAULT_EXPIRY_HOURS)
-
-    external_ids = [ext for (_, _, ext) in cleaned_rows]
-    mapping = _bulk_get_or_create_user_ids_by_external_user_ids(cur, external_ids)
-    identity_created = int(mapping.pop("__created_count__", 0))
-
-    snapshot_values = []
-    vault_update_values = []
-
-    for (_, r, ext) in cleaned_rows:
-        user_id = int(mapping[ext])
-        nickname = str(getattr(r, "nickname", "") or "").strip() or None
-        joined_date = _parse_joined_date(getattr(r, "joined_at", None))
-        deposit_total = max(0, _parse_int(getattr(r, "deposit_total", 0), default=0))
-        last_deposit_at = _parse_iso_datetime(getattr(r, "last_deposit_at", None))
-        telegram_ok = _parse_bool(getattr(r, "telegram_ok", False))
-        review_ok = _parse_bool(getattr(r, "review_ok", False))
-
-        import_date = _select_import_date(last_deposit_at)
-
-        snapshot_values.append((user_id, nickname, joined_date, deposit_total, last_deposit_at, telegram_ok, review_ok))
-        vault_update_values.append((user_id, deposit_total, telegram_ok, review_ok, import_date, last_deposit_at))
-
-    execute_values(
-        cur,
         """
-        INSERT INTO user_admin_snapshot
-            (user_id, nickname, joined_date, deposit_total, last_deposit_at, telegram_ok, review_ok, updated_at)
-        VALUES %s
-        ON CONFLICT (user_id) DO UPDATE
-           SET nickname=EXCLUDED.nickname,
-               joined_date=EXCLUDED.joined_date,
-               deposit_total=EXCLUDED.deposit_total,
-               last_deposit_at=EXCLUDED.last_deposit_at,
-               telegram_ok=EXCLUDED.telegram_ok,
-               review_ok=EXCLUDED.review_ok,
-               updated_at=NOW()
-        """,
-        snapshot_values,
-        template="(%s,%s,%s,%s,%s,%s,%s,NOW())",
-    )
-
-    ensure_values = [(int(row[0]), default_expires) for row in snapshot_values]
-    execute_values(
-        cur,
-        """
-        INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status)
-        VALUES %s
-        ON CONFLICT (user_id) DO NOTHING
-        """,
-        ensure_values,
-        template="(%s,%s,'LOCKED','LOCKED','LOCKED')",
-    )
-
-    execute_values(
-        cur,
-        f"""
-        UPDATE vault_status AS vs
-           SET diamond_deposit_total = v.deposit_total,
-                                 gold_status = CASE
-                                     WHEN vs.gold_status='CLAIMED' THEN 'CLAIMED'
-                                     WHEN v.telegram_ok THEN 'UNLOCKED'
-                                     ELSE 'LOCKED'
-                                 END,
-                   platinum_deposit_total = GREATEST(COALESCE(vs.platinum_deposit_total, 0), v.deposit_total),
-                   diamond_status = CASE
-                       WHEN vs.diamond_status IN ('LOCKED','ACTIVE') 
-                            AND vs.platinum_status = 'CLAIMED'
-                            AND v.deposit_total >= {DIAMOND_UNLOCK['deposit_total']} THEN 'UNLOCKED'
-                       ELSE vs.diamond_status
-                   END,
-               expires_at = CASE
-                   WHEN v.last_deposit_at IS NOT NULL THEN v.last_deposit_at::timestamptz + INTERVAL '5 days'
-                   ELSE vs.expires_at
-               END,
-               updated_at = NOW()
-                        FROM (VALUES %s) AS v(user_id, deposit_total, telegram_ok, review_ok, import_date, last_deposit_at)
-         WHERE vs.user_id = v.user_id
+        INSERT INTO admin_jobs
+            (job_id, type, status, request_id, target_count, processed, failed, payload, created_at, updated_at)
+        VALUES (%s, 'DAILY_IMPORT', 'PENDING', %s, %s, 0, 0, %s, NOW(), NOW())
         """,
-        vault_update_values,
-                    template="(%s::int,%s::bigint,%s::bool,%s::bool,%s::date,%s::timestamptz)",
+        (job_id, key, target_count, Json(payload)),
     )
-    vault_rows_updated = int(cur.rowcount or 0)
-    target_user_ids = [int(mapping[ext]) for ext in external_ids]
-    _bump_platinum_progress(cur, target_user_ids)
-
-    return {
-        "processed": len(snapshot_values),
-        "identity_created": identity_created,
-        "vault_rows_updated": vault_rows_updated,
-        "target_user_ids": target_user_ids,
-    }
 
 
 @app.post("/api/vault/admin/imports", response_model=AdminImportResponse)
-async def admin_imports(body: AdminImportRequest, request: Request, response: Response, _auth: str = Depends(verify_admin_password)):
+def admin_imports(body: AdminImportRequest, request: Request, response: Response, _auth: str = Depends(verify_admin_password)):
     mode = (body.mode or "APPLY").upper()
     if mode not in {"APPLY", "SHADOW"}:
         raise HTTPException(status_code=400, detail="INVALID_MODE")
@@ -864,37 +678,108 @@ async def admin_imports(body: AdminImportRequest, request: Request, response: Re
             response.headers["Idempotency-Status"] = "recorded"
             return AdminImportResponse(**response_body)
 
-        chunk_size = 10000
+        chunk_size = config.IMPORT_CHUNK_SIZE
         chunks: list[list[tuple[int, Any, str]]] = [cleaned[i : i + chunk_size] for i in range(0, len(cleaned), chunk_size)]
 
+        if mode != "SHADOW" and body.background:
+            # Background import: persist the chunks and let app/worker.py apply them one transaction each.
+            job_id = _generate_job_id()
+            _create_import_job(cur, job_id=job_id, key=key, target_count=len(cleaned), payload={"type": "DAILY_IMPORT", "mode": mode, "background": True, "chunk_total": len(chunks), "total": total})
+            for chunk_idx, chunk in enumerate(chunks):
+                _enqueue_import_chunks(cur, job_id, chunk_idx, chunk)
+
+            response_body = {
+                "shadow": False,
+                "total": total,
+                "processed": 0,
+                "identity_created": 0,
+                "vault_rows_updated": 0,
+                "dedup_removed": dedup_removed,
+                "errors": errors,
+                "job_ids": [job_id],
+                "job_id": job_id,
+            }
+            _log_admin_action(
+                conn=conn,
+                admin_user=request.client.host if request.client else "unknown",
+                action="ADMIN_IMPORTS",
+                endpoint=endpoint,
+                target_user_ids=None,
+                request_id=key,
+                request_body={"mode": mode, "total": total, "chunks": len(chunks), "background": True},
+                response_status="SUCCESS",
+                response_summary={"job_id": job_id, "dedup_removed": dedup_removed},
+                job_id=job_id,
+            )
+            _idempotency_finish(cur, key=key, scope=scope, endpoint=endpoint, response_status=202, response_body=response_body)
+            conn.commit()
+            response.status_code = 202
+            response.headers["Idempotency-Status"] = "recorded"
+            return AdminImportResponse(**response_body)
+
         processed_total = 0
+        unchanged_total = 0
         identity_created_total = 0
         vault_rows_updated_total = 0
         target_user_ids: list[int] = []
         job_ids: list[str] = []
+        chunk_failed = False
 
         if mode == "SHADOW":
             processed_total = len(cleaned)
         else:
-            for chunk_idx, chunk in enumerate(chunks):
-                stats = _apply_import_chunk(cur, chunk, request)
+            parallelism = min(body.parallelism or config.IMPORT_PARALLELISM, len(chunks))
+            if parallelism > 1:
+                # Keep one pool slot for this request's own connection.
+                parallelism = max(1, min(parallelism, db.pool_stats()["max_size"] - 1))
+
+            if parallelism > 1:
+                # Chunks commit independently; make the idempotency key visible first so retries get 409, not a rerun.
+                conn.commit()
+                _apply_job_timeouts(cur)
+                chunk_results = _apply_import_chunks_parallel(chunks, parallelism=parallelism, key=key, mode=mode)
+                # Chunks that never got a connection: record their FAILED job row here so the partial result is persisted.
+                for chunk_idx, (chunk, stats) in enumerate(zip(chunks, chunk_results)):
+                    if stats["job_id"] is None:
+                        stats["job_id"] = _record_import_chunk_job(
+                            cur,
+                            key=key,
+                            chunk_index=chunk_idx,
+                            chunk_total=len(chunks),
+                            mode=mode,
+                            target_count=len(chunk),
+                            processed=0,
+                            status="FAILED",
+                            error=stats["error"],
+                        )
+            else:
+                chunk_results = []
+                for chunk_idx, chunk in enumerate(chunks):
+                    stats = _apply_import_chunk(cur, chunk)
+                    if len(chunks) > 1:
+                        stats["job_id"] = _record_import_chunk_job(
+                            cur,
+                            key=key,
+                            chunk_index=chunk_idx,
+                            chunk_total=len(chunks),
+                            mode=mode,
+                            target_count=len(chunk),
+                            processed=stats["processed"],
+                        )
+                    chunk_results.append(stats)
+
+            for chunk, stats in zip(chunks, chunk_results):
                 processed_total += stats["processed"]
+                unchanged_total += stats["unchanged"]
                 identity_created_total += stats["identity_created"]
                 vault_rows_updated_total += stats["vault_rows_updated"]
                 target_user_ids.extend(stats["target_user_ids"])
-
-                if len(chunks) > 1:
-                    job_id = _generate_job_id()
-                    payload = {"type": "DAILY_IMPORT", "chunk_index": chunk_idx, "chunk_total": len(chunks), "mode": mode}
-                    cur.execute(
-                        """
-                        INSERT INTO admin_jobs
-                            (job_id, type, status, request_id, target_count, processed, failed, payload, created_at, updated_at)
-                        VALUES (%s, %s, 'DONE', %s, %s, %s, 0, %s, NOW(), NOW())
-                        """,
-                        (job_id, "DAILY_IMPORT", key, len(chunk), stats["processed"], Json(payload)),
-                    )
-                    job_ids.append(job_id)
+                if stats.get("job_id"):
+                    job_ids.append(stats["job_id"])
+                if stats.get("error"):
+                    chunk_failed = True
+                    for idx, _, ext in chunk:
+                        errors.append({"row_index": idx, "external_user_id": ext, "code": "CHUNK_FAILED", "detail": stats["error"]})
 
         admin_user = request.client.host if request.client else "unknown"
 
@@ -907,9 +792,10 @@ async def admin_imports(body: AdminImportRequest, request: Request, response: Re
                 target_user_ids=target_user_ids[:1000],
                 request_id=key,
                 request_body={"mode": mode, "total": total, "chunks": len(chunks)},
-                response_status="SUCCESS",
+                response_status="PARTIAL_FAILURE" if chunk_failed else "SUCCESS",
                 response_summary={
                     "processed": processed_total,
+                    "unchanged": unchanged_total,
                     "identity_created": identity_created_total,
                     "vault_rows_updated": vault_rows_updated_total,
                     "dedup_removed": dedup_removed,
@@ -921,6 +807,7 @@ async def admin_imports(body: AdminImportRequest, request: Request, response: Re
             "shadow": mode == "SHADOW",
             "total": total,
             "processed": processed_total,
+            "unchanged": unchanged_total,
             "identity_created": identity_created_total,
             "vault_rows_updated": vault_rows_updated_total,
             "dedup_removed": dedup_removed,
@@ -944,139 +831,519 @@ async def admin_imports(body: AdminImportRequest, request: Request, response: Re
     return AdminImportResponse(**response_body)
 
 
-def _normalize_external_user_id(value: str | None) -> str | None:
-    if value is None:
-        return None
-    v = str(value).strip()
-    return v or None
+def _csv_import_header_map(header: list[str]) -> dict[int, str]:
+    """Map CSV column positions to DailyUserImportRow fields by Korean alias or English name."""
+    names: dict[str, str] = {}
+    for field_name, info in DailyUserImportRow.model_fields.items():
+        names[field_name] = field_name
+        if info.alias:
+            names[info.alias] = field_name
+    columns: dict[int, str] = {}
+    for idx, col in enumerate(header):
+        field_name = names.get(str(col).strip())
+        if field_name and field_name not in columns.values():
+            columns[idx] = field_name
+    if "external_user_id" not in columns.values():
+        raise HTTPException(status_code=400, detail="MISSING_EXTERNAL_USER_ID_COLUMN")
+    return columns
+
+
+def _csv_import_begin(conn, *, key: str, scope: str, endpoint: str, request_hash: str) -> Dict[str, Any]:
+    """Claim the key before the body is read, or return the record already held under it.
+
+    The body digest is only known once the upload has been read, so a new key is recorded
+    with a provisional hash that _csv_import_finish replaces; a DONE record is handed back
+    for the caller to compare against the digest of the re-sent body.
+    """
+    cur = conn.cursor()
+    _apply_job_timeouts(cur)
+    existing = _idempotency_lookup(cur, key=key, scope=scope, endpoint=endpoint)
+    if existing is not None and existing["status"] == "DONE":
+        return {**existing, "status": "done"}
+    # IN_PROGRESS: 409, unless its lease ran out (crashed upload) and this request takes it over.
+    idem = _idempotency_start(cur, key=key, scope=scope, endpoint=endpoint, request_hash=request_hash)
+    conn.commit()
+    return idem
+
+
+def _csv_import_apply_chunk(conn, chunk: list[tuple[int, Any, str]], *, key: str, scope: str, endpoint: str) -> dict[str, Any]:
+    cur = conn.cursor()
+    _apply_job_timeouts(cur)
+    stats = _apply_import_chunk(cur, chunk)
+    _idempotency_touch(cur, key=key, scope=scope, endpoint=endpoint)
+    conn.commit()
+    return stats
+
+
+def _csv_import_enqueue_chunk(
+    conn, chunk: list[tuple[int, Any, str]], *, job_id: str, key: str, scope: str, endpoint: str, chunk_index: int, mode: str
+):
+    cur = conn.cursor()
+    _apply_job_timeouts(cur)
+    if chunk_index == 0:
+        _create_import_job(cur, job_id=job_id, key=key, target_count=0, payload={"type": "DAILY_IMPORT", "mode": mode, "background": True, "source": "CSV"})
+    _enqueue_import_chunks(cur, job_id, chunk_index, chunk)
+    _idempotency_touch(cur, key=key, scope=scope, endpoint=endpoint)
+    conn.commit()
+
+
+def _csv_import_abort(conn, *, key: str, scope: str, endpoint: str, background_job_id: str | None, chunk_total: int, total: int):
+    """Release the key of a failed upload; chunks already committed stay applied (or queued) and a retry re-applies them."""
+    cur = conn.cursor()
+    if background_job_id and chunk_total:
+        _seal_import_job(cur, background_job_id, chunk_total=chunk_total, total=total)
+    _idempotency_release(cur, key=key, scope=scope, endpoint=endpoint)
+    conn.commit()
+
+
+def _csv_import_finish(
+    conn,
+    *,
+    key: str,
+    scope: str,
+    endpoint: str,
+    request_hash: str,
+    mode: str,
+    total: int,
+    chunk_stats: list[dict[str, Any]],
+    errors: list[dict[str, Any]],
+    error_count: int,
+    dedup_removed: int,
+    target_user_ids: list[int],
+    admin_user: str,
+    background_job_id: str | None = None,
+) -> tuple[int, dict[str, Any]]:
+    cur = conn.cursor()
+    job_ids: list[str] = []
+    if background_job_id:
+        _seal_import_job(cur, background_job_id, chunk_total=len(chunk_stats), total=total)
+        job_ids.append(background_job_id)
+    elif mode != "SHADOW" and len(chunk_stats) > 1:
+        for chunk_idx, stats in enumerate(chunk_stats):
+            job_id = _generate_job_id()
+            payload = {"type": "DAILY_IMPORT", "chunk_index": chunk_idx, "chunk_total": len(chunk_stats), "mode": mode, "source": "CSV"}
+            cur.execute(
+                """
+                INSERT INTO admin_jobs
+                    (job_id, type, status, request_id, target_count, processed, failed, payload, created_at, updated_at)
+                VALUES (%s, %s, 'DONE', %s, %s, %s, 0, %s, NOW(), NOW())
+                """,
+                (job_id, "DAILY_IMPORT", key, stats["rows"], stats["processed"], Json(payload)),
+            )
+            job_ids.append(job_id)
+
+    response_body = {
+        "shadow": mode == "SHADOW",
+        "total": total,
+        "processed": sum(s["processed"] for s in chunk_stats),
+        "unchanged": sum(s["unchanged"] for s in chunk_stats),
+        "identity_created": sum(s["identity_created"] for s in chunk_stats),
+        "vault_rows_updated": sum(s["vault_rows_updated"] for s in chunk_stats),
+        "dedup_removed": dedup_removed,
+        "errors": errors,
+        "error_count": error_count,
+        "job_ids": job_ids or None,
+        "job_id": background_job_id,
+    }
 
+    if mode != "SHADOW" and chunk_stats:
+        _log_admin_action(
+            conn=conn,
+            admin_user=admin_user,
+            action="ADMIN_IMPORTS",
+            endpoint=endpoint,
+            target_user_ids=target_user_ids[:1000],
+            request_id=key,
+            request_body={"mode": mode, "total": total, "chunks": len(chunk_stats), "source": "CSV", "background": bool(background_job_id)},
+            response_status="SUCCESS",
+            response_summary={k: response_body[k] for k in ("processed", "unchanged", "identity_created", "vault_rows_updated", "dedup_removed", "error_count", "job_ids")},
+            job_id=background_job_id,
+        )
 
-def _get_user_id_by_external_user_id(cur, external_user_id: str) -> int | None:
-    cur.execute(
-        """
-        SELECT user_id
-          FROM user_identity
-         WHERE external_user_id=%s
-        """,
-        (external_user_id,),
+    status_code = 202 if background_job_id or len(chunk_stats) > 1 else 200
+    _idempotency_finish_v2(
+        cur, key=key, scope=scope, endpoint=endpoint, response_status=status_code, response_body=response_body, request_hash=request_hash
     )
-    row = cur.fetchone()
-    return int(row[0]) if row else None
+    conn.commit()
+    return status_code, response_body
 
 
-def _get_or_create_user_id_by_external_user_id(cur, external_user_id: str) -> int:
-    cur.execute(
-        """
-        INSERT INTO user_identity (external_user_id)
-        VALUES (%s)
-        ON CONFLICT (external_user_id) DO NOTHING
-        RETURNING user_id
-        """,
-        (external_user_id,),
-    )
-    row = cur.fetchone()
-    if row:
-        return int(row[0])
-    user_id = _get_user_id_by_external_user_id(cur, external_user_id)
-    if user_id is None:
-        raise RuntimeError("failed to resolve user_id for external_user_id")
-    return user_id
+@app.post("/api/vault/admin/imports/csv", response_model=AdminImportResponse)
+async def admin_imports_csv(
+    request: Request,
+    response: Response,
+    mode: str = "APPLY",
+    background: bool = False,
+    _auth: str = Depends(verify_admin_password),
+):
+    """Stream a CSV body (Content-Type: text/csv) into the admin import pipeline.
+
+    Header row may use the Korean column names (아이디, 닉네임, 입금액, ...) or field names; a UTF-8 BOM is ignored.
+    Rows are parsed as they arrive and every IMPORT_CHUNK_SIZE rows are applied (or, with background=true, queued
+    for app/worker.py and answered with 202 + job_id) in their own transaction on a briefly held pooled connection,
+    so memory is bounded by the chunk size: duplicate external_user_ids are only dropped within a chunk (a later
+    chunk re-applies its row), and only the first IMPORT_MAX_REPORTED_ERRORS row errors are listed (error_count has all).
+    The idempotency hash covers a SHA-256 of the streamed body; a reused key with a different body gets 409.
+    """
+    mode = (mode or "APPLY").upper()
+    if mode not in {"APPLY", "SHADOW"}:
+        raise HTTPException(status_code=400, detail="INVALID_MODE")
+    content_type = (request.headers.get("content-type") or "").split(";")[0].strip().lower()
+    if content_type not in {"text/csv", "application/csv", "text/plain"}:
+        raise HTTPException(status_code=415, detail="UNSUPPORTED_MEDIA_TYPE")
 
+    key = _validate_idempotency_key(request.headers.get("x-idempotency-key"))
+    scope = _idempotency_scope(request)
+    endpoint = "/api/vault/admin/imports/csv"
+    background_job_id = _generate_job_id() if background and mode != "SHADOW" else None
+    digest = hashlib.sha256()
+
+    def _request_hash(body_sha256: str | None) -> str:
+        return _hash_request_body({"mode": mode, "background": background, "body_sha256": body_sha256})
+
+    async def _body():
+        async for part in request.stream():
+            digest.update(part)
+            yield part
+
+    async with db.get_async_conn() as conn:
+        idem = await conn.run(_csv_import_begin, key=key, scope=scope, endpoint=endpoint, request_hash=_request_hash(None))
+    if idem["status"] == "in_progress":
+        raise HTTPException(status_code=409, detail="IDEMPOTENCY_IN_PROGRESS")
+    if idem["status"] == "done":
+        async for _ in _body():
+            pass
+        if idem["request_hash"] != _request_hash(digest.hexdigest()):
+            raise HTTPException(status_code=409, detail="IDEMPOTENCY_KEY_REUSE")
+        response.headers["Idempotency-Status"] = "replayed"
+        return AdminImportResponse(**idem["response_body"])
+
+    columns: dict[int, str] | None = None
+    errors: list[dict[str, Any]] = []
+    error_count = 0
+    dedup_removed = 0
+    total = 0
+    seen: set[str] = set()
+    chunk: list[tuple[int, Any, str]] = []
+    chunk_stats: list[dict[str, Any]] = []
+    target_user_ids: list[int] = []
 
-def _parse_joined_date(value: str | None):
-    if value is None:
-        return None
-    v = str(value).strip()
-    if not v:
-        return None
-    try:
-        from datetime import date
+    def _error(row_index: int, external_user_id: str | None, code: str, detail: Any = None):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < config.IMPORT_MAX_REPORTED_ERRORS:
+            errors.append({"row_index": row_index, "external_user_id": external_user_id, "code": code, "detail": detail})
 
-        return date.fromisoformat(v)
+    async def _flush():
+        if mode == "SHADOW":
+            stats = {"processed": len(chunk), "unchanged": 0, "identity_created": 0, "vault_rows_updated": 0, "target_user_ids": []}
+        else:
+            async with db.get_async_conn() as conn:
+                if background_job_id:
+                    await conn.run(
+                        _csv_import_enqueue_chunk,
+                        chunk,
+                        job_id=background_job_id,
+                        key=key,
+                        scope=scope,
+                        endpoint=endpoint,
+                        chunk_index=len(chunk_stats),
+                        mode=mode,
+                    )
+                    stats = {"processed": 0, "unchanged": 0, "identity_created": 0, "vault_rows_updated": 0, "target_user_ids": []}
+                else:
+                    stats = await conn.run(_csv_import_apply_chunk, chunk, key=key, scope=scope, endpoint=endpoint)
+        target_user_ids.extend(stats.pop("target_user_ids")[: max(0, 1000 - len(target_user_ids))])
+        stats["rows"] = len(chunk)
+        chunk_stats.append(stats)
+        chunk.clear()
+        seen.clear()
+
+    try:
+        async for record in _iter_csv_records(_body()):
+            if columns is None:
+                columns = _csv_import_header_map(record)
+                continue
+            idx = total
+            total += 1
+            fields = {name: record[i] for i, name in columns.items() if i < len(record)}
+            ext = _normalize_external_user_id(fields.get("external_user_id"))
+            if not ext:
+                _error(idx, None, "MISSING_EXTERNAL_USER_ID")
+                continue
+            try:
+                _parse_joined_date(fields.get("joined_at"))
+            except HTTPException:
+                _error(idx, ext, "INVALID_JOINED_DATE", fields.get("joined_at"))
+                continue
+            if ext in seen:
+                dedup_removed += 1
+                continue
+            seen.add(ext)
+            chunk.append((idx, DailyUserImportRow.model_construct(**fields), ext))
+            if len(chunk) >= config.IMPORT_CHUNK_SIZE:
+                await _flush()
+
+        if not total:
+            raise HTTPException(status_code=400, detail="EMPTY_ROWS")
+        if chunk:
+            await _flush()
+
+        async with db.get_async_conn() as conn:
+            status_code, response_body = await conn.run(
+                _csv_import_finish,
+                key=key,
+                scope=scope,
+                endpoint=endpoint,
+                request_hash=_request_hash(digest.hexdigest()),
+                mode=mode,
+                total=total,
+                chunk_stats=chunk_stats,
+                errors=errors,
+                error_count=error_count,
+                dedup_removed=dedup_removed,
+                target_user_ids=target_user_ids,
+                admin_user=request.client.host if request.client else "unknown",
+                background_job_id=background_job_id if chunk_stats else None,
+            )
     except Exception:
-        raise HTTPException(status_code=400, detail="INVALID_JOINED_DATE")
+        async with db.get_async_conn() as conn:
+            await conn.run(
+                _csv_import_abort,
+                key=key,
+                scope=scope,
+                endpoint=endpoint,
+                background_job_id=background_job_id,
+                chunk_total=len(chunk_stats),
+                total=total,
+            )
+        raise
 
+    response.status_code = status_code
+    response.headers["Idempotency-Status"] = "recorded"
+    return AdminImportResponse(**response_body)
 
-def _resolve_user_id(
-    cur,
-    *,
-    user_id: int | None,
-    external_user_id: str | None,
-    default_user_id: int | None,
-    create_if_missing: bool,
-) -> int:
-    ext = _normalize_external_user_id(external_user_id)
-    if ext:
-        if create_if_missing:
-            return _get_or_create_user_id_by_external_user_id(cur, ext)
-        resolved = _get_user_id_by_external_user_id(cur, ext)
-        if resolved is None:
-            raise HTTPException(status_code=404, detail="EXTERNAL_USER_NOT_FOUND")
-        return resolved
-
-    if user_id is not None:
-        return int(user_id)
-    if default_user_id is None:
-        raise HTTPException(status_code=400, detail="USER_REQUIRED")
-    return int(default_user_id)
-
-
-def _resolve_user_ids_by_external_user_ids(cur, external_user_ids: list[str]) -> list[int]:
-    cleaned = [str(v).strip() for v in (external_user_ids or []) if str(v).strip()]
-    if not cleaned:
-        return []
 
-    cur.execute(
-        """
-        SELECT external_user_id, user_id
-          FROM user_identity
-         WHERE external_user_id = ANY(%s)
-        """,
-        (cleaned,),
-    )
-    rows = cur.fetchall() or []
-    mapping = {str(ext): int(uid) for ext, uid in rows}
-    missing = [ext for ext in cleaned if ext not in mapping]
-    if missing:
-        raise HTTPException(status_code=404, detail="EXTERNAL_USER_IDS_NOT_FOUND")
-    return [mapping[ext] for ext in cleaned]
+@app.post("/api/vault/admin/imports/sessions", response_model=ImportSessionResponse)
+def admin_import_session_create(
+    body: ImportSessionCreateRequest, request: Request, response: Response, _auth: str = Depends(verify_admin_password)
+):
+    """Open a resumable import session; upload chunks with PUT .../chunks/{n}, then POST .../commit."""
+    key = _validate_idempotency_key(request.headers.get("x-idempotency-key"))
+    scope = _idempotency_scope(request)
+    endpoint = "/api/vault/admin/imports/sessions"
+    request_hash = _hash_request_body(body.model_dump())
 
+    with db.get_conn() as conn:
+        cur = conn.cursor()
+        _apply_job_timeouts(cur)
+        idem = _idempotency_start(cur, key=key, scope=scope, endpoint=endpoint, request_hash=request_hash)
+        if idem["status"] == "replayed":
+            response.headers["Idempotency-Status"] = "replayed"
+            return ImportSessionResponse(**idem["response_body"])
+        if idem["status"] == "in_progress":
+            raise HTTPException(status_code=409, detail="IDEMPOTENCY_IN_PROGRESS")
 
-def _bulk_get_or_create_user_ids_by_external_user_ids(cur, external_user_ids: list[str]) -> dict[str, int]:
-    cleaned = [str(v).strip() for v in (external_user_ids or []) if str(v).strip()]
-    if not cleaned:
-        return {}
+        session_id = _generate_job_id()
+        _create_import_session(cur, session_id=session_id, key=key, chunk_total=body.chunk_total)
+        response_body = {
+            "session_id": session_id,
+            "status": "RUNNING",
+            "chunk_total": body.chunk_total,
+            "missing_chunks": list(range(body.chunk_total or 0)),
+        }
+        _log_admin_action(
+            conn=conn,
+            admin_user=request.client.host if request.client else "unknown",
+            action="ADMIN_IMPORT_SESSION_CREATE",
+            endpoint=endpoint,
+            target_user_ids=None,
+            request_id=key,
+            request_body=body.model_dump(),
+            response_status="SUCCESS",
+            response_summary={"session_id": session_id},
+            job_id=session_id,
+        )
+        _idempotency_finish(cur, key=key, scope=scope, endpoint=endpoint, response_status=200, response_body=response_body)
+        conn.commit()
 
-    # Insert missing mappings (idempotent)
-    cur.execute(
-        """
-        INSERT INTO user_identity (external_user_id)
-        SELECT DISTINCT x
-          FROM unnest(%s::text[]) AS x
-         WHERE x IS NOT NULL AND btrim(x) <> ''
-        ON CONFLICT (external_user_id) DO NOTHING
-        """,
-        (cleaned,),
-    )
-    created = int(cur.rowcount or 0)
+    response.headers["Idempotency-Status"] = "recorded"
+    return ImportSessionResponse(**response_body)
 
-    cur.execute(
-        """
-        SELECT external_user_id, user_id
-          FROM user_identity
-         WHERE external_user_id = ANY(%s)
-        """,
-        (cleaned,),
-    )
-    rows = cur.fetchall() or []
-    mapping = {str(ext): int(uid) for ext, uid in rows}
 
-    missing = [ext for ext in cleaned if ext not in mapping]
-    if missing:
-        raise HTTPException(status_code=500, detail="IDENTITY_BULK_RESOLVE_FAILED")
+@app.get("/api/vault/admin/imports/sessions/{session_id}", response_model=ImportSessionResponse)
+def admin_import_session_get(session_id: str, _auth: str = Depends(verify_admin_password)):
+    """Session progress; a client resuming after a crash re-sends `missing_chunks`."""
+    with db.get_conn() as conn:
+        cur = conn.cursor()
+        session = _lock_import_session(cur, session_id)
+        summary = _import_session_summary(cur, session_id, session["chunk_total"])
+    return ImportSessionResponse(session_id=session_id, status=session["status"], chunk_total=session["chunk_total"], **summary)
+
+
+def _import_session_upload(conn, *, session_id: str, chunk_index: int, checksum: str, rows: list, key: str, scope: str, endpoint: str, request_hash: str):
+    cur = conn.cursor()
+    _apply_job_timeouts(cur)
+    idem = _idempotency_start(cur, key=key, scope=scope, endpoint=endpoint, request_hash=request_hash)
+    if idem["status"] != "recorded":
+        return idem
+
+    session = _lock_import_session(cur, session_id)
+    if session["status"] not in {"PENDING", "RUNNING"}:
+        raise HTTPException(status_code=409, detail="IMPORT_SESSION_CLOSED")
+    if session["chunk_total"] is not None and chunk_index >= session["chunk_total"]:
+        raise HTTPException(status_code=400, detail="CHUNK_INDEX_OUT_OF_RANGE")
+
+    stats = _apply_session_chunk(cur, session_id, chunk_index, checksum, rows)
+    response_body = {"session_id": session_id, "chunk_index": chunk_index, "checksum": checksum, **stats}
+    _idempotency_finish(cur, key=key, scope=scope, endpoint=endpoint, response_status=200, response_body=response_body)
+    conn.commit()
+    return {"status": "recorded", "response_body": response_body}
+
+
+@app.put("/api/vault/admin/imports/sessions/{session_id}/chunks/{chunk_index}", response_model=ImportSessionChunkResponse)
+async def admin_import_session_chunk(
+    session_id: str,
+    chunk_index: int,
+    request: Request,
+    response: Response,
+    _auth: str = Depends(verify_admin_password),
+):
+    """Upload chunk N of a session as JSON `{"rows": [...]}`.
+
+    `X-Content-SHA256` must be the hex SHA-256 of the exact request body. Each chunk is
+    applied in its own transaction; retries of an applied chunk are answered from the
+    stored result instead of being re-applied.
+    """
+    if chunk_index < 0:
+        raise HTTPException(status_code=400, detail="CHUNK_INDEX_OUT_OF_RANGE")
+    raw = await request.body()
+    checksum = (request.headers.get("x-content-sha256") or "").strip().lower()
+    if not checksum:
+        raise HTTPException(status_code=400, detail="MISSING_CHECKSUM")
+    if hashlib.sha256(raw).hexdigest() != checksum:
+        raise HTTPException(status_code=400, detail="CHECKSUM_MISMATCH")
+    try:
+        body = ImportSessionChunkRequest.model_validate_json(raw)
+    except ValidationError as exc:
+        raise RequestValidationError(exc.errors())
+    if not body.rows:
+        raise HTTPException(status_code=400, detail="EMPTY_ROWS")
+    if len(body.rows) > config.IMPORT_CHUNK_SIZE:
+        raise HTTPException(status_code=400, detail="CHUNK_TOO_LARGE")
+
+    key = _validate_idempotency_key(request.headers.get("x-idempotency-key"))
+    scope = _idempotency_scope(request)
+    endpoint = "/api/vault/admin/imports/sessions/chunks"
+    request_hash = _hash_request_body({"session_id": session_id, "chunk_index": chunk_index, "checksum": checksum})
+
+    async with db.get_async_conn() as conn:
+        idem = await conn.run(
+            _import_session_upload,
+            session_id=session_id,
+            chunk_index=chunk_index,
+            checksum=checksum,
+            rows=body.rows,
+            key=key,
+            scope=scope,
+            endpoint=endpoint,
+            request_hash=request_hash,
+        )
+    if idem["status"] == "in_progress":
+        raise HTTPException(status_code=409, detail="IDEMPOTENCY_IN_PROGRESS")
+    response.headers["Idempotency-Status"] = idem["status"]
+    return ImportSessionChunkResponse(**idem["response_body"])
+
 
-    mapping["__created_count__"] = created
-    return mapping
+@app.post("/api/vault/admin/imports/sessions/{session_id}/commit", response_model=ImportSessionResponse)
+def admin_import_session_commit(
+    session_id: str, request: Request, response: Response, _auth: str = Depends(verify_admin_password)
+):
+    """Close the session once every chunk is applied (409 IMPORT_SESSION_INCOMPLETE otherwise; GET lists missing_chunks)."""
+    key = _validate_idempotency_key(request.headers.get("x-idempotency-key"))
+    scope = _idempotency_scope(request)
+    endpoint = "/api/vault/admin/imports/sessions/commit"
+    request_hash = _hash_request_body({"session_id": session_id})
+
+    with db.get_conn() as conn:
+        cur = conn.cursor()
+        _apply_job_timeouts(cur)
+        idem = _idempotency_start(cur, key=key, scope=scope, endpoint=endpoint, request_hash=request_hash)
+        if idem["status"] == "replayed":
+            response.headers["Idempotency-Status"] = "replayed"
+            return ImportSessionResponse(**idem["response_body"])
+        if idem["status"] == "in_progress":
+            raise HTTPException(status_code=409, detail="IDEMPOTENCY_IN_PROGRESS")
+
+        # Exclusive lock: waits for in-flight chunk uploads and rejects later ones.
+        session = _lock_import_session(cur, session_id, exclusive=True)
+        if session["status"] not in {"PENDING", "RUNNING"}:
+            raise HTTPException(status_code=409, detail="IMPORT_SESSION_CLOSED")
+        summary = _import_session_summary(cur, session_id, session["chunk_total"])
+        if not summary["chunks_applied"]:
+            raise HTTPException(status_code=400, detail="IMPORT_SESSION_EMPTY")
+        if summary["missing_chunks"]:
+            raise HTTPException(status_code=409, detail="IMPORT_SESSION_INCOMPLETE")
+
+        chunk_total = len(summary["chunks_applied"])
+        cur.execute(
+            """
+            UPDATE admin_jobs
+               SET status='DONE',
+                   target_count=%s,
+                   processed=%s,
+                   failed=%s,
+                   payload = payload || %s,
+                   updated_at=NOW()
+             WHERE job_id=%s
+            """,
+            (
+                summary["rows"],
+                summary["processed"],
+                summary["rows"] - summary["processed"],
+                Json({"chunk_total": chunk_total}),
+                session_id,
+            ),
+        )
+        response_body = {"session_id": session_id, "status": "DONE", "chunk_total": chunk_total, **summary}
+        _log_admin_action(
+            conn=conn,
+            admin_user=request.client.host if request.client else "unknown",
+            action="ADMIN_IMPORTS",
+            endpoint=endpoint,
+            target_user_ids=None,
+            request_id=key,
+            request_body={"session_id": session_id},
+            response_status="SUCCESS",
+            response_summary={k: summary[k] for k in ("processed", "unchanged", "identity_created", "vault_rows_updated")},
+            job_id=session_id,
+        )
+        _idempotency_finish(cur, key=key, scope=scope, endpoint=endpoint, response_status=200, response_body=response_body)
+        conn.commit()
+
+    response.headers["Idempotency-Status"] = "recorded"
+    return ImportSessionResponse(**response_body)
+
+
+def _normalize_external_user_id(value: str | None) -> str | None:
+    if value is None:
+        return None
+    v = str(value).strip()
+    return v or None
+
+
+def _parse_joined_date(value: str | None):
+    if value is None:
+        return None
+    v = str(value).strip()
+    if not v:
+        return None
+    try:
+        from datetime import date
+
+        return date.fromisoformat(v)
+    except Exception:
+        raise HTTPException(status_code=400, detail="INVALID_JOINED_DATE")
 
 
 @app.post("/api/vault/user-identity/bulk", response_model=UserIdentityBulkResponse)
@@ -1231,6 +1498,8 @@ def _ensure_schema():
 
         cur.execute("ALTER TABLE admin_audit_log ADD COLUMN IF NOT EXISTS job_id TEXT")
         cur.execute("ALTER TABLE admin_audit_log ADD COLUMN IF NOT EXISTS idempotency_key TEXT")
+        # 어드민 목록 keyset 페이지네이션 정렬 키
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_admin_audit_log_created_at_id ON admin_audit_log (created_at, id)")
 
         cur.execute(
             """
@@ -1268,6 +1537,8 @@ def _ensure_schema():
             """
         )
         cur.execute("CREATE INDEX IF NOT EXISTS idx_admin_jobs_status ON admin_jobs (status)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_admin_jobs_created_at_job_id ON admin_jobs (created_at, job_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_admin_jobs_type_created_at ON admin_jobs (type, created_at, job_id)")
 
         cur.execute(
             """
@@ -1282,6 +1553,31 @@ def _ensure_schema():
             """
         )
         cur.execute("CREATE INDEX IF NOT EXISTS idx_admin_job_items_job_id ON admin_job_items (job_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_admin_job_items_job_id_id ON admin_job_items (job_id, id)")
+
+        # Background import chunks (admin imports with background=true), applied by app/worker.py.
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS admin_import_chunks (
+                job_id TEXT NOT NULL REFERENCES admin_jobs(job_id) ON DELETE CASCADE,
+                chunk_index INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'PENDING',
+                row_count INTEGER NOT NULL DEFAULT 0,
+                processed INTEGER NOT NULL DEFAULT 0,
+                rows JSONB,
+                error TEXT,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (job_id, chunk_index)
+            );
+            """
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_admin_import_chunks_pending ON admin_import_chunks (created_at, chunk_index) WHERE status='PENDING'"
+        )
+        # Resumable import sessions record each applied chunk's body checksum and result.
+        cur.execute("ALTER TABLE admin_import_chunks ADD COLUMN IF NOT EXISTS checksum TEXT")
+        cur.execute("ALTER TABLE admin_import_chunks ADD COLUMN IF NOT EXISTS stats JSONB")
 
         cur.execute(
             """
@@ -1353,6 +1649,34 @@ def _ensure_schema():
             """
         )
         cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_notifications_queue_dedup_key ON notifications_queue (dedup_key)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_notifications_queue_status_id ON notifications_queue (status, id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_notifications_queue_user_id_id ON notifications_queue (user_id, id)")
+        cur.execute("ALTER TABLE notifications_queue ADD COLUMN IF NOT EXISTS retry_count INTEGER NOT NULL DEFAULT 0")
+        cur.execute("ALTER TABLE notifications_queue ADD COLUMN IF NOT EXISTS last_error TEXT")
+        cur.execute("ALTER TABLE notifications_queue ADD COLUMN IF NOT EXISTS sent_at TIMESTAMPTZ")
+        # 발송 워커 claim 경로: 대기 중인 행만 due 순서로
+        cur.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_notifications_queue_due
+                ON notifications_queue ((COALESCE(scheduled_at, created_at)), id)
+             WHERE status IN ('PENDING','RETRYING')
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS notifications_dlq (
+                id BIGSERIAL PRIMARY KEY,
+                notification_id BIGINT NOT NULL,
+                user_id INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                payload JSONB,
+                error TEXT,
+                retry_count INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            );
+            """
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_notifications_dlq_notification_id ON notifications_dlq (notification_id)")
 
         cur.execute(
             """
@@ -1371,6 +1695,15 @@ def _ensure_schema():
             """
         )
         cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_compensation_queue_req_ext ON compensation_queue (request_id, external_service)")
+        cur.execute("ALTER TABLE compensation_queue ADD COLUMN IF NOT EXISTS last_error TEXT")
+        # 보상 워커 claim 경로
+        cur.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_compensation_queue_due
+                ON compensation_queue (next_retry_at, id)
+             WHERE status IN ('PENDING','RETRYING')
+            """
+        )
 
         # Notification templates (used by /api/vault/notify when message_override is not provided)
         cur.execute(
@@ -1392,11 +1725,133 @@ def _ensure_schema():
         )
         cur.execute("CREATE INDEX IF NOT EXISTS idx_notification_templates_enabled ON notification_templates (enabled)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_notification_templates_priority ON notification_templates (priority DESC)")
+        # 템플릿 변경 시 각 프로세스의 템플릿 캐시 무효화 (app/services/notification_templates.py)
+        cur.execute(
+            """
+            CREATE OR REPLACE FUNCTION notify_notification_templates_changed() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP <> 'INSERT' THEN
+                    PERFORM pg_notify('notification_templates_changed', OLD.type);
+                END IF;
+                IF TG_OP <> 'DELETE' AND (TG_OP = 'INSERT' OR NEW.type IS DISTINCT FROM OLD.type) THEN
+                    PERFORM pg_notify('notification_templates_changed', NEW.type);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        cur.execute("DROP TRIGGER IF EXISTS trg_notification_templates_changed ON notification_templates")
+        cur.execute(
+            """
+            CREATE TRIGGER trg_notification_templates_changed
+            AFTER INSERT OR UPDATE OR DELETE ON notification_templates
+            FOR EACH ROW EXECUTE FUNCTION notify_notification_templates_changed()
+            """
+        )
+
+        # vault_status / user_admin_snapshot 변경 시 /status/stream 구독자 깨우기 (app/services/status_stream.py).
+        # 문장 단위 트리거: 변경된 user_id 목록을 한 번에 보내고, 대량 변경은 '*'(전체 무효화).
+        cur.execute(
+            """
+            CREATE OR REPLACE FUNCTION notify_vault_status_changed() RETURNS trigger AS $$
+            DECLARE
+                n integer;
+                ids text;
+            BEGIN
+                SELECT COUNT(*), string_agg(DISTINCT user_id::text, ',')
+                  INTO n, ids
+                  FROM (SELECT user_id FROM changed_rows LIMIT 201) c;
+                IF n > 200 THEN
+                    PERFORM pg_notify('vault_status_changed', '*');
+                ELSIF n > 0 THEN
+                    PERFORM pg_notify('vault_status_changed', ids);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        for table in ("vault_status", "user_admin_snapshot"):
+            for op, transition in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+                trigger = f"trg_{table}_status_changed_{op.lower()}"
+                cur.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+                cur.execute(
+                    f"""
+                    CREATE TRIGGER {trigger}
+                    AFTER {op} ON {table}
+                    REFERENCING {transition} TABLE AS changed_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION notify_vault_status_changed()
+                    """
+                )
+
+        # user_identity 변경 시 각 프로세스의 identity 캐시 갱신 (app/services/user_identity_service.py).
+        # INSERT → '' (음성 캐시 폐기), DELETE/UPDATE → 이전 external_user_id JSON 배열, 대량/긴 payload는 '*'.
+        cur.execute(
+            """
+            CREATE OR REPLACE FUNCTION notify_user_identity_changed() RETURNS trigger AS $$
+            DECLARE
+                n integer;
+                ids text;
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    IF EXISTS (SELECT 1 FROM changed_rows) THEN
+                        PERFORM pg_notify('user_identity_changed', '');
+                    END IF;
+                    RETURN NULL;
+                END IF;
+                SELECT COUNT(*), json_agg(external_user_id)::text
+                  INTO n, ids
+                  FROM (SELECT external_user_id FROM changed_rows LIMIT 101) c;
+                IF n > 100 OR length(ids) > 7000 THEN
+                    PERFORM pg_notify('user_identity_changed', '*');
+                ELSIF n > 0 THEN
+                    PERFORM pg_notify('user_identity_changed', ids);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        for op, transition in (("INSERT", "NEW"), ("UPDATE", "OLD"), ("DELETE", "OLD")):
+            trigger = f"trg_user_identity_changed_{op.lower()}"
+            cur.execute(f"DROP TRIGGER IF EXISTS {trigger} ON user_identity")
+            cur.execute(
+                f"""
+                CREATE TRIGGER {trigger}
+                AFTER {op} ON user_identity
+                REFERENCING {transition} TABLE AS changed_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION notify_user_identity_changed()
+                """
+            )
+
+        # /status ETag은 updated_at 쌍으로 만든다 → 실제 변경이 있는 모든 UPDATE에서 updated_at 갱신
+        cur.execute(
+            """
+            CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger AS $$
+            BEGIN
+                IF NEW IS DISTINCT FROM OLD THEN
+                    NEW.updated_at := clock_timestamp();
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        for table in ("vault_status", "user_admin_snapshot"):
+            cur.execute(f"DROP TRIGGER IF EXISTS trg_{table}_touch_updated_at ON {table}")
+            cur.execute(
+                f"""
+                CREATE TRIGGER trg_{table}_touch_updated_at
+                BEFORE UPDATE ON {table}
+                FOR EACH ROW EXECUTE FUNCTION touch_updated_at()
+                """
+            )
 
         conn.commit()
 
 @app.post("/api/vault/extend-expiry", response_model=ExtendExpiryResponse)
-async def extend_expiry(body: ExtendExpiryRequest, request: Request, response: Response, _auth: str = Depends(verify_admin_password)):
+def extend_expiry(body: ExtendExpiryRequest, request: Request, response: Response, _auth: str = Depends(verify_admin_password)):
     """?영/?로모션 만료 ?장. shadow=true?미적???리?"""
     request_id = _validate_request_id(getattr(body, "request_id", None))
     if body.scope not in {"ALL_ACTIVE", "USER_IDS"}:
@@ -1427,6 +1882,8 @@ async def extend_expiry(body: ExtendExpiryRequest, request: Request, response: R
         if idem["status"] == "in_progress":
             raise HTTPException(status_code=409, detail="IDEMPOTENCY_IN_PROGRESS")
 
+        where_sql = _EXTENDABLE_TIER_SQL
+        where_params: list[Any] = []
         if body.scope == "USER_IDS":
             resolved_user_ids: list[int] = []
             if user_ids:
@@ -1434,29 +1891,12 @@ async def extend_expiry(body: ExtendExpiryRequest, request: Request, response: R
             if external_user_ids:
                 resolved_user_ids.extend(_resolve_user_ids_by_external_user_ids(cur, external_user_ids))
             resolved_user_ids = _dedupe_int_list(resolved_user_ids, max_items=10000)
-            cur.execute(
-                """
-                SELECT user_id, expires_at
-                  FROM vault_status
-                 WHERE user_id = ANY(%s)
-                   AND (gold_status!='CLAIMED' OR platinum_status!='CLAIMED' OR diamond_status!='CLAIMED')
-                """,
-                (resolved_user_ids,),
-            )
-            rows = cur.fetchall()
-        else:
-            cur.execute(
-                """
-                SELECT user_id, expires_at
-                  FROM vault_status
-                 WHERE (gold_status!='CLAIMED' OR platinum_status!='CLAIMED' OR diamond_status!='CLAIMED')
-                """,
-            )
-            rows = cur.fetchall()
+            where_sql = "vs.user_id = ANY(%s) AND " + where_sql
+            where_params = [resolved_user_ids]
 
         if body.shadow:
-            sample_ids = [r[0] for r in rows[:10]]
-            response_body = {"shadow": True, "candidates": len(rows), "sample_user_ids": sample_ids}
+            candidates, sample_ids = _count_extend_expiry_candidates(cur, joins="", where_sql=where_sql, params=where_params)
+            response_body = {"shadow": True, "candidates": candidates, "sample_user_ids": sample_ids}
             _idempotency_finish(
                 cur,
                 key=key,
@@ -1469,7 +1909,32 @@ async def extend_expiry(body: ExtendExpiryRequest, request: Request, response: R
             response.headers["Idempotency-Status"] = "recorded"
             return ExtendExpiryResponse(**response_body)
 
-        if not rows:
+        # Batches commit on this connection (the IN_PROGRESS key with the first one) and renew the key's
+        # lease; on failure the key is released, and after a crash it is taken over once the lease runs
+        # out. Either way a retry resumes, skipping users already in the extension log.
+        try:
+            result = _extend_expiry_batched(
+                conn,
+                joins="",
+                where_sql=where_sql,
+                params=where_params,
+                extend_hours=body.extend_hours,
+                reason=body.reason,
+                request_id=request_id,
+                now=now,
+                metadata={"base_request_id": request_id, "scope": body.scope, "extend_hours": body.extend_hours},
+                heartbeat=partial(_idempotency_touch, key=key, scope=scope, endpoint=endpoint),
+            )
+        except Exception:
+            conn.rollback()
+            _idempotency_release(cur, key=key, scope=scope, endpoint=endpoint)
+            conn.commit()
+            raise
+        updated = result["updated"]
+        new_expires_at = result["new_expires_at"]
+        target_ids = result["user_ids"]
+
+        if not updated:
             response_body = {"shadow": False, "updated": 0, "new_expires_at": None}
             _idempotency_finish(
                 cur,
@@ -1483,62 +1948,8 @@ async def extend_expiry(body: ExtendExpiryRequest, request: Request, response: R
             response.headers["Idempotency-Status"] = "recorded"
             return ExtendExpiryResponse(**response_body)
 
-        update_values = []
-        log_values = []
-        new_expires_at = None
-        for user_id, expires_at in rows:
-            new_expires = expires_at + timedelta(hours=body.extend_hours)
-            new_expires_at = new_expires
-            update_values.append((user_id, new_expires, body.reason, now))
-            log_values.append(
-                (
-                    user_id,
-                    expires_at,
-                    new_expires,
-                    body.reason,
-                    f"{request_id}:{user_id}",
-                    Json(
-                        {
-                            "base_request_id": request_id,
-                            "scope": body.scope,
-                            "extend_hours": body.extend_hours,
-                        }
-                    ),
-                )
-            )
-
-        execute_values(
-            cur,
-            """
-            UPDATE vault_status AS vs
-               SET expires_at=data.new_expires_at,
-                   expiry_extend_count=vs.expiry_extend_count+1,
-                   last_extension_reason=data.reason,
-                   last_extension_at=data.now
-              FROM (VALUES %s) AS data(user_id, new_expires_at, reason, now)
-             WHERE vs.user_id = data.user_id
-            """,
-            update_values,
-            template="(%s,%s,%s,%s)",
-        )
-
-        execute_values(
-            cur,
-            """
-            INSERT INTO vault_expiry_extension_log
-                (user_id, prev_expires_at, new_expires_at, reason, request_id, shadow, metadata)
-            VALUES %s
-            ON CONFLICT (request_id) DO NOTHING
-            """,
-            log_values,
-            template="(%s,%s,%s,%s,%s,false,%s)",
-        )
-
-        updated = len(update_values)
-        
         # 감사 로그 기록
         admin_user = request.client.host if request.client else "unknown"
-        target_ids = [r[0] for r in rows]
         _log_admin_action(
             conn=conn,
             admin_user=admin_user,
@@ -1597,27 +2008,6 @@ async def notify(body: NotifyRequest, request: Request, response: Response, _aut
             raise HTTPException(status_code=400, detail="INVALID_SCHEDULED_AT")
     if scheduled_at is None:
         scheduled_at = now
-    dedup_suffix = body.variant_id or "base"
-    dedup_day = scheduled_at.date()
-    inserted = 0
-    
-    # 메시지 ?플?로드
-    template_message = None
-    with db.get_conn() as template_conn:
-        tc = template_conn.cursor()
-        tc.execute(
-            "SELECT title, body, cta_text, icon_emoji, category FROM notification_templates WHERE type=%s AND enabled=TRUE",
-            (body.type,)
-        )
-        template_row = tc.fetchone()
-        if template_row:
-            template_message = {
-                "title": template_row[0],
-                "body": template_row[1],
-                "cta_text": template_row[2],
-                "icon_emoji": template_row[3],
-                "category": template_row[4]
-            }
     
     with db.get_conn() as conn:
         cur = conn.cursor()
@@ -1635,30 +2025,28 @@ async def notify(body: NotifyRequest, request: Request, response: Response, _aut
         if external_user_ids:
             resolved_user_ids.extend(_resolve_user_ids_by_external_user_ids(cur, external_user_ids))
         resolved_user_ids = _dedupe_int_list(resolved_user_ids, max_items=10000)
-        for uid in resolved_user_ids or []:
-            dedup_key = f"{body.type}:{uid}:{dedup_suffix}:{dedup_day}"
-            # 커스? 메시지 ?는 ?플?메시지 ?용
-            payload_dict = {
-                "type": body.type,
-                "variant_id": body.variant_id,
-            }
-            if getattr(body, "message_override", None):
-                payload_dict["message"] = body.message_override
-            elif template_message:
+        payload_dict = {
+            "type": body.type,
+            "variant_id": body.variant_id,
+        }
+        # 커스텀 메시지 또는 템플릿 메시지 사용
+        if getattr(body, "message_override", None):
+            payload_dict["message"] = body.message_override
+        else:
+            template_message = _template_cache.get(cur, body.type)
+            if template_message:
                 payload_dict.update(template_message)
-            
-            cur.execute(
-                """
-                INSERT INTO notifications_queue
-                    (user_id, type, vault_type, variant_id, dedup_key, payload, scheduled_at, status)
-                VALUES (%s, %s, NULL, %s, %s, %s, %s, 'PENDING')
-                ON CONFLICT (dedup_key) DO NOTHING
-                """,
-                (uid, body.type, body.variant_id, dedup_key, Json(payload_dict), scheduled_at),
-            )
-            if cur.rowcount > 0:
-                inserted += 1
-        
+        inserted = _enqueue_notifications(
+            cur,
+            user_ids=resolved_user_ids,
+            notify_type=body.type,
+            variant_id=body.variant_id,
+            payload=payload_dict,
+            scheduled_at=scheduled_at,
+        )
+        if inserted:
+            _wake_workers(cur, "notifications")
+
         # 감사 로그 기록
         admin_user = request.client.host if request.client else "unknown"
         _log_admin_action(
@@ -1699,8 +2087,14 @@ async def list_notifications(
     page: int = 1,
     page_size: int = 50,
     order: str = "desc",
+    cursor: str | None = None,
+    count: str = "exact",
+    format: str = "json",
     _auth: str = Depends(verify_admin_password),
 ):
+    fmt = (format or "json").lower()
+    if fmt not in {"json", "csv"}:
+        raise HTTPException(status_code=400, detail="INVALID_FORMAT")
     allowed_status = {"PENDING", "SENT", "FAILED", "DLQ", "RETRYING", "CANCELED"}
     if status and status not in allowed_status:
         raise HTTPException(status_code=400, detail="INVALID_STATUS")
@@ -1714,6 +2108,7 @@ async def list_notifications(
     page_size = 200 if page_size > 200 else page_size
     offset = (page - 1) * page_size
     order_sql = "DESC" if order.lower() != "asc" else "ASC"
+    count_mode = _validate_count_mode(count)
 
     conditions: list[str] = []
     params: list = []
@@ -1725,7 +2120,9 @@ async def list_notifications(
         if external_user_id:
             resolved_user_id = _get_user_id_by_external_user_id(cur, external_user_id)
             if resolved_user_id is None:
-                return AdminNotificationsListResponse(total=0, page=page, page_size=page_size, has_more=False, items=[])
+                if fmt != "csv":
+                    return AdminNotificationsListResponse(total=0, page=page, page_size=page_size, has_more=False, items=[])
+                conditions.append("FALSE")
 
         if status:
             conditions.append("nq.status=%s")
@@ -1744,11 +2141,46 @@ async def list_notifications(
         if conditions:
             where_sql = " WHERE " + " AND ".join(conditions)
 
-        cur.execute(
-            f"SELECT COUNT(*) FROM notifications_queue nq {where_sql}",
-            tuple(params),
+        if fmt == "csv":
+            return _csv_response(
+                _stream_csv_rows(
+                    f"""
+                    SELECT nq.id, nq.user_id, ui.external_user_id, nq.type, nq.variant_id, nq.status,
+                           nq.scheduled_at, nq.created_at, nq.payload
+                      FROM notifications_queue nq
+                 LEFT JOIN user_identity ui ON ui.user_id = nq.user_id
+                    {where_sql}
+                  ORDER BY nq.id {order_sql}
+                    """,
+                    params,
+                    header=[
+                        "id", "user_id", "external_user_id", "type", "variant_id", "status",
+                        "scheduled_at", "created_at", "title", "body", "payload",
+                    ],
+                    format_row=lambda row: [
+                        *row[:6],
+                        row[6].isoformat() if row[6] else "",
+                        row[7].isoformat() if row[7] else "",
+                        (row[8] or {}).get("title") or "",
+                        (row[8] or {}).get("body") or "",
+                        json.dumps(row[8] or {}, ensure_ascii=False),
+                    ],
+                ),
+                "notifications.csv",
+            )
+
+        total, estimated = _count_rows(
+            cur, from_sql="FROM notifications_queue nq", where_sql=where_sql, params=params, mode=count_mode
         )
-        total = int(cur.fetchone()[0])
+        probe = cursor is not None or count_mode != "exact"
+
+        # cursor 지정 시 keyset 페이지네이션 (OFFSET 없이 id 기준)
+        if cursor is not None:
+            offset = 0
+            if cursor:
+                conditions.append(_keyset_after(["nq.id"], order_sql))
+                params.extend(_decode_cursor(cursor, tag=f"notifications:{order_sql}", size=1))
+                where_sql = " WHERE " + " AND ".join(conditions)
 
         cur.execute(
             f"""
@@ -1767,7 +2199,7 @@ async def list_notifications(
           ORDER BY nq.id {order_sql}
              LIMIT %s OFFSET %s
             """,
-            tuple(params + [page_size, offset]),
+            tuple(params + [page_size + probe, offset]),
         )
         rows = cur.fetchall() or []
 
@@ -1793,8 +2225,21 @@ async def list_notifications(
         }
         items.append(item)
 
-    has_more = (offset + len(items)) < total
-    return AdminNotificationsListResponse(total=total, page=page, page_size=page_size, has_more=has_more, items=items)
+    if probe:
+        has_more = len(items) > page_size
+        items = items[:page_size]
+    else:
+        has_more = (offset + len(items)) < total
+    next_cursor = _encode_cursor(f"notifications:{order_sql}", items[-1]["id"]) if has_more and items else None
+    return AdminNotificationsListResponse(
+        total=total,
+        total_estimated=estimated,
+        page=page,
+        page_size=page_size,
+        has_more=has_more,
+        items=items,
+        next_cursor=next_cursor,
+    )
 
 
 @app.post("/api/vault/admin/notifications/{notification_id}/retry", response_model=AdminNotificationActionResponse)
@@ -1993,6 +2438,8 @@ async def list_admin_jobs(
     page: int = 1,
     page_size: int = 50,
     order: str = "desc",
+    cursor: str | None = None,
+    count: str = "exact",
     _auth: str = Depends(verify_admin_password),
 ):
     allowed_status = {"PENDING", "RUNNING", "DONE", "FAILED", "CANCELED"}
@@ -2006,6 +2453,7 @@ async def list_admin_jobs(
     page_size = 200 if page_size > 200 else page_size
     offset = (page - 1) * page_size
     order_sql = "DESC" if order.lower() != "asc" else "ASC"
+    count_mode = _validate_count_mode(count)
 
     conditions: list[str] = []
     params: list = []
@@ -2022,17 +2470,23 @@ async def list_admin_jobs(
 
     with db.get_conn() as conn:
         cur = conn.cursor()
-        cur.execute(f"SELECT COUNT(*) FROM admin_jobs {where_sql}", tuple(params))
-        total = int(cur.fetchone()[0])
+        total, estimated = _count_rows(cur, from_sql="FROM admin_jobs", where_sql=where_sql, params=params, mode=count_mode)
+        probe = cursor is not None or count_mode != "exact"
+        if cursor is not None:
+            offset = 0
+            if cursor:
+                conditions.append(_keyset_after(["created_at", "job_id"], order_sql))
+                params.extend(_decode_cursor(cursor, tag=f"jobs:{order_sql}", size=2))
+                where_sql = " WHERE " + " AND ".join(conditions)
         cur.execute(
             f"""
-            SELECT job_id, type, status, request_id, target_count
+            SELECT job_id, type, status, request_id, target_count, created_at
               FROM admin_jobs
               {where_sql}
-          ORDER BY created_at {order_sql}
+          ORDER BY created_at {order_sql}, job_id {order_sql}
              LIMIT %s OFFSET %s
             """,
-            tuple(params + [page_size, offset]),
+            tuple(params + [page_size + probe, offset]),
         )
         rows = cur.fetchall() or []
 
@@ -2046,8 +2500,21 @@ async def list_admin_jobs(
         }
         for row in rows
     ]
-    has_more = (offset + len(items)) < total
-    return AdminJobsListResponse(total=total, page=page, page_size=page_size, has_more=has_more, items=items)
+    if probe:
+        has_more = len(rows) > page_size
+        rows, items = rows[:page_size], items[:page_size]
+    else:
+        has_more = (offset + len(items)) < total
+    next_cursor = _encode_cursor(f"jobs:{order_sql}", rows[-1][5], rows[-1][0]) if has_more and rows else None
+    return AdminJobsListResponse(
+        total=total,
+        total_estimated=estimated,
+        page=page,
+        page_size=page_size,
+        has_more=has_more,
+        items=items,
+        next_cursor=next_cursor,
+    )
 
 
 @app.get("/api/vault/admin/jobs/{job_id}", response_model=AdminJobDetailResponse)
@@ -2087,6 +2554,8 @@ async def list_admin_job_items(
     failed_only: bool = False,
     page: int = 1,
     page_size: int = 50,
+    cursor: str | None = None,
+    count: str = "exact",
     _auth: str = Depends(verify_admin_password),
 ):
     fmt = (format or "json").lower()
@@ -2097,6 +2566,7 @@ async def list_admin_job_items(
     page_size = 1 if page_size < 1 else page_size
     page_size = 200 if page_size > 200 else page_size
     offset = (page - 1) * page_size
+    count_mode = _validate_count_mode(count)
 
     with db.get_conn() as conn:
         cur = conn.cursor()
@@ -2109,53 +2579,48 @@ async def list_admin_job_items(
         if failed_only:
             where_sql += " AND status='FAILED'"
 
-        cur.execute(f"SELECT COUNT(*) FROM admin_job_items {where_sql}", tuple(params))
-        total = int(cur.fetchone()[0])
-
         if fmt == "csv":
-            cur.execute(
-                f"""
-                SELECT id, job_id, user_id, status, error_message, created_at
-                  FROM admin_job_items
-                 {where_sql}
-              ORDER BY id ASC
-                """,
-                tuple(params),
-            )
-            rows = cur.fetchall() or []
-        else:
-            cur.execute(
-                f"""
-                SELECT id, job_id, user_id, status, error_message, created_at
-                  FROM admin_job_items
-                 {where_sql}
-              ORDER BY id ASC
-                 LIMIT %s OFFSET %s
-                """,
-                tuple(params + [page_size, offset]),
-            )
-            rows = cur.fetchall() or []
-
-    if fmt == "csv":
-        buf = io.StringIO()
-        writer = csv.writer(buf)
-        writer.writerow(["job_item_id", "job_id", "user_id", "status", "error_message", "created_at"])
-        for row in rows:
-            writer.writerow(
-                [
-                    row[0],
-                    row[1],
-                    int(row[2]),
-                    row[3],
-                    row[4] or "",
-                    row[5].isoformat() if row[5] else "",
-                ]
+            # server-side cursor로 배치 단위 스트리밍 (전체 행을 메모리에 올리지 않음)
+            return _csv_response(
+                _stream_csv_rows(
+                    f"""
+                    SELECT id, job_id, user_id, status, error_message, created_at
+                      FROM admin_job_items
+                     {where_sql}
+                  ORDER BY id ASC
+                    """,
+                    params,
+                    header=["job_item_id", "job_id", "user_id", "status", "error_message", "created_at"],
+                    format_row=lambda row: [
+                        row[0],
+                        row[1],
+                        int(row[2]),
+                        row[3],
+                        row[4] or "",
+                        row[5].isoformat() if row[5] else "",
+                    ],
+                ),
+                f"{job_id}-items{'-failed' if failed_only else ''}.csv",
             )
 
-        payload = buf.getvalue()
-        filename = f"{job_id}-items{'-failed' if failed_only else ''}.csv"
-        headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
-        return StreamingResponse(iter([payload]), media_type="text/csv; charset=utf-8", headers=headers)
+        total, estimated = _count_rows(cur, from_sql="FROM admin_job_items", where_sql=where_sql, params=params, mode=count_mode)
+        probe = cursor is not None or count_mode != "exact"
+        if cursor is not None:
+            offset = 0
+            if cursor:
+                where_sql += " AND " + _keyset_after(["id"], "ASC")
+                params.extend(_decode_cursor(cursor, tag="job_items:ASC", size=1))
+        cur.execute(
+            f"""
+            SELECT id, job_id, user_id, status, error_message, created_at
+              FROM admin_job_items
+             {where_sql}
+          ORDER BY id ASC
+             LIMIT %s OFFSET %s
+            """,
+            tuple(params + [page_size + probe, offset]),
+        )
+        rows = cur.fetchall() or []
 
     items = [
         {
@@ -2168,8 +2633,21 @@ async def list_admin_job_items(
         }
         for row in rows
     ]
-    has_more = (offset + len(items)) < total
-    return AdminJobItemsListResponse(total=total, page=page, page_size=page_size, has_more=has_more, items=items)
+    if probe:
+        has_more = len(items) > page_size
+        items = items[:page_size]
+    else:
+        has_more = (offset + len(items)) < total
+    next_cursor = _encode_cursor("job_items:ASC", items[-1]["job_item_id"]) if has_more and items else None
+    return AdminJobItemsListResponse(
+        total=total,
+        total_estimated=estimated,
+        page=page,
+        page_size=page_size,
+        has_more=has_more,
+        items=items,
+        next_cursor=next_cursor,
+    )
 
 
 @app.post("/api/vault/admin/jobs/{job_id}/retry", response_model=AdminJobDetailResponse)
@@ -2202,6 +2680,23 @@ async def retry_admin_job(job_id: str, request: Request, _auth: str = Depends(ve
             """,
             (job_id,),
         )
+        # Background imports: failed chunks go back to the worker queue.
+        cur.execute(
+            """
+            WITH requeued AS (
+                UPDATE admin_import_chunks
+                   SET status='PENDING',
+                       error=NULL,
+                       updated_at=NOW()
+                 WHERE job_id=%s AND status='FAILED'
+                RETURNING row_count
+            )
+            UPDATE admin_jobs
+               SET failed = GREATEST(0, failed - (SELECT COALESCE(SUM(row_count), 0) FROM requeued))
+             WHERE job_id=%s
+            """,
+            (job_id, job_id),
+        )
 
         admin_user = request.client.host if request.client else "unknown"
         _log_admin_action(
@@ -2255,13 +2750,21 @@ async def list_admin_audit_log(
     page: int = 1,
     page_size: int = 50,
     order: str = "desc",
+    cursor: str | None = None,
+    count: str = "exact",
+    format: str = "json",
     _auth: str = Depends(verify_admin_password),
 ):
+    fmt = (format or "json").lower()
+    if fmt not in {"json", "csv"}:
+        raise HTTPException(status_code=400, detail="INVALID_FORMAT")
+
     page = 1 if page < 1 else page
     page_size = 1 if page_size < 1 else page_size
     page_size = 200 if page_size > 200 else page_size
     offset = (page - 1) * page_size
     order_sql = "DESC" if order.lower() != "asc" else "ASC"
+    count_mode = _validate_count_mode(count)
 
     conditions: list[str] = []
     params: list = []
@@ -2288,19 +2791,45 @@ async def list_admin_audit_log(
     if conditions:
         where_sql = " WHERE " + " AND ".join(conditions)
 
+    if fmt == "csv":
+        columns = [
+            "id", "admin_user", "action", "endpoint", "target_count", "request_id",
+            "response_status", "error_message", "job_id", "idempotency_key", "created_at",
+        ]
+        return _csv_response(
+            _stream_csv_rows(
+                f"""
+                SELECT {", ".join(columns)}
+                  FROM admin_audit_log
+                  {where_sql}
+              ORDER BY created_at {order_sql}, id {order_sql}
+                """,
+                params,
+                header=columns,
+                format_row=lambda row: [*row[:10], row[10].isoformat() if row[10] else ""],
+            ),
+            "admin-audit-log.csv",
+        )
+
     with db.get_conn() as conn:
         cur = conn.cursor()
-        cur.execute(f"SELECT COUNT(*) FROM admin_audit_log {where_sql}", tuple(params))
-        total = int(cur.fetchone()[0])
+        total, estimated = _count_rows(cur, from_sql="FROM admin_audit_log", where_sql=where_sql, params=params, mode=count_mode)
+        probe = cursor is not None or count_mode != "exact"
+        if cursor is not None:
+            offset = 0
+            if cursor:
+                conditions.append(_keyset_after(["created_at", "id"], order_sql))
+                params.extend(_decode_cursor(cursor, tag=f"audit:{order_sql}", size=2))
+                where_sql = " WHERE " + " AND ".join(conditions)
         cur.execute(
             f"""
             SELECT id, admin_user, action, endpoint, target_count, request_id, response_status, error_message, job_id, idempotency_key, created_at
               FROM admin_audit_log
               {where_sql}
-          ORDER BY created_at {order_sql}
+          ORDER BY created_at {order_sql}, id {order_sql}
              LIMIT %s OFFSET %s
             """,
-            tuple(params + [page_size, offset]),
+            tuple(params + [page_size + probe, offset]),
         )
         rows = cur.fetchall() or []
 
@@ -2320,8 +2849,21 @@ async def list_admin_audit_log(
         }
         for row in rows
     ]
-    has_more = (offset + len(items)) < total
-    return AdminAuditLogListResponse(total=total, page=page, page_size=page_size, has_more=has_more, items=items)
+    if probe:
+        has_more = len(rows) > page_size
+        rows, items = rows[:page_size], items[:page_size]
+    else:
+        has_more = (offset + len(items)) < total
+    next_cursor = _encode_cursor(f"audit:{order_sql}", rows[-1][10], rows[-1][0]) if has_more and rows else None
+    return AdminAuditLogListResponse(
+        total=total,
+        total_estimated=estimated,
+        page=page,
+        page_size=page_size,
+        has_more=has_more,
+        items=items,
+        next_cursor=next_cursor,
+    )
 
 
 # Note: /api/vault/admin/users GET moved to routers/admin_users.py
@@ -2432,7 +2974,7 @@ async def delete_admin_segment(segment_id: str, request: Request, _auth: str = D
 
 
 @app.post("/api/vault/admin/operations/extend-expiry", response_model=ExtendExpiryResponse)
-async def admin_extend_expiry(body: AdminExtendExpiryRequest, request: Request, response: Response, _auth: str = Depends(verify_admin_password)):
+def admin_extend_expiry(body: AdminExtendExpiryRequest, request: Request, response: Response, _auth: str = Depends(verify_admin_password)):
     request_id = _validate_request_id(getattr(body, "request_id", None))
     if body.reason not in {"OPS", "PROMO", "ADMIN"}:
         raise HTTPException(status_code=400, detail="INVALID_REASON")
@@ -2472,19 +3014,11 @@ async def admin_extend_expiry(body: AdminExtendExpiryRequest, request: Request,
         if idem["status"] == "in_progress":
             raise HTTPException(status_code=409, detail="IDEMPOTENCY_IN_PROGRESS")
 
-        rows: list[tuple[int, datetime]] = []
         resolved_meta: dict[str, Any] = {"mode": target_mode}
+        joins = ""
         if target_mode == "user_ids":
-            cur.execute(
-                """
-                SELECT user_id, expires_at
-                  FROM vault_status
-                 WHERE user_id = ANY(%s)
-                   AND (gold_status!='CLAIMED' OR platinum_status!='CLAIMED' OR diamond_status!='CLAIMED')
-                """,
-                (user_ids,),
-            )
-            rows = cur.fetchall()
+            where_sql = "vs.user_id = ANY(%s) AND " + _EXTENDABLE_TIER_SQL
+            where_params: list[Any] = [user_ids]
             resolved_meta["user_ids_count"] = len(user_ids)
         else:
             if target_mode == "segment":
@@ -2495,23 +3029,15 @@ async def admin_extend_expiry(body: AdminExtendExpiryRequest, request: Request,
                 target_dict["segment_filters"] = seg_row[1] or {}
                 resolved_meta["segment_name"] = seg_row[0]
 
-            where_sql, params = _build_user_target_sql(target_dict)
-            cur.execute(
-                """
-                SELECT vs.user_id, vs.expires_at
-                  FROM vault_status vs
+            joins = """
                   JOIN user_identity ui ON ui.user_id = vs.user_id
-                  JOIN user_admin_snapshot uas ON uas.user_id = vs.user_id
-                 WHERE """
-                + where_sql,
-                tuple(params),
-            )
-            rows = cur.fetchall()
-            resolved_meta["candidates"] = len(rows)
+                  JOIN user_admin_snapshot uas ON uas.user_id = vs.user_id"""
+            where_sql, where_params = _build_user_target_sql(target_dict)
+            where_sql = f"{where_sql} AND {_EXTENDABLE_TIER_SQL}"
 
         if body.shadow:
-            sample_ids = [r[0] for r in rows[:10]]
-            response_body = {"shadow": True, "candidates": len(rows), "sample_user_ids": sample_ids}
+            candidates, sample_ids = _count_extend_expiry_candidates(cur, joins=joins, where_sql=where_sql, params=where_params)
+            response_body = {"shadow": True, "candidates": candidates, "sample_user_ids": sample_ids}
             _idempotency_finish(
                 cur,
                 key=key,
@@ -2524,7 +3050,34 @@ async def admin_extend_expiry(body: AdminExtendExpiryRequest, request: Request,
             response.headers["Idempotency-Status"] = "recorded"
             return ExtendExpiryResponse(**response_body)
 
-        if not rows:
+        if target_mode != "user_ids":
+            resolved_meta["candidates"] = _count_extend_expiry_candidates(
+                cur, joins=joins, where_sql=where_sql, params=where_params
+            )[0]
+
+        # Same commit-per-batch / lease / release-on-failure contract as /api/vault/extend-expiry.
+        try:
+            result = _extend_expiry_batched(
+                conn,
+                joins=joins,
+                where_sql=where_sql,
+                params=where_params,
+                extend_hours=body.extend_hours,
+                reason=body.reason,
+                request_id=request_id,
+                now=now,
+                metadata={"base_request_id": request_id, "target": resolved_meta, "extend_hours": body.extend_hours},
+                heartbeat=partial(_idempotency_touch, key=key, scope=scope, endpoint=endpoint),
+            )
+        except Exception:
+            conn.rollback()
+            _idempotency_release(cur, key=key, scope=scope, endpoint=endpoint)
+            conn.commit()
+            raise
+        updated = result["updated"]
+        new_expires_at = result["new_expires_at"]
+
+        if not updated:
             response_body = {"shadow": False, "updated": 0, "new_expires_at": None}
             _idempotency_finish(
                 cur,
@@ -2538,66 +3091,13 @@ async def admin_extend_expiry(body: AdminExtendExpiryRequest, request: Request,
             response.headers["Idempotency-Status"] = "recorded"
             return ExtendExpiryResponse(**response_body)
 
-        update_values = []
-        log_values = []
-        new_expires_at = None
-        for user_id, expires_at in rows:
-            new_expires = expires_at + timedelta(hours=body.extend_hours)
-            new_expires_at = new_expires
-            update_values.append((user_id, new_expires, body.reason, now))
-            log_values.append(
-                (
-                    user_id,
-                    expires_at,
-                    new_expires,
-                    body.reason,
-                    f"{request_id}:{user_id}",
-                    Json(
-                        {
-                            "base_request_id": request_id,
-                            "target": resolved_meta,
-                            "extend_hours": body.extend_hours,
-                        }
-                    ),
-                )
-            )
-
-        execute_values(
-            cur,
-            """
-            UPDATE vault_status AS vs
-               SET expires_at=data.new_expires_at,
-                   expiry_extend_count=vs.expiry_extend_count+1,
-                   last_extension_reason=data.reason,
-                   last_extension_at=data.now
-              FROM (VALUES %s) AS data(user_id, new_expires_at, reason, now)
-             WHERE vs.user_id = data.user_id
-            """,
-            update_values,
-            template="(%s,%s,%s,%s)",
-        )
-
-        execute_values(
-            cur,
-            """
-            INSERT INTO vault_expiry_extension_log
-                (user_id, prev_expires_at, new_expires_at, reason, request_id, shadow, metadata)
-            VALUES %s
-            ON CONFLICT (request_id) DO NOTHING
-            """,
-            log_values,
-            template="(%s,%s,%s,%s,%s,false,%s)",
-        )
-
-        updated = len(update_values)
-
         admin_user = request.client.host if request.client else "unknown"
         _log_admin_action(
             conn=conn,
             admin_user=admin_user,
             action="EXTEND_EXPIRY",
             endpoint=endpoint,
-            target_user_ids=[r[0] for r in rows[:1000]],
+            target_user_ids=result["user_ids"],
             request_id=key,
             request_body={
                 "target": resolved_meta,
@@ -2730,7 +3230,7 @@ async def admin_bulk_update(body: AdminBulkUpdateRequest, request: Request, resp
     has_status = body.status is not None and any(
         getattr(body.status, k) is not None for k in ("gold_status", "platinum_status", "diamond_status")
     )
-    has_attendance = body.attendance is not None and (body.attendance.delta_days is not None or body.attendance.set_days is not None)
+    has_attendance = body.attendance is not None and (bool(body.attendance.delta) or body.attendance.cap is not None)
     if not (has_status or has_attendance):
         raise HTTPException(status_code=400, detail="NO_FIELDS")
 
@@ -2756,82 +3256,19 @@ async def admin_bulk_update(body: AdminBulkUpdateRequest, request: Request, resp
     else:
         raise HTTPException(status_code=400, detail="INVALID_TARGET_MODE")
 
-    def _apply_updates_for_user(cur, user_id: int, now: datetime):
-        cur.execute("SELECT review_ok FROM user_admin_snapshot WHERE user_id=%s", (user_id,))
-        snap_row = cur.fetchone()
-        review_ok = bool(snap_row[0]) if snap_row and snap_row[0] is not None else False
-
-        row = _get_or_create_vault_row(cur, user_id, now)
-        if not row:
-            raise HTTPException(status_code=404, detail="VAULT_NOT_FOUND")
-
-        expires_at, gold_status, platinum_status, diamond_status, attendance_days, *_rest = row
-        current = {
-            "gold_status": gold_status,
-            "platinum_status": platinum_status,
-            "diamond_status": diamond_status,
-        }
-
-        new_attendance_days = int(attendance_days or 0)
-        new_platinum_status = platinum_status
-        new_diamond_status = diamond_status
-
-        if has_attendance:
-            if body.attendance.set_days is not None:
-                new_attendance_days = _clamp_attendance_days(int(body.attendance.set_days))
-            else:
-                new_attendance_days = _clamp_attendance_days(int(attendance_days or 0) + int(body.attendance.delta_days or 0))
-
-        # Apply explicit status overrides last.
-        explicit_updates: dict[str, str] = {}
-        if has_status:
-            if body.status.gold_status is not None:
-                explicit_updates["gold_status"] = _validate_status(body.status.gold_status, "gold_status")
-            if body.status.platinum_status is not None:
-                explicit_updates["platinum_status"] = _validate_status(body.status.platinum_status, "platinum_status")
-            if body.status.diamond_status is not None:
-                explicit_updates["diamond_status"] = _validate_status(body.status.diamond_status, "diamond_status")
-
-        # CLAIMED? ?돌리? ?음 (per single-user behavior)
-        for col, new_val in explicit_updates.items():
-            if current.get(col) == "CLAIMED" and new_val != "CLAIMED":
-                raise HTTPException(status_code=409, detail="CANNOT_MODIFY_CLAIMED")
-
-        new_gold_status = explicit_updates.get("gold_status", gold_status)
-        new_platinum_status = explicit_updates.get("platinum_status", new_platinum_status)
-        new_diamond_status = explicit_updates.get("diamond_status", new_diamond_status)
-
-        # Update vault_status row.
-        set_cols: list[str] = [
-            "gold_status=%s",
-            "platinum_status=%s",
-            "diamond_status=%s",
-        ]
-        params: list[Any] = [new_gold_status, new_platinum_status, new_diamond_status]
-
-        if has_attendance:
-            set_cols.extend(["platinum_attendance_days=%s", "last_attended_at=%s"])
-            params.extend([new_attendance_days, now])
-
-        set_cols.append("updated_at=%s")
-        params.append(now)
-        params.append(user_id)
-
-        cur.execute(
-            f"""
-            UPDATE vault_status
-               SET {', '.join(set_cols)}
-             WHERE user_id=%s
-            """,
-            params,
-        )
-
-        return {
-            "expires_at": expires_at.isoformat() if expires_at else None,
-            "gold_status": new_gold_status,
-            "platinum_status": new_platinum_status,
-            "diamond_status": new_diamond_status,
-        }
+    # Validate explicit statuses once; an invalid value fails every item, as the per-user path did.
+    status_updates: dict[str, str] = {}
+    status_error: str | None = None
+    if has_status:
+        try:
+            for col in ("gold_status", "platinum_status", "diamond_status"):
+                if getattr(body.status, col) is not None:
+                    status_updates[col] = _validate_status(getattr(body.status, col), col)
+        except HTTPException as e:
+            status_error = str(e.detail)
+    attendance_update = (
+        {"delta": int(body.attendance.delta or 0), "cap": body.attendance.cap} if has_attendance else None
+    )
 
     with db.get_conn() as conn:
         cur = conn.cursor()
@@ -2883,7 +3320,6 @@ async def admin_bulk_update(body: AdminBulkUpdateRequest, request: Request, resp
             "resolved": resolved_meta,
             "status": body.status.model_dump(exclude_none=True) if body.status and hasattr(body.status, "model_dump") else (body.status.dict(exclude_none=True) if body.status else None),
             "attendance": body.attendance.model_dump(exclude_none=True) if body.attendance and hasattr(body.attendance, "model_dump") else (body.attendance.dict(exclude_none=True) if body.attendance else None),
-            "deposit": body.deposit.model_dump(exclude_none=True) if body.deposit and hasattr(body.deposit, "model_dump") else (body.deposit.dict(exclude_none=True) if body.deposit else None),
         }
 
         cur.execute(
@@ -2895,56 +3331,15 @@ async def admin_bulk_update(body: AdminBulkUpdateRequest, request: Request, resp
             (job_id, "BULK_UPDATE", key, target_count, Json(payload)),
         )
 
-        if resolved_user_ids:
-            execute_values(
-                cur,
-                """
-                INSERT INTO admin_job_items (job_id, user_id, status)
-                VALUES %s
-                """,
-                [(job_id, uid, "PENDING") for uid in resolved_user_ids],
-                template="(%s,%s,%s)",
-            )
-
-        processed = 0
-        failed = 0
-        for uid in resolved_user_ids:
-            processed += 1
-            try:
-                _apply_updates_for_user(cur, uid, now)
-                cur.execute(
-                    """
-                    UPDATE admin_job_items
-                       SET status='DONE',
-                           error_message=NULL
-                     WHERE job_id=%s AND user_id=%s
-                    """,
-                    (job_id, uid),
-                )
-            except HTTPException as e:
-                failed += 1
-                msg = str(getattr(e, "detail", None) or "ERROR")
-                cur.execute(
-                    """
-                    UPDATE admin_job_items
-                       SET status='FAILED',
-                           error_message=%s
-                     WHERE job_id=%s AND user_id=%s
-                    """,
-                    (msg[:500], job_id, uid),
-                )
-            except Exception as e:
-                failed += 1
-                msg = str(e) or "ERROR"
-                cur.execute(
-                    """
-                    UPDATE admin_job_items
-                       SET status='FAILED',
-                           error_message=%s
-                     WHERE job_id=%s AND user_id=%s
-                    """,
-                    (msg[:500], job_id, uid),
-                )
+        processed, failed = _apply_bulk_update(
+            cur,
+            job_id=job_id,
+            user_ids=resolved_user_ids,
+            now=now,
+            status_updates=status_updates,
+            attendance=attendance_update,
+            fail_all=status_error,
+        )
 
         final_status = "DONE" if failed == 0 else "FAILED"
         cur.execute(
@@ -3013,6 +3408,8 @@ async def compensation_enqueue(body: CompensationEnqueueRequest, request: Reques
             """,
             (user_id, body.vault_type, body.request_id, body.external_service, Json(body.payload)),
         )
+        if cur.rowcount:
+            _wake_workers(cur, "compensation")
         
         # 감사 로그 기록
         admin_user = request.client.host if request.client else "unknown"
@@ -17,6 +17,8 @@ from app.schemas import (
 )
 from app.routers.dependencies import verify_admin_password
 from app.utils.audit import _log_admin_action
+from app.utils.list_counts import count_rows, validate_count_mode
+from app.utils.pagination import decode_cursor, encode_cursor
 from app.utils.sql_builders import _apply_job_timeouts
 from app.services.common import (
     now_utc,
@@ -28,6 +30,7 @@ from app.services.common import (
     normalize_external_user_id,
     parse_joined_date,
 )
+from app.services.user_identity_service import identity_cache
 from app.services.vault_service import get_or_create_vault_row
 from app.constants.vault_config import DEFAULT_EXPIRY_HOURS
 
@@ -42,12 +45,15 @@ async def get_all_users(
     sort_dir: str | None = None,
     page: int = 1,
     page_size: int = 50,
+    cursor: str | None = None,
+    count: str = "exact",
     _auth: str = Depends(verify_admin_password),
 ):
-    """회원 리스트 조회 (서버 페이징/정렬/필터)."""
+    """회원 리스트 조회 (서버 페이징/정렬/필터). `cursor`를 주면 OFFSET 대신 keyset 페이지네이션."""
     if page < 1:
         page = 1
     page_size = max(1, min(page_size, 200))
+    count_mode = validate_count_mode(count)
 
     sort_by = (sort_by or "created_at").lower()
     sort_dir = (sort_dir or "desc").lower()
@@ -63,6 +69,18 @@ async def get_all_users(
     }
     order_col = sort_map.get(sort_by, "ui.created_at")
     order_dir = "ASC" if sort_dir == "asc" else "DESC"
+    # Row position of each sort column in the SELECT below (for next_cursor).
+    sort_row_index = {
+        "ui.created_at": 2,
+        "vs.expires_at": 3,
+        "uas.deposit_total": 15,
+        "ui.external_user_id": 1,
+        "uas.nickname": 16,
+        "vs.gold_status": 4,
+        "vs.platinum_status": 8,
+        "vs.diamond_status": 9,
+    }[order_col]
+    cursor_tag = f"users:{order_col}:{order_dir}"
 
     with db.get_conn() as conn:
         cur = conn.cursor()
@@ -87,10 +105,28 @@ async def get_all_users(
         if where:
             base_sql.append("WHERE " + " AND ".join(where))
 
-        cur.execute("SELECT COUNT(*) " + "\n".join(base_sql), params)
-        total = cur.fetchone()[0]
+        total, estimated = count_rows(
+            cur, from_sql=base_sql[0], where_sql="\n".join(base_sql[1:]), params=params, mode=count_mode
+        )
+        probe = cursor is not None or count_mode != "exact"
 
         offset = (page - 1) * page_size
+        if cursor is not None:
+            offset = 0
+            if cursor:
+                # (sort value, user_id) after the cursor, with NULL sort values last.
+                after_value, after_user_id = decode_cursor(cursor, tag=cursor_tag, size=2)
+                op = "<" if order_dir == "DESC" else ">"
+                if after_value is None:
+                    keyset_sql = f"({order_col} IS NULL AND ui.user_id {op} %s)"
+                    keyset_params = [after_user_id]
+                else:
+                    keyset_sql = (
+                        f"({order_col} {op} %s OR ({order_col} = %s AND ui.user_id {op} %s) OR {order_col} IS NULL)"
+                    )
+                    keyset_params = [after_value, after_value, after_user_id]
+                base_sql.append(("AND " if where else "WHERE ") + keyset_sql)
+                params = params + keyset_params
         cur.execute(
             """
             SELECT
@@ -119,10 +155,16 @@ async def get_all_users(
                 vs.diamond_mission_2_done
             """
             + "\n".join(base_sql)
-            + f"\nORDER BY {order_col} {order_dir} NULLS LAST LIMIT %s OFFSET %s",
-            params + [page_size, offset],
+            + f"\nORDER BY {order_col} {order_dir} NULLS LAST, ui.user_id {order_dir} LIMIT %s OFFSET %s",
+            params + [page_size + probe, offset],
         )
         rows = cur.fetchall()
+        if probe:
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+        else:
+            has_more = offset + len(rows) < total
+        next_cursor = encode_cursor(cursor_tag, rows[-1][sort_row_index], rows[-1][0]) if has_more and rows else None
 
         from datetime import date
         today = date.today()
@@ -169,7 +211,14 @@ async def get_all_users(
                 "diamond_mission_2_done": bool(row[22]),
             })
 
-        return {"users": users, "total": total, "page": page, "page_size": page_size}
+        return {
+            "users": users,
+            "total": total,
+            "total_estimated": estimated,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+        }
 
 
 @router.post("", response_model=AdminUserResponse)
@@ -300,6 +349,7 @@ async def admin_create_user(
             )
 
             conn.commit()
+            identity_cache.put(ext, user_id)
             response.headers["Idempotency-Status"] = "recorded"
             return AdminUserResponse(**response_body)
         except HTTPException:
@@ -490,5 +540,6 @@ async def admin_delete_user(
         )
 
         conn.commit()
+        identity_cache.invalidate([external_user_id])
         response.headers["Idempotency-Status"] = "recorded"
         return response_body
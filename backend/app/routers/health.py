@@ -1,7 +1,13 @@
 """Health check router."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app import db
 from app.schemas import HealthResponse
+from app.services.notification_templates import template_cache
+from app.services.status_stream import status_hub
+from app.services.user_identity_service import identity_cache
+from app.utils.auth import verify_admin_password
 
 router = APIRouter(tags=["health"])
 
@@ -10,3 +16,27 @@ router = APIRouter(tags=["health"])
 async def health():
     """Health check endpoint."""
     return HealthResponse(status="ok")
+
+
+@router.get("/health/db-pool")
+async def db_pool_health(_auth: str = Depends(verify_admin_password)):
+    """Connection pool counters: in-use/idle/waiters, acquire latency histogram, checkout durations."""
+    return db.pool_stats()
+
+
+@router.get("/health/notification-templates")
+async def notification_template_cache_health(_auth: str = Depends(verify_admin_password)):
+    """Template cache counters: entries, hits/misses/hit rate, invalidations."""
+    return template_cache.stats()
+
+
+@router.get("/health/status-stream")
+async def status_stream_health(_auth: str = Depends(verify_admin_password)):
+    """/status/stream counters: subscribed users, subscribers, publishes."""
+    return status_hub.stats()
+
+
+@router.get("/health/identity-cache")
+async def identity_cache_health(_auth: str = Depends(verify_admin_password)):
+    """Identity cache counters: entries/negative entries, hits/negative hits/misses, hit rate."""
+    return identity_cache.stats()
@@ -3,31 +3,43 @@
 Endpoints for user login, status, claim, and attendance.
 """
 
+import asyncio
+import json
 import os
+import random
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from fastapi import APIRouter, HTTPException, Depends, Request, Response
+import psycopg2
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, Response
+from fastapi.responses import StreamingResponse
 
 from app import config, db
 from app.schemas import (
     AttendanceResponse,
     ClaimRequest,
     ClaimResponse,
+    StatusBatchRequest,
     UserLoginRequest,
     UserLoginResponse,
 )
-from app.services.common import now_utc, normalize_external_user_id
-from app.services.user_identity_service import resolve_user_id
+from app.routers.dependencies import verify_admin_password
+from app.services.common import dedupe_int_list, dedupe_str_list, now_utc, normalize_external_user_id
+from app.services.status_stream import reload_slot, start_status_listener, status_hub
+from app.services.user_identity_service import identity_cache, resolve_user_id
 from app.services.vault_service import (
+    build_status_payload,
     get_or_create_vault_row,
     check_user_csv_uploaded,
-    get_user_snapshot,
+    get_status_row,
+    get_status_rows,
+    get_status_version,
+    status_etag,
     validate_claim_request,
     compute_platinum_status,
 )
 from app.constants.vault_config import (
-    VAULT_REWARDS,
     DEFAULT_EXPIRY_HOURS,
 )
 
@@ -43,65 +55,71 @@ async def user_login(body: UserLoginRequest):
 
     external_user_id = normalize_external_user_id(nickname)
 
-    with db.get_conn() as conn:
-        cur = conn.cursor()
-        # 1차: external_user_id 일치 검색
+    async with db.get_async_conn() as conn:
+        return await conn.run(_login, nickname, external_user_id)
+
+
+def _login(conn, nickname: str, external_user_id: str | None) -> UserLoginResponse:
+    """Resolve the login identity and make sure a vault_status row exists."""
+    cur = conn.cursor()
+    # 1차: external_user_id 일치 검색
+    cur.execute(
+        "SELECT user_id, external_user_id FROM user_identity WHERE external_user_id=%s",
+        (external_user_id,),
+    )
+    row = cur.fetchone()
+
+    # 2차: 스냅샷 닉네임으로 역검색
+    if not row:
         cur.execute(
-            "SELECT user_id, external_user_id FROM user_identity WHERE external_user_id=%s",
-            (external_user_id,),
+            """
+            SELECT ui.user_id, ui.external_user_id
+              FROM user_admin_snapshot uas
+              JOIN user_identity ui ON ui.user_id = uas.user_id
+             WHERE uas.nickname = %s
+             LIMIT 1
+            """,
+            (nickname,),
         )
         row = cur.fetchone()
 
-        # 2차: 스냅샷 닉네임으로 역검색
-        if not row:
-            cur.execute(
-                """
-                SELECT ui.user_id, ui.external_user_id
-                  FROM user_admin_snapshot uas
-                  JOIN user_identity ui ON ui.user_id = uas.user_id
-                 WHERE uas.nickname = %s
-                 LIMIT 1
-                """,
-                (nickname,),
-            )
-            row = cur.fetchone()
-
-        if not row:
-            raise HTTPException(
-                status_code=403,
-                detail="CSV_UPLOAD_REQUIRED: 관리자가 회원 정보를 업로드한 후에 로그인할 수 있습니다.",
-            )
-
-        user_id = int(row[0])
-        resolved_external_user_id = row[1]
-
-        cur.execute(
-            "SELECT nickname, COALESCE(telegram_ok, false) FROM user_admin_snapshot WHERE user_id=%s",
-            (user_id,),
+    if not row:
+        raise HTTPException(
+            status_code=403,
+            detail="CSV_UPLOAD_REQUIRED: 관리자가 회원 정보를 업로드한 후에 로그인할 수 있습니다.",
         )
-        snapshot_row = cur.fetchone()
-        if not snapshot_row:
-            raise HTTPException(
-                status_code=403,
-                detail="CSV_UPLOAD_REQUIRED: 관리자가 회원 정보를 업로드한 후에 로그인할 수 있습니다.",
-            )
 
-        snapshot_nickname = snapshot_row[0] or nickname
-        telegram_ok = bool(snapshot_row[1]) if snapshot_row[1] is not None else False
+    user_id = int(row[0])
+    resolved_external_user_id = row[1]
+    identity_cache.put(resolved_external_user_id, user_id)
 
-        now = now_utc()
-        expires_at = now + timedelta(hours=DEFAULT_EXPIRY_HOURS)
-        # 초기 상태는 모두 LOCKED - 미션 토글로만 상태 변경
-        cur.execute(
-            """
-            INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status)
-            VALUES (%s, %s, 'LOCKED', 'LOCKED', 'LOCKED')
-            ON CONFLICT (user_id) DO NOTHING
-            """,
-            (user_id, expires_at),
+    cur.execute(
+        "SELECT nickname, COALESCE(telegram_ok, false) FROM user_admin_snapshot WHERE user_id=%s",
+        (user_id,),
+    )
+    snapshot_row = cur.fetchone()
+    if not snapshot_row:
+        raise HTTPException(
+            status_code=403,
+            detail="CSV_UPLOAD_REQUIRED: 관리자가 회원 정보를 업로드한 후에 로그인할 수 있습니다.",
         )
 
-        conn.commit()
+    snapshot_nickname = snapshot_row[0] or nickname
+    telegram_ok = bool(snapshot_row[1]) if snapshot_row[1] is not None else False
+
+    now = now_utc()
+    expires_at = now + timedelta(hours=DEFAULT_EXPIRY_HOURS)
+    # 초기 상태는 모두 LOCKED - 미션 토글로만 상태 변경
+    cur.execute(
+        """
+        INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status)
+        VALUES (%s, %s, 'LOCKED', 'LOCKED', 'LOCKED')
+        ON CONFLICT (user_id) DO NOTHING
+        """,
+        (user_id, expires_at),
+    )
+
+    conn.commit()
 
     return UserLoginResponse(
         external_user_id=resolved_external_user_id,
@@ -110,120 +128,270 @@ async def user_login(body: UserLoginRequest):
     )
 
 
+def _require_snapshot(has_snapshot: bool):
+    # 프로덕션/로컬에서만 CSV 업로드 필수 (테스트에서는 스킵)
+    if not has_snapshot and os.getenv("APP_ENV", "local") not in {"test"}:
+        raise HTTPException(
+            status_code=403,
+            detail="CSV_UPLOAD_REQUIRED: 관리자가 회원 정보를 업로드해야 금고에 접근할 수 있습니다."
+        )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison (RFC 9110 §13.1.2) of `etag` against an If-None-Match list."""
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in {t.removeprefix("W/") for t in tags}
+
+
+def _resolve_status_user(conn, user_id: int | None, external_user_id: str | None) -> int:
+    return resolve_user_id(
+        conn.cursor(), user_id=user_id, external_user_id=external_user_id,
+        default_user_id=None, create_if_missing=False
+    )
+
+
+def _read_status_row(
+    conn, user_id: int | None, external_user_id: str | None, if_none_match: str | None
+) -> tuple[dict[str, Any] | None, str | None]:
+    """Resolve the user and load the `/status` row (see `_load_status_row`)."""
+    return _load_status_row(conn, _resolve_status_user(conn, user_id, external_user_id), if_none_match)
+
+
+def _load_status_row(conn, user_id: int, if_none_match: str | None) -> tuple[dict[str, Any] | None, str | None]:
+    """Load the `/status` row.
+
+    With If-None-Match, only the version is read first; on a match the row is not loaded
+    and (None, etag) is returned.
+    """
+    cur = conn.cursor()
+    if if_none_match:
+        version = get_status_version(cur, user_id)
+        etag = status_etag(user_id, *version)
+        if etag and _etag_matches(if_none_match, etag):
+            _require_snapshot(version[1] is not None)
+            return None, etag
+
+    row = get_status_row(cur, user_id)
+
+    _require_snapshot(row["has_snapshot"])
+    return row, status_etag(user_id, row["vault_updated_at"], row["snapshot_updated_at"])
+
+
 @router.get("/status")
 async def vault_status(
     response: Response,
     user_id: int | None = None, 
-    external_user_id: str | None = None
+    external_user_id: str | None = None,
+    if_none_match: str | None = Header(None),
 ):
-    """Return vault status snapshot for the given user."""
-    # Prevent caching to ensure admin updates are seen immediately
-    response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
-    response.headers["Pragma"] = "no-cache"
-    response.headers["Expires"] = "0"
+    """Return vault status snapshot for the given user (304 when If-None-Match is current)."""
+    # 저장 가능하지만 매 요청 재검증 → 어드민 수정이 즉시 반영됨
+    headers = {"Cache-Control": "private, no-cache"}
+
+    now = now_utc()
+    row, etag = await db.run_with_conn(_read_status_row, user_id, external_user_id, if_none_match)
+
+    if etag:
+        headers["ETag"] = etag
+    if row is None:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return build_status_payload(row, now)
+
+
+def _read_status_batch(conn, user_ids: list[int], external_user_ids: list[str]):
+    """(user_id, external_user_id, row) per known user, and the unknown user_ids / external_user_ids.
+
+    A user_id is known if it has an identity or a vault_status row; get_status_rows() itself
+    returns a default LOCKED row for any id.
+    """
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT user_id, external_user_id FROM user_identity WHERE external_user_id = ANY(%s) OR user_id = ANY(%s)",
+        (external_user_ids, user_ids),
+    )
+    identities = cur.fetchall() or []
+    ext_by_uid = {int(uid): ext for uid, ext in identities}
+    uid_by_ext = {ext: int(uid) for uid, ext in identities}
+
+    ordered = list(dict.fromkeys([*user_ids, *(uid_by_ext[e] for e in external_user_ids if e in uid_by_ext)]))
+    rows = get_status_rows(cur, ordered) if ordered else {}
+    missing_user_ids = [uid for uid in user_ids if uid not in ext_by_uid and not rows[uid]["has_vault"]]
+    not_found = [e for e in external_user_ids if e not in uid_by_ext]
+    missing = set(missing_user_ids)
+    results = [(uid, ext_by_uid.get(uid), rows[uid]) for uid in ordered if uid not in missing]
+    return results, missing_user_ids, not_found
+
+
+@router.post("/status/batch")
+async def vault_status_batch(body: StatusBatchRequest, _auth: str = Depends(verify_admin_password)):
+    """`/status` for many users: one identity lookup and one status query for the whole batch."""
+    if len(body.user_ids) + len(body.external_user_ids) > config.STATUS_BATCH_MAX_USERS:
+        raise HTTPException(status_code=400, detail="TOO_MANY_USERS")
+    user_ids = dedupe_int_list(body.user_ids, max_items=config.STATUS_BATCH_MAX_USERS)
+    external_user_ids = dedupe_str_list(body.external_user_ids, max_items=config.STATUS_BATCH_MAX_USERS)
+    if not user_ids and not external_user_ids:
+        raise HTTPException(status_code=400, detail="USER_REQUIRED")
 
     now = now_utc()
-    with db.get_conn() as conn:
-        cur = conn.cursor()
-        user_id = resolve_user_id(
-            cur, user_id=user_id, external_user_id=external_user_id,
-            default_user_id=1, create_if_missing=True
+    async with db.get_async_conn() as conn:
+        results, not_found_user_ids, not_found = await conn.run(_read_status_batch, user_ids, external_user_ids)
+
+    require_snapshot = os.getenv("APP_ENV", "local") not in {"test"}
+    items, errors = [], []
+    for uid, ext, row in results:
+        if require_snapshot and not row["has_snapshot"]:
+            errors.append({"user_id": uid, "external_user_id": ext, "detail": "CSV_UPLOAD_REQUIRED"})
+            continue
+        items.append({"user_id": uid, "external_user_id": ext, **build_status_payload(row, now)})
+    return {"now": now.isoformat(), "items": items, "not_found": not_found, "not_found_user_ids": not_found_user_ids, "errors": errors}
+
+
+def _sse(data: str, *, event: str, id: str | None = None) -> str:
+    head = f"event: {event}\n" + (f"id: {id}\n" if id is not None else "")
+    return head + "".join(f"data: {line}\n" for line in data.splitlines()) + "\n"
+
+
+@router.get("/status/stream")
+async def vault_status_stream(
+    request: Request,
+    user_id: int | None = None,
+    external_user_id: str | None = None,
+    last_version: str | None = None,
+    last_event_id: str | None = Header(None),
+):
+    """Server-sent events: a `status` event (the `/status` body) whenever the user's vault changes.
+
+    Event ids are status versions; on reconnect (Last-Event-ID or `last_version`) the
+    initial snapshot is skipped if nothing changed. The server closes the stream after
+    STATUS_STREAM_MAX_SECONDS and the client reconnects.
+    """
+    async with db.get_async_conn() as conn:
+        resolved_user_id = await conn.run(_resolve_status_user, user_id, external_user_id)
+
+    start_status_listener()
+    # 초기 조회 전에 구독해야 그 사이의 변경을 놓치지 않는다
+    sub = status_hub.subscribe(resolved_user_id)
+    try:
+        async with db.get_async_conn() as conn:
+            row, etag = await conn.run(_load_status_row, resolved_user_id, None)
+    except BaseException:
+        status_hub.unsubscribe(sub)
+        raise
+
+    async def _events():
+        nonlocal row, etag
+        sent = last_event_id or last_version
+        deadline = time.monotonic() + config.STATUS_STREAM_MAX_SECONDS
+        try:
+            yield f"retry: {config.STATUS_STREAM_RETRY_MS}\n\n"
+            while True:
+                version = etag.removeprefix("W/").strip('"') if etag else "none"
+                if version != sent:
+                    yield _sse(json.dumps(build_status_payload(row, now_utc())), event="status", id=version)
+                    sent = version
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or await request.is_disconnected():
+                    return
+                if not await sub.wait(min(config.STATUS_STREAM_HEARTBEAT_SECONDS, remaining)):
+                    yield ": heartbeat\n\n"
+                    continue
+                if sub.take_broadcast():
+                    # 전체 알림('*')은 모든 구독자를 동시에 깨운다 → 재조회 시점을 분산하고 그 사이 알림은 합친다
+                    await asyncio.sleep(min(remaining, random.uniform(0, config.STATUS_STREAM_BROADCAST_JITTER_MS / 1000)))
+                    sub.event.clear()
+                    sub.take_broadcast()
+                try:
+                    async with reload_slot():
+                        async with db.get_async_conn() as conn:
+                            row, etag = await conn.run(_load_status_row, resolved_user_id, None)
+                except HTTPException as exc:
+                    yield _sse(json.dumps({"detail": exc.detail}, ensure_ascii=False), event="error")
+                    return
+                except (db.PoolTimeout, psycopg2.OperationalError):
+                    # Pool exhausted or DB unreachable: end the stream cleanly, reconnects spread over the retry window.
+                    yield f"retry: {config.STATUS_STREAM_RETRY_MS + random.randint(0, config.STATUS_STREAM_RETRY_MS)}\n\n"
+                    return
+        finally:
+            status_hub.unsubscribe(sub)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(_events(), media_type="text/event-stream", headers=headers)
+
+
+def _claim(conn, vault_type: str, user_id: int | None, external_user_id: str | None, now: datetime) -> datetime:
+    """Mark the vault as CLAIMED and return its expires_at."""
+    status_col = f"{vault_type.lower()}_status"
+    claimed_at_col = f"{vault_type.lower()}_claimed_at"
+
+    cur = conn.cursor()
+    user_id = resolve_user_id(
+        cur, user_id=user_id, external_user_id=external_user_id,
+        default_user_id=None, create_if_missing=False
+    )
+    
+    # CSV 업로드 확인
+    if not check_user_csv_uploaded(cur, user_id) and config.APP_ENV not in {"test"}:
+        raise HTTPException(
+            status_code=403,
+            detail="CSV_UPLOAD_REQUIRED: 관리자가 회원 정보를 업로드해야 금고를 수령할 수 있습니다."
+        )
+    
+    cur.execute(
+        """
+        SELECT expires_at, gold_status, platinum_status, diamond_status
+          FROM vault_status
+         WHERE user_id=%s
+         FOR UPDATE
+        """,
+        (user_id,),
+    )
+    row = cur.fetchone()
+
+    if not row:
+        expires_at = now + timedelta(hours=DEFAULT_EXPIRY_HOURS)
+        cur.execute(
+            """
+            INSERT INTO vault_status
+                (user_id, expires_at, gold_status, platinum_status, diamond_status)
+            VALUES (%s, %s, 'LOCKED', 'LOCKED', 'LOCKED')
+            ON CONFLICT (user_id) DO NOTHING
+            """,
+            (user_id, expires_at),
         )
-        
         cur.execute(
             """
-            SELECT vs.expires_at,
-                   vs.gold_status,
-                   vs.platinum_status,
-                   vs.diamond_status,
-                   vs.platinum_attendance_days,
-                   vs.platinum_deposit_done,
-                   vs.diamond_deposit_current,
-                   uas.last_deposit_at,
-                   vs.platinum_mission_1_done,
-                   vs.platinum_mission_2_done,
-                   vs.diamond_mission_1_done,
-                   vs.diamond_mission_2_done,
-                   vs.gold_mission_1_done,
-                   vs.gold_mission_2_done,
-                   vs.gold_mission_3_done
-              FROM vault_status vs
-              LEFT JOIN user_admin_snapshot uas ON vs.user_id = uas.user_id
-             WHERE vs.user_id=%s
+            SELECT expires_at, gold_status, platinum_status, diamond_status
+              FROM vault_status
+             WHERE user_id=%s
+             FOR UPDATE
             """,
             (user_id,),
         )
         row = cur.fetchone()
 
-        review_row = get_user_snapshot(cur, user_id)
-        
-        # 프로덕션/로컬에서만 CSV 업로드 필수 (테스트에서는 스킵)
-        if not review_row and os.getenv("APP_ENV", "local") not in {"test"}:
-            raise HTTPException(
-                status_code=403,
-                detail="CSV_UPLOAD_REQUIRED: 관리자가 회원 정보를 업로드해야 금고에 접근할 수 있습니다."
-            )
-
-    # Fallback defaults
-    last_deposit_at = row[7] if row and row[7] else None
-    base_time = last_deposit_at if last_deposit_at else now
-    expires_at = row[0] if row else base_time + timedelta(hours=DEFAULT_EXPIRY_HOURS)
-    gold_status = row[1] if row else "LOCKED"
-    platinum_status = row[2] if row else "LOCKED"
-    diamond_status = row[3] if row else "LOCKED"
-
-    platinum_attendance_days = int(row[4]) if row and row[4] is not None else 0
-    platinum_deposit_done = bool(row[5]) if row and row[5] is not None else False
-    diamond_deposit_current = int(row[6]) if row and row[6] is not None else 0
-
-    # 미션 토글 필드 (어드민 설정값)
-    platinum_mission_1_done = bool(row[8]) if row and row[8] is not None else False
-    platinum_mission_2_done = bool(row[9]) if row and row[9] is not None else False
-    diamond_mission_1_done = bool(row[10]) if row and row[10] is not None else False
-    diamond_mission_2_done = bool(row[11]) if row and row[11] is not None else False
-    gold_mission_1_done = bool(row[12]) if row and row[12] is not None else False
-    gold_mission_2_done = bool(row[13]) if row and row[13] is not None else False
-    gold_mission_3_done = bool(row[14]) if row and row[14] is not None else False
-
-    telegram_ok = review_row["telegram_ok"] if review_row else False
-    platinum_review_done = review_row["review_ok"] if review_row else False
-
-    remaining_ms = int((expires_at - now).total_seconds() * 1000)
-    ms_countdown = {"enabled": remaining_ms < 3600_000, "remaining_ms": max(0, remaining_ms)}
-
-    reward_amounts = VAULT_REWARDS
-    status_by_type = {"GOLD": gold_status, "PLATINUM": platinum_status, "DIAMOND": diamond_status}
-    loss_breakdown = {
-        k: (0 if status_by_type[k] in {"CLAIMED", "EXPIRED"} else reward_amounts[k])
-        for k in ("GOLD", "PLATINUM", "DIAMOND")
-    }
-    loss_breakdown["BONUS"] = 0
-    loss_total = int(sum(loss_breakdown.values()))
-
-    return {
-        "gold_status": gold_status,
-        "platinum_status": platinum_status,
-        "diamond_status": diamond_status,
-        "platinum_attendance_days": platinum_attendance_days,
-        "platinum_deposit_done": platinum_deposit_done,
-        "platinum_review_done": platinum_review_done,
-        "telegram_ok": telegram_ok,
-        "diamond_deposit_current": diamond_deposit_current,
-        "gold_mission_1_done": gold_mission_1_done,
-        "gold_mission_2_done": gold_mission_2_done,
-        "gold_mission_3_done": gold_mission_3_done,
-        "platinum_mission_1_done": platinum_mission_1_done,
-        "platinum_mission_2_done": platinum_mission_2_done,
-        "diamond_mission_1_done": diamond_mission_1_done,
-        "diamond_mission_2_done": diamond_mission_2_done,
-        "expires_at": expires_at.isoformat(),
-        "now": now.isoformat(),
-        "loss_total": loss_total,
-        "loss_breakdown": loss_breakdown,
-        "ms_countdown": ms_countdown,
-        "social_proof": {"vault_type": "PLATINUM", "claimed_last_24h": 4231},
-        "curation_tier": "PLATINUM_BIASED",
-    }
+    expires_at, gold_status, platinum_status, diamond_status = row
+    current_status = {
+        "GOLD": gold_status,
+        "PLATINUM": platinum_status,
+        "DIAMOND": diamond_status,
+    }[vault_type]
+
+    validate_claim_request(vault_type, current_status)
+
+    cur.execute(
+        f"""
+        UPDATE vault_status
+           SET {status_col}='CLAIMED',
+               {claimed_at_col}=%s,
+               updated_at=NOW()
+         WHERE user_id=%s
+        """,
+        (now, user_id),
+    )
+    conn.commit()
+
+    return expires_at
 
 
 @router.post("/claim", response_model=ClaimResponse)
@@ -234,98 +402,50 @@ async def claim_vault(body: ClaimRequest, user_id: int | None = None, external_u
         raise HTTPException(status_code=400, detail="INVALID_VAULT_TYPE")
 
     now = now_utc()
-    status_col = f"{vault_type.lower()}_status"
-    claimed_at_col = f"{vault_type.lower()}_claimed_at"
+    async with db.get_async_conn() as conn:
+        expires_at = await conn.run(_claim, vault_type, user_id, external_user_id, now)
 
-    with db.get_conn() as conn:
-        cur = conn.cursor()
-        user_id = resolve_user_id(
-            cur, user_id=user_id, external_user_id=external_user_id,
-            default_user_id=1, create_if_missing=True
-        )
-        
-        # CSV 업로드 확인
-        if not check_user_csv_uploaded(cur, user_id) and config.APP_ENV not in {"test"}:
-            raise HTTPException(
-                status_code=403,
-                detail="CSV_UPLOAD_REQUIRED: 관리자가 회원 정보를 업로드해야 금고를 수령할 수 있습니다."
-            )
-        
-        cur.execute(
-            """
-            SELECT expires_at, gold_status, platinum_status, diamond_status
-              FROM vault_status
-             WHERE user_id=%s
-             FOR UPDATE
-            """,
-            (user_id,),
-        )
-        row = cur.fetchone()
+    return ClaimResponse(claimed=True, vault_type=vault_type, now=now.isoformat(), expires_at=expires_at.isoformat())
 
-        if not row:
-            expires_at = now + timedelta(hours=DEFAULT_EXPIRY_HOURS)
-            cur.execute(
-                """
-                INSERT INTO vault_status
-                    (user_id, expires_at, gold_status, platinum_status, diamond_status)
-                VALUES (%s, %s, 'LOCKED', 'LOCKED', 'LOCKED')
-                ON CONFLICT (user_id) DO NOTHING
-                """,
-                (user_id, expires_at),
-            )
-            cur.execute(
-                """
-                SELECT expires_at, gold_status, platinum_status, diamond_status
-                  FROM vault_status
-                 WHERE user_id=%s
-                 FOR UPDATE
-                """,
-                (user_id,),
-            )
-            row = cur.fetchone()
-
-        expires_at, gold_status, platinum_status, diamond_status = row
-        current_status = {
-            "GOLD": gold_status,
-            "PLATINUM": platinum_status,
-            "DIAMOND": diamond_status,
-        }[vault_type]
-
-        validate_claim_request(vault_type, current_status)
 
-        cur.execute(
-            f"""
-            UPDATE vault_status
-               SET {status_col}='CLAIMED',
-                   {claimed_at_col}=%s,
-                   updated_at=NOW()
-             WHERE user_id=%s
-            """,
-            (now, user_id),
+def _attend(conn, user_id: int | None, external_user_id: str | None, now: datetime) -> tuple[int, datetime]:
+    """Record today's attendance and return (new_days, expires_at)."""
+    cur = conn.cursor()
+    user_id = resolve_user_id(
+        cur, user_id=user_id, external_user_id=external_user_id,
+        default_user_id=None, create_if_missing=False
+    )
+    
+    # CSV 업로드 확인
+    if not check_user_csv_uploaded(cur, user_id):
+        raise HTTPException(
+            status_code=403,
+            detail="CSV_UPLOAD_REQUIRED: 관리자가 회원 정보를 업로드해야 출석체크를 할 수 있습니다."
         )
-        conn.commit()
-
-    return ClaimResponse(claimed=True, vault_type=vault_type, now=now.isoformat(), expires_at=expires_at.isoformat())
-
+    
+    cur.execute(
+        """
+        SELECT expires_at, platinum_attendance_days, last_attended_at, platinum_deposit_done, platinum_status
+          FROM vault_status
+         WHERE user_id=%s
+         FOR UPDATE
+        """,
+        (user_id,),
+    )
+    row = cur.fetchone()
 
-@router.post("/attendance", response_model=AttendanceResponse)
-async def attendance(user_id: int | None = None, external_user_id: str | None = None):
-    """Record attendance for platinum vault."""
-    now = now_utc()
-    with db.get_conn() as conn:
-        cur = conn.cursor()
-        user_id = resolve_user_id(
-            cur, user_id=user_id, external_user_id=external_user_id,
-            default_user_id=1, create_if_missing=True
+    if not row:
+        expires_at = now + timedelta(hours=DEFAULT_EXPIRY_HOURS)
+        cur.execute(
+            """
+            INSERT INTO vault_status
+                (user_id, expires_at, gold_status, platinum_status, diamond_status, 
+                 platinum_attendance_days, platinum_deposit_done, last_attended_at)
+            VALUES (%s, %s, 'LOCKED', 'LOCKED', 'LOCKED', 0, false, NULL)
+            ON CONFLICT (user_id) DO NOTHING
+            """,
+            (user_id, expires_at),
         )
-        
-        # CSV 업로드 확인
-        if not check_user_csv_uploaded(cur, user_id):
-            raise HTTPException(
-                status_code=403,
-                detail="CSV_UPLOAD_REQUIRED: 관리자가 회원 정보를 업로드해야 출석체크를 할 수 있습니다."
-            )
-        
         cur.execute(
             """
             SELECT expires_at, platinum_attendance_days, last_attended_at, platinum_deposit_done, platinum_status
@@ -337,65 +457,52 @@ async def attendance(user_id: int | None = None, external_user_id: str | None =
         )
         row = cur.fetchone()
 
-        if not row:
-            expires_at = now + timedelta(hours=DEFAULT_EXPIRY_HOURS)
-            cur.execute(
-                """
-                INSERT INTO vault_status
-                    (user_id, expires_at, gold_status, platinum_status, diamond_status, 
-                     platinum_attendance_days, platinum_deposit_done, last_attended_at)
-                VALUES (%s, %s, 'LOCKED', 'LOCKED', 'LOCKED', 0, false, NULL)
-                ON CONFLICT (user_id) DO NOTHING
-                """,
-                (user_id, expires_at),
-            )
-            cur.execute(
-                """
-                SELECT expires_at, platinum_attendance_days, last_attended_at, platinum_deposit_done, platinum_status
-                  FROM vault_status
-                 WHERE user_id=%s
-                 FOR UPDATE
-                """,
-                (user_id,),
-            )
-            row = cur.fetchone()
-
-        expires_at, days, last_attended_at, deposit_done, platinum_status = row
-        days = int(days or 0)
-        deposit_done = bool(deposit_done)
-
-        if last_attended_at is not None and last_attended_at.date() == now.date():
-            raise HTTPException(status_code=409, detail="ALREADY_ATTENDED")
+    expires_at, days, last_attended_at, deposit_done, platinum_status = row
+    days = int(days or 0)
+    deposit_done = bool(deposit_done)
 
-        cur.execute(
-            """
-            SELECT platinum_mission_1_done, platinum_mission_2_done
-              FROM vault_status
-             WHERE user_id=%s
-            """,
-            (user_id,),
-        )
-        mission_row = cur.fetchone()
-        m1 = mission_row[0] if mission_row else False
-        m2 = mission_row[1] if mission_row else False
+    if last_attended_at is not None and last_attended_at.date() == now.date():
+        raise HTTPException(status_code=409, detail="ALREADY_ATTENDED")
 
-        new_days = min(3, days + 1)
-        new_platinum_status = platinum_status
-        if new_days >= 3 and deposit_done and m1 and m2 and platinum_status == "LOCKED":
-            new_platinum_status = "UNLOCKED"
+    cur.execute(
+        """
+        SELECT platinum_mission_1_done, platinum_mission_2_done
+          FROM vault_status
+         WHERE user_id=%s
+        """,
+        (user_id,),
+    )
+    mission_row = cur.fetchone()
+    m1 = mission_row[0] if mission_row else False
+    m2 = mission_row[1] if mission_row else False
+
+    new_days = min(3, days + 1)
+    new_platinum_status = platinum_status
+    if new_days >= 3 and deposit_done and m1 and m2 and platinum_status == "LOCKED":
+        new_platinum_status = "UNLOCKED"
+
+    cur.execute(
+        """
+        UPDATE vault_status
+           SET platinum_attendance_days=%s,
+               last_attended_at=%s,
+               platinum_status=%s,
+               updated_at=NOW()
+         WHERE user_id=%s
+        """,
+        (new_days, now, new_platinum_status, user_id),
+    )
+    conn.commit()
 
-        cur.execute(
-            """
-            UPDATE vault_status
-               SET platinum_attendance_days=%s,
-                   last_attended_at=%s,
-                   platinum_status=%s,
-                   updated_at=NOW()
-             WHERE user_id=%s
-            """,
-            (new_days, now, new_platinum_status, user_id),
-        )
-        conn.commit()
+    return new_days, expires_at
+
+
+@router.post("/attendance", response_model=AttendanceResponse)
+async def attendance(user_id: int | None = None, external_user_id: str | None = None):
+    """Record attendance for platinum vault."""
+    now = now_utc()
+    async with db.get_async_conn() as conn:
+        new_days, expires_at = await conn.run(_attend, user_id, external_user_id, now)
 
     return AttendanceResponse(
         platinum_attendance_days=new_days,
@@ -6,6 +6,11 @@ class ClaimRequest(BaseModel):
     vault_type: str = Field(..., description="GOLD | PLATINUM | DIAMOND")
 
 
+class StatusBatchRequest(BaseModel):
+    user_ids: List[int] = Field(default_factory=list)
+    external_user_ids: List[str] = Field(default_factory=list)
+
+
 class ClaimResponse(BaseModel):
     claimed: bool
     vault_type: str
@@ -127,11 +132,13 @@ class AdminNotificationItem(BaseModel):
 
 
 class AdminNotificationsListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None  # count=none 이면 null
+    total_estimated: bool = False
     page: int
     page_size: int
     has_more: bool
     items: List[AdminNotificationItem]
+    next_cursor: Optional[str] = None
 
 
 class AdminNotificationActionResponse(BaseModel):
@@ -154,11 +161,13 @@ class AdminAuditLogItem(BaseModel):
 
 
 class AdminAuditLogListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None  # count=none 이면 null
+    total_estimated: bool = False
     page: int
     page_size: int
     has_more: bool
     items: List[AdminAuditLogItem]
+    next_cursor: Optional[str] = None
 
 
 class CompensationEnqueueRequest(BaseModel):
@@ -325,6 +334,7 @@ class DailyUserImportResponse(BaseModel):
     processed: int
     identity_created: int
     vault_rows_updated: int
+    unchanged: int = 0  # 기존 스냅샷과 동일해서 건너뛴 행
     job_id: Optional[str] = None
 
 
@@ -338,6 +348,8 @@ class AdminImportError(BaseModel):
 class AdminImportRequest(BaseModel):
     mode: Optional[str] = Field("APPLY", description="APPLY | SHADOW")
     rows: List[DailyUserImportRow]
+    background: Optional[bool] = Field(False, description="true: 202 + job_id, chunks applied by app/worker.py")
+    parallelism: Optional[int] = Field(None, ge=1, description="동시에 적용할 chunk 수 (기본: IMPORT_PARALLELISM)")
 
 
 class AdminImportResponse(BaseModel):
@@ -346,10 +358,46 @@ class AdminImportResponse(BaseModel):
     processed: int
     identity_created: int
     vault_rows_updated: int
+    unchanged: int = 0
     dedup_removed: int
     errors: List[AdminImportError] = Field(default_factory=list)
+    error_count: Optional[int] = None
     job_ids: Optional[List[str]] = None
     error_report_csv: Optional[str] = None
+    job_id: Optional[str] = None
+
+
+class ImportSessionCreateRequest(BaseModel):
+    chunk_total: Optional[int] = Field(None, ge=1, description="예정된 chunk 수 (있으면 commit 시 누락 chunk 검사)")
+
+
+class ImportSessionChunkRequest(BaseModel):
+    rows: List[DailyUserImportRow]
+
+
+class ImportSessionChunkResponse(BaseModel):
+    session_id: str
+    chunk_index: int
+    checksum: str
+    processed: int
+    unchanged: int = 0
+    identity_created: int
+    vault_rows_updated: int
+    errors: List[AdminImportError] = Field(default_factory=list)
+    replayed: bool = False  # 같은 checksum으로 이미 적용된 chunk
+
+
+class ImportSessionResponse(BaseModel):
+    session_id: str
+    status: str
+    chunk_total: Optional[int] = None
+    chunks_applied: List[int] = Field(default_factory=list)
+    missing_chunks: List[int] = Field(default_factory=list)
+    rows: int = 0
+    processed: int = 0
+    unchanged: int = 0
+    identity_created: int = 0
+    vault_rows_updated: int = 0
 
 
 class UserLoginRequest(BaseModel):
@@ -393,11 +441,13 @@ class AdminJobItem(BaseModel):
 
 
 class AdminJobsListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None  # count=none 이면 null
+    total_estimated: bool = False
     page: int
     page_size: int
     has_more: bool
     items: List[AdminJobResponse]
+    next_cursor: Optional[str] = None
 
 
 class AdminJobDetailResponse(BaseModel):
@@ -414,8 +464,10 @@ class AdminJobDetailResponse(BaseModel):
 
 
 class AdminJobItemsListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None  # count=none 이면 null
+    total_estimated: bool = False
     page: int
     page_size: int
     has_more: bool
     items: List[AdminJobItem]
+    next_cursor: Optional[str] = None
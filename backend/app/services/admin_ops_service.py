@@ -0,0 +1,262 @@
+"""Set-based admin operations over many users (bulk update, expiry extension).
+
+Each batch is a handful of statements regardless of its size: target rows are locked
+in one SELECT ... FOR UPDATE, new values are computed in SQL, and vault_status and
+admin_job_items are written with one statement each.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from psycopg2.extras import Json
+
+from app import config
+from app.constants.vault_config import DEFAULT_EXPIRY_HOURS
+from app.utils.sql_builders import _apply_job_timeouts
+
+# Platinum needs 3 attendance days; the admin UI omits `cap` when it is this default.
+BULK_ATTENDANCE_DEFAULT_CAP = 3
+
+
+def _batches(user_ids: list[int]):
+    size = max(1, config.ADMIN_BULK_BATCH_SIZE)
+    for i in range(0, len(user_ids), size):
+        yield user_ids[i : i + size]
+
+
+def ensure_vault_rows(cur, user_ids: list[int], now: datetime):
+    """Set-based `get_or_create_vault_row`: insert default LOCKED rows for ids that have none."""
+    cur.execute(
+        """
+        INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status)
+        SELECT uid, %s, 'LOCKED', 'LOCKED', 'LOCKED'
+          FROM unnest(%s::int[]) AS t(uid)
+        ON CONFLICT (user_id) DO NOTHING
+        """,
+        (now + timedelta(hours=DEFAULT_EXPIRY_HOURS), user_ids),
+    )
+
+
+def apply_bulk_update(
+    cur,
+    *,
+    job_id: str,
+    user_ids: list[int],
+    now: datetime,
+    status_updates: dict[str, str],
+    attendance: dict[str, Any] | None,
+    fail_all: str | None = None,
+) -> tuple[int, int]:
+    """Apply explicit tier statuses / attendance to `user_ids` and record admin_job_items.
+
+    Per-user rules match the single-user admin endpoints: a CLAIMED tier cannot be moved
+    back (CANNOT_MODIFY_CLAIMED); attendance moves by `delta` within 0..`cap`. `fail_all` marks every
+    item FAILED with that code without touching vault_status. Returns (processed, failed).
+    """
+    processed = 0
+    failed = 0
+    attendance = attendance or {}
+    params: dict[str, Any] = {
+        "job_id": job_id,
+        "now": now,
+        "fail_all": fail_all,
+        "gold": status_updates.get("gold_status"),
+        "platinum": status_updates.get("platinum_status"),
+        "diamond": status_updates.get("diamond_status"),
+        "has_attendance": bool(attendance),
+        "default_cap": BULK_ATTENDANCE_DEFAULT_CAP,
+        "delta": int(attendance.get("delta") or 0),
+        "cap": attendance.get("cap"),
+    }
+    for batch in _batches(user_ids):
+        if fail_all is None:
+            ensure_vault_rows(cur, batch, now)
+        cur.execute(
+            """
+            WITH targets AS (
+                SELECT uid, ord FROM unnest(%(ids)s::int[]) WITH ORDINALITY AS t(uid, ord)
+            ),
+            locked AS (
+                SELECT vs.user_id, vs.gold_status, vs.platinum_status, vs.diamond_status, vs.platinum_attendance_days
+                  FROM vault_status vs
+                 WHERE vs.user_id = ANY(%(ids)s)
+                 ORDER BY vs.user_id
+                   FOR UPDATE
+            ),
+            checked AS (
+                SELECT t.uid,
+                       t.ord,
+                       COALESCE(
+                           %(fail_all)s::text,
+                           CASE
+                               WHEN l.user_id IS NULL THEN 'VAULT_NOT_FOUND'
+                               WHEN (l.gold_status = 'CLAIMED' AND %(gold)s::text <> 'CLAIMED')
+                                 OR (l.platinum_status = 'CLAIMED' AND %(platinum)s::text <> 'CLAIMED')
+                                 OR (l.diamond_status = 'CLAIMED' AND %(diamond)s::text <> 'CLAIMED')
+                               THEN 'CANNOT_MODIFY_CLAIMED'
+                           END
+                       ) AS error
+                  FROM targets t
+                  LEFT JOIN locked l ON l.user_id = t.uid
+            ),
+            updated AS (
+                UPDATE vault_status AS vs
+                   SET gold_status = COALESCE(%(gold)s::text, vs.gold_status),
+                       platinum_status = COALESCE(%(platinum)s::text, vs.platinum_status),
+                       diamond_status = COALESCE(%(diamond)s::text, vs.diamond_status),
+                       platinum_attendance_days = CASE
+                           WHEN %(has_attendance)s THEN
+                               LEAST(COALESCE(%(cap)s::int, %(default_cap)s), GREATEST(0, COALESCE(vs.platinum_attendance_days, 0) + %(delta)s))
+                           ELSE vs.platinum_attendance_days
+                       END,
+                       last_attended_at = CASE WHEN %(has_attendance)s THEN %(now)s ELSE vs.last_attended_at END,
+                       updated_at = %(now)s
+                  FROM checked c
+                 WHERE vs.user_id = c.uid
+                   AND c.error IS NULL
+                RETURNING 1
+            ),
+            items AS (
+                INSERT INTO admin_job_items (job_id, user_id, status, error_message)
+                SELECT %(job_id)s,
+                       c.uid,
+                       CASE WHEN c.error IS NULL THEN 'DONE' ELSE 'FAILED' END,
+                       c.error
+                  FROM checked c
+                 ORDER BY c.ord
+                RETURNING status
+            )
+            SELECT COUNT(*), COUNT(*) FILTER (WHERE status = 'FAILED')
+              FROM items
+            """,
+            {**params, "ids": batch},
+        )
+        total, batch_failed = cur.fetchone()
+        processed += int(total or 0)
+        failed += int(batch_failed or 0)
+    return processed, failed
+
+
+_EXTEND_EXPIRY_BATCH_SQL = """
+WITH targets AS (
+    SELECT vs.user_id, vs.expires_at AS prev_expires_at
+      FROM vault_status vs
+      {joins}
+     WHERE ({where})
+       AND vs.user_id > %s
+       AND NOT EXISTS (
+           SELECT 1 FROM vault_expiry_extension_log l WHERE l.request_id = %s::text || ':' || vs.user_id
+       )
+     ORDER BY vs.user_id
+     LIMIT %s
+       FOR UPDATE OF vs
+),
+updated AS (
+    UPDATE vault_status AS vs
+       SET expires_at = GREATEST(vs.expires_at, %s) + %s * INTERVAL '1 hour',
+           gold_status = CASE WHEN vs.gold_status = 'EXPIRED' THEN 'LOCKED' ELSE vs.gold_status END,
+           platinum_status = CASE WHEN vs.platinum_status = 'EXPIRED' THEN 'LOCKED' ELSE vs.platinum_status END,
+           diamond_status = CASE WHEN vs.diamond_status = 'EXPIRED' THEN 'LOCKED' ELSE vs.diamond_status END,
+           expiry_extend_count = vs.expiry_extend_count + 1,
+           last_extension_reason = %s,
+           last_extension_at = %s
+      FROM targets t
+     WHERE vs.user_id = t.user_id
+    RETURNING vs.user_id, t.prev_expires_at, vs.expires_at AS new_expires_at
+),
+logged AS (
+    INSERT INTO vault_expiry_extension_log
+        (user_id, prev_expires_at, new_expires_at, reason, request_id, shadow, metadata)
+    SELECT u.user_id, u.prev_expires_at, u.new_expires_at, %s, %s::text || ':' || u.user_id, false, %s
+      FROM updated u
+    ON CONFLICT (request_id) DO NOTHING
+)
+SELECT (SELECT COUNT(*) FROM targets),
+       (SELECT MAX(user_id) FROM targets),
+       (SELECT new_expires_at FROM updated ORDER BY user_id DESC LIMIT 1),
+       (SELECT array_agg(user_id ORDER BY user_id) FROM updated)
+"""
+
+
+def count_extend_expiry_candidates(cur, *, joins: str, where_sql: str, params: list[Any]) -> tuple[int, list[int]]:
+    """Shadow run: (candidate count, first 10 user_ids)."""
+    cur.execute(
+        f"""
+        SELECT COUNT(*) OVER (), vs.user_id
+          FROM vault_status vs
+          {joins}
+         WHERE {where_sql}
+         ORDER BY vs.user_id
+         LIMIT 10
+        """,
+        tuple(params),
+    )
+    rows = cur.fetchall()
+    return (int(rows[0][0]) if rows else 0), [int(r[1]) for r in rows]
+
+
+def extend_expiry_batched(
+    conn,
+    *,
+    joins: str,
+    where_sql: str,
+    params: list[Any],
+    extend_hours: int,
+    reason: str,
+    request_id: str,
+    now: datetime,
+    metadata: dict[str, Any],
+    heartbeat: Callable[[Any], None] | None = None,
+) -> dict[str, Any]:
+    """Extend `expires_at` for every vault_status row matching `where_sql`, ADMIN_BULK_BATCH_SIZE users at a time.
+
+    The new deadline is GREATEST(expires_at, now) + extend_hours and EXPIRED tiers are
+    reopened as LOCKED (the next import re-evaluates their unlock conditions), so a vault
+    the expiry sweep already closed comes back exactly as if it had been extended in time.
+
+    Each batch is one statement (lock -> UPDATE ... RETURNING -> INSERT ... SELECT into
+    vault_expiry_extension_log) walking user_id in key order, committed on `conn` so row
+    locks are held for one batch only. Everything the caller did on `conn` before (e.g. the
+    IN_PROGRESS idempotency key) is committed with the first batch, and `heartbeat(cur)` runs
+    before every commit to renew that key's lease. Users that already have a log row for
+    `request_id` are skipped, so a retry after a failure (or, once the lease has run out,
+    after a crash) resumes instead of extending twice.
+    """
+    batch_size = max(1, config.ADMIN_BULK_BATCH_SIZE)
+    sql = _EXTEND_EXPIRY_BATCH_SQL.format(joins=joins, where=where_sql)
+    updated = 0
+    new_expires_at = None
+    sample_ids: list[int] = []
+    after = -(2**31)
+    cur = conn.cursor()
+    while True:
+        _apply_job_timeouts(cur)
+        cur.execute(
+            sql,
+            (
+                *params,
+                after,
+                request_id,
+                batch_size,
+                now,
+                extend_hours,
+                reason,
+                now,
+                reason,
+                request_id,
+                Json(metadata),
+            ),
+        )
+        batch_count, last_user_id, batch_expires_at, batch_ids = cur.fetchone()
+        if heartbeat is not None:
+            heartbeat(cur)
+        conn.commit()
+        updated += len(batch_ids or [])
+        if batch_expires_at is not None:
+            new_expires_at = batch_expires_at
+        sample_ids.extend((batch_ids or [])[: max(0, 1000 - len(sample_ids))])
+        if batch_count < batch_size:
+            break
+        after = last_user_id
+    _apply_job_timeouts(cur)
+    return {"updated": updated, "new_expires_at": new_expires_at, "user_ids": sample_ids}
@@ -0,0 +1,197 @@
+"""Scheduled notification campaigns (docs/BATCH_NOTIFICATION_VAULT_V2.md §2, §5).
+
+Audiences are selected from vault_status in SQL and enqueued set-based with the
+regular dedup_key (`{type}:{user_id}:base:{date}`, date from notification_service.dedup_day,
+the same basis as manual /notify), so re-running a slot on the same day only adds users who
+newly qualify.
+Runs from app/worker.py.
+"""
+
+import logging
+from datetime import datetime, time, timedelta, timezone
+from typing import Any
+
+from psycopg2.extras import Json
+
+from app import config
+from app.services.common import generate_job_id
+from app.services.notification_service import dedup_day, enqueue_notifications_from_query
+from app.services.notification_templates import template_cache
+from app.utils.sql_builders import _apply_job_timeouts
+
+logger = logging.getLogger("vault.campaign")
+
+# Tiers that can still be claimed (or lost); CLAIMED/EXPIRED are done.
+_OPEN_TIER = "{col} IN ('LOCKED','UNLOCKED')"
+
+# Audience filters. D-2 and D-0 windows are disjoint at one instant, but with several
+# slots a day a user can move from D-2 into D-0 between slots; see DEDUP_GROUPS.
+CAMPAIGN_AUDIENCES: dict[str, str] = {
+    "EXPIRY_D2": f"""
+        SELECT vs.user_id FROM vault_status vs
+         WHERE vs.expires_at > %(now)s + INTERVAL '24 hours'
+           AND vs.expires_at <= %(now)s + INTERVAL '48 hours'
+           AND ({_OPEN_TIER.format(col="vs.gold_status")}
+                OR {_OPEN_TIER.format(col="vs.platinum_status")}
+                OR {_OPEN_TIER.format(col="vs.diamond_status")})
+    """,
+    "EXPIRY_D0": f"""
+        SELECT vs.user_id FROM vault_status vs
+         WHERE vs.expires_at > %(now)s
+           AND vs.expires_at <= %(now)s + INTERVAL '24 hours'
+           AND ({_OPEN_TIER.format(col="vs.gold_status")}
+                OR {_OPEN_TIER.format(col="vs.platinum_status")}
+                OR {_OPEN_TIER.format(col="vs.diamond_status")})
+    """,
+    "ATTENDANCE_D2": f"""
+        SELECT vs.user_id FROM vault_status vs
+         WHERE vs.platinum_attendance_days = 2
+           AND {_OPEN_TIER.format(col="vs.platinum_status")}
+           AND vs.expires_at > %(now)s
+    """,
+}
+
+
+# A user gets at most one campaign of a group per day (one expiry reminder, D-2 or D-0).
+DEDUP_GROUPS: dict[str, tuple[str, ...]] = {
+    "EXPIRY_D2": ("EXPIRY_D2", "EXPIRY_D0"),
+    "EXPIRY_D0": ("EXPIRY_D2", "EXPIRY_D0"),
+}
+
+
+def _not_yet_notified_sql(group: tuple[str, ...]) -> str:
+    keys = ", ".join(f"%(group_{i})s::text || ':' || a.user_id || ':base:' || %(day)s" for i in range(len(group)))
+    return f"NOT EXISTS (SELECT 1 FROM notifications_queue nq WHERE nq.dedup_key IN ({keys}))"
+
+
+def run_campaign(cur, notify_type: str, *, now: datetime, shadow: bool) -> dict[str, Any]:
+    """Select and enqueue one campaign audience; with `shadow` only count. Records an admin_jobs row."""
+    day = dedup_day(now)
+    group = DEDUP_GROUPS.get(notify_type, (notify_type,))
+    not_notified = _not_yet_notified_sql(group)
+    params: dict[str, Any] = {"now": now, "day": day.isoformat(), **{f"group_{i}": t for i, t in enumerate(group)}}
+
+    cur.execute(
+        f"""
+        SELECT COUNT(*),
+               COUNT(*) FILTER (WHERE {not_notified})
+          FROM ({CAMPAIGN_AUDIENCES[notify_type]}) a
+        """,
+        params,
+    )
+    audience, new = (int(v or 0) for v in cur.fetchone())
+
+    enqueued = 0
+    if not shadow and new:
+        payload: dict[str, Any] = {"type": notify_type, "variant_id": None, "campaign": True}
+        template = template_cache.get(cur, notify_type)
+        if template:
+            payload.update(template)
+        enqueued = enqueue_notifications_from_query(
+            cur,
+            audience_sql=f"SELECT a.user_id FROM ({CAMPAIGN_AUDIENCES[notify_type]}) a WHERE {not_notified}",
+            audience_params=params,
+            notify_type=notify_type,
+            variant_id=None,
+            payload=payload,
+            scheduled_at=now,
+        )
+
+    job_id = generate_job_id()
+    cur.execute(
+        """
+        INSERT INTO admin_jobs
+            (job_id, type, status, request_id, target_count, processed, failed, payload, created_at, updated_at)
+        VALUES (%s, 'NOTIFY', 'DONE', %s, %s, %s, 0, %s, NOW(), NOW())
+        """,
+        (
+            job_id,
+            f"campaign:{notify_type}:{now.isoformat()}",
+            audience,
+            enqueued,
+            Json({"campaign": notify_type, "shadow": shadow, "audience": audience, "new": new, "enqueued": enqueued}),
+        ),
+    )
+    logger.info("campaign type=%s shadow=%s audience=%s new=%s enqueued=%s", notify_type, shadow, audience, new, enqueued)
+    return {"job_id": job_id, "type": notify_type, "shadow": shadow, "audience": audience, "new": new, "enqueued": enqueued}
+
+
+def _parse_slots(spec: str) -> list[time]:
+    slots = []
+    for part in spec.split(","):
+        part = part.strip()
+        if part:
+            hh, mm = part.split(":")
+            slots.append(time(int(hh), int(mm)))
+    return sorted(slots)
+
+
+class CampaignScheduler:
+    """Fires CAMPAIGN_TYPES at each CAMPAIGN_SCHEDULE slot (local times at CAMPAIGN_UTC_OFFSET_HOURS).
+
+    On start the most recent slot of today counts as due, so a worker restarted after
+    09:00 still runs the 09:00 batch; dedup keys make that repeat harmless.
+    """
+
+    def __init__(self, *, schedule: str | None = None, utc_offset_hours: int | None = None, types: list[str] | None = None, shadow: bool | None = None):
+        self.slots = _parse_slots(schedule if schedule is not None else config.CAMPAIGN_SCHEDULE)
+        offset = config.CAMPAIGN_UTC_OFFSET_HOURS if utc_offset_hours is None else utc_offset_hours
+        self.tz = timezone(timedelta(hours=offset))
+        self.types = types if types is not None else list(config.CAMPAIGN_TYPES)
+        unknown = set(self.types) - CAMPAIGN_AUDIENCES.keys()
+        if unknown:
+            raise ValueError(f"unknown campaign types: {sorted(unknown)}")
+        self.shadow = config.CAMPAIGN_SHADOW if shadow is None else shadow
+        self._last_slot: datetime | None = None
+
+    def due_slot(self, now: datetime) -> datetime | None:
+        """Latest slot at or before `now` that has not run yet (aware UTC datetime)."""
+        local = now.astimezone(self.tz)
+        latest = None
+        for day in (local.date() - timedelta(days=1), local.date()):
+            for slot in self.slots:
+                at = datetime.combine(day, slot, tzinfo=self.tz)
+                if at <= local:
+                    latest = at
+        if latest is None:
+            return None
+        latest = latest.astimezone(timezone.utc)
+        if self._last_slot is not None and latest <= self._last_slot:
+            return None
+        if self._last_slot is None and latest.astimezone(self.tz).date() != local.date():
+            # First pass: do not replay yesterday's last slot.
+            self._last_slot = latest
+            return None
+        return latest
+
+    def run_due(self, conn, now: datetime | None = None) -> list[dict[str, Any]]:
+        """Run every campaign for the due slot, one transaction each; returns their reports.
+
+        The slot is only marked done when no campaign raised, so a failed one is retried on the
+        next tick (campaigns that already ran add nothing thanks to their dedup keys).
+        """
+        now = now or datetime.now(timezone.utc)
+        slot = self.due_slot(now)
+        if slot is None:
+            return []
+        reports = []
+        failed = False
+        for notify_type in self.types:
+            cur = conn.cursor()
+            # One worker per campaign at a time; the others skip this slot.
+            cur.execute("SELECT pg_try_advisory_xact_lock(hashtext(%s))", (f"campaign:{notify_type}",))
+            if not cur.fetchone()[0]:
+                conn.rollback()
+                continue
+            _apply_job_timeouts(cur)
+            try:
+                reports.append(run_campaign(cur, notify_type, now=now, shadow=self.shadow))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                failed = True
+                logger.exception("campaign type=%s failed", notify_type)
+        if not failed:
+            self._last_slot = slot
+        return reports
+
@@ -4,7 +4,8 @@ Shared functions across services for DB operations, idempotency, parsing, etc.
 """
 
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, Dict
+import asyncio
 import hashlib
 import json
 import uuid
@@ -20,6 +21,9 @@ from app.utils.sql_builders import _apply_job_timeouts
 
 logger = logging.getLogger("vault.service")
 
+# NOTIFY channel the worker LISTENs on; payload names the queue that got new work.
+WORKER_WAKEUP_CHANNEL = "vault_worker_wakeup"
+
 
 def now_utc() -> datetime:
     """Return current UTC datetime."""
@@ -31,6 +35,11 @@ def generate_job_id() -> str:
     return f"job_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(4)}"
 
 
+def wake_workers(cur, queue: str):
+    """Queue a NOTIFY for the worker; Postgres delivers it only if the current transaction commits."""
+    cur.execute("SELECT pg_notify(%s, %s)", (WORKER_WAKEUP_CHANNEL, queue))
+
+
 def hash_request_body(body: Dict[str, Any]) -> str:
     """Hash request body for idempotency comparison."""
     payload = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
@@ -75,6 +84,8 @@ def idempotency_start(cur, *, key: str, scope: str, endpoint: str, request_hash:
                 "response_status": int(response_status or 200),
                 "response_body": response_body,
             }
+        if idempotency_take_over(cur, key=key, scope=scope, endpoint=endpoint):
+            return {"status": "recorded"}
         return {"status": "in_progress"}
 
     cur.execute(
@@ -130,18 +141,45 @@ def idempotency_start(cur, *, key: str, scope: str, endpoint: str, request_hash:
     raise HTTPException(status_code=409, detail="IDEMPOTENCY_CONFLICT")
 
 
-def idempotency_finish(cur, *, key: str, scope: str, endpoint: str, response_status: int, response_body: Dict[str, Any]):
-    """Finish idempotency record with response."""
+def idempotency_lookup(cur, *, key: str, scope: str, endpoint: str) -> Dict[str, Any] | None:
+    """Return the live record for a key without claiming it (None if there is none)."""
+    cur.execute(
+        """
+        SELECT request_hash, status, response_status, response_body
+          FROM idempotency_keys
+         WHERE key=%s AND scope=%s AND endpoint=%s
+           AND expires_at > NOW()
+        """,
+        (key, scope, endpoint),
+    )
+    row = cur.fetchone()
+    if not row:
+        return None
+    return {"request_hash": row[0], "status": row[1], "response_status": row[2], "response_body": row[3]}
+
+
+def idempotency_finish(
+    cur,
+    *,
+    key: str,
+    scope: str,
+    endpoint: str,
+    response_status: int,
+    response_body: Dict[str, Any],
+    request_hash: str | None = None,
+):
+    """Finish idempotency record with response (request_hash replaces a provisional one, e.g. for streamed bodies)."""
     cur.execute(
         """
         UPDATE idempotency_keys
            SET status='DONE',
+               request_hash=COALESCE(%s, request_hash),
                response_status=%s,
                response_body=%s,
                updated_at=NOW()
          WHERE key=%s AND scope=%s AND endpoint=%s
         """,
-        (response_status, Json(response_body), key, scope, endpoint),
+        (request_hash, response_status, Json(response_body), key, scope, endpoint),
     )
     logger.info(
         "idempotency_done endpoint=%s scope=%s key=%s status=DONE response_status=%s",
@@ -149,6 +187,41 @@ def idempotency_finish(cur, *, key: str, scope: str, endpoint: str, response_sta
     )
 
 
+def idempotency_touch(cur, *, key: str, scope: str, endpoint: str):
+    """Renew the lease of an IN_PROGRESS key that was committed early (call once per committed batch)."""
+    cur.execute(
+        "UPDATE idempotency_keys SET updated_at=NOW() WHERE key=%s AND scope=%s AND endpoint=%s AND status='IN_PROGRESS'",
+        (key, scope, endpoint),
+    )
+
+
+def idempotency_take_over(cur, *, key: str, scope: str, endpoint: str) -> bool:
+    """Claim an IN_PROGRESS key whose lease ran out (its request crashed); the caller has already checked the hash."""
+    cur.execute(
+        """
+        UPDATE idempotency_keys
+           SET updated_at=NOW()
+         WHERE key=%s AND scope=%s AND endpoint=%s
+           AND status='IN_PROGRESS'
+           AND updated_at <= NOW() - make_interval(secs => %s)
+        """,
+        (key, scope, endpoint, config.IDEMPOTENCY_LEASE_SECONDS),
+    )
+    if cur.rowcount != 1:
+        return False
+    logger.warning("idempotency_taken_over endpoint=%s scope=%s key=%s", endpoint, scope, key)
+    return True
+
+
+def idempotency_release(cur, *, key: str, scope: str, endpoint: str):
+    """Drop an IN_PROGRESS key that was committed early so the request can be retried."""
+    cur.execute(
+        "DELETE FROM idempotency_keys WHERE key=%s AND scope=%s AND endpoint=%s AND status='IN_PROGRESS'",
+        (key, scope, endpoint),
+    )
+    logger.info("idempotency_released endpoint=%s scope=%s key=%s", endpoint, scope, key)
+
+
 def parse_bool(value) -> bool:
     """Parse boolean from various input formats."""
     if value is None:
@@ -261,3 +334,30 @@ def normalize_external_user_id(value: str | None) -> str | None:
         return None
     v = str(value).strip()
     return v or None
+
+
+async def gather_bounded(
+    fn: Callable[[Any], Awaitable[Any]],
+    items: list[Any],
+    *,
+    concurrency: int,
+    timeout_seconds: float,
+    timeout_error: str = "TIMEOUT",
+) -> list[tuple[Any, str | None]]:
+    """Await `fn(item)` for every item, at most `concurrency` at a time, each bounded by `timeout_seconds`.
+
+    Returns (item, error) pairs in input order; error is None on success.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(item):
+        async with sem:
+            try:
+                await asyncio.wait_for(fn(item), timeout_seconds)
+                return item, None
+            except asyncio.TimeoutError:
+                return item, timeout_error
+            except Exception as exc:
+                return item, f"{type(exc).__name__}: {exc}"
+
+    return await asyncio.gather(*(_one(item) for item in items))
@@ -0,0 +1,128 @@
+"""Compensation queue consumer: claim due compensation_queue rows and call the external service.
+
+Used by app/worker.py. Like notification delivery, a batch is claimed with
+FOR UPDATE SKIP LOCKED and stays locked until its results are written, so several
+worker processes can drain the queue at once. External calls run concurrently
+(COMPENSATION_CONCURRENCY); every outcome of a batch is written with one UPDATE.
+"""
+
+import abc
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from psycopg2.extras import execute_values
+
+from app import config
+from app.services.common import gather_bounded
+from app.utils.sql_builders import _apply_job_timeouts
+
+logger = logging.getLogger("vault.compensation")
+
+
+class CompensationClient(abc.ABC):
+    """External reward-service interface. `call()` raises to report a failed attempt."""
+
+    @abc.abstractmethod
+    async def call(self, item: dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class SimulatedCompensationClient(CompensationClient):
+    """Stand-in until the reward service is integrated: every call succeeds."""
+
+    async def call(self, item: dict[str, Any]) -> None:
+        return None
+
+
+def claim_due_compensations(cur, *, limit: int, now: datetime) -> list[dict[str, Any]]:
+    """Lock up to `limit` due PENDING/RETRYING rows; rows locked by other workers are skipped."""
+    cur.execute(
+        """
+        SELECT id, user_id, vault_type, request_id, external_service, payload, retry_count
+          FROM compensation_queue
+         WHERE status IN ('PENDING','RETRYING')
+           AND next_retry_at <= %s
+         ORDER BY next_retry_at ASC, id ASC
+         LIMIT %s
+           FOR UPDATE SKIP LOCKED
+        """,
+        (now, limit),
+    )
+    cols = ("id", "user_id", "vault_type", "request_id", "external_service", "payload", "retry_count")
+    return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+
+def record_compensation_results(cur, results: list[tuple[dict[str, Any], str | None]], *, now: datetime) -> dict[str, int]:
+    """Write DONE / RETRYING / FAILED for a claimed batch in a single UPDATE ... FROM (VALUES ...)."""
+    counts = {"done": 0, "retrying": 0, "failed": 0}
+    rows = []
+    for item, error in results:
+        if error is None:
+            rows.append((item["id"], "DONE", item["retry_count"], None, None))
+            counts["done"] += 1
+            continue
+        retry = int(item["retry_count"] or 0) + 1
+        if retry >= config.COMPENSATION_MAX_RETRIES:
+            rows.append((item["id"], "FAILED", retry, None, f"max retries reached: {error}"[:500]))
+            counts["failed"] += 1
+        else:
+            steps = config.COMPENSATION_BACKOFF_SECONDS
+            backoff = steps[min(retry - 1, len(steps) - 1)]
+            rows.append((item["id"], "RETRYING", retry, now + timedelta(seconds=backoff), error[:500]))
+            counts["retrying"] += 1
+    if rows:
+        execute_values(
+            cur,
+            """
+            UPDATE compensation_queue AS cq
+               SET status = r.status,
+                   retry_count = r.retry_count,
+                   next_retry_at = COALESCE(r.next_retry_at, cq.next_retry_at),
+                   last_error = r.last_error
+              FROM (VALUES %s) AS r(id, status, retry_count, next_retry_at, last_error)
+             WHERE cq.id = r.id
+            """,
+            rows,
+            template="(%s::bigint, %s, %s::int, %s::timestamptz, %s)",
+            page_size=max(len(rows), 1),
+        )
+    return counts
+
+
+async def process_compensations_once(
+    conn,
+    client: CompensationClient,
+    *,
+    batch_size: int | None = None,
+    concurrency: int | None = None,
+) -> dict[str, int]:
+    """Claim one batch, call the external service concurrently and record all outcomes."""
+
+    def _claim():
+        cur = conn.cursor()
+        _apply_job_timeouts(cur)
+        return claim_due_compensations(cur, limit=batch_size or config.COMPENSATION_BATCH_SIZE, now=datetime.now(timezone.utc))
+
+    batch = await asyncio.to_thread(_claim)
+    if not batch:
+        await asyncio.to_thread(conn.rollback)
+        return {"claimed": 0, "done": 0, "retrying": 0, "failed": 0}
+
+    results = await gather_bounded(
+        client.call,
+        batch,
+        concurrency=concurrency or config.COMPENSATION_CONCURRENCY,
+        timeout_seconds=config.COMPENSATION_CALL_TIMEOUT_MS / 1000,
+        timeout_error="CALL_TIMEOUT",
+    )
+
+    def _record():
+        counts = record_compensation_results(conn.cursor(), results, now=datetime.now(timezone.utc))
+        conn.commit()
+        return counts
+
+    counts = await asyncio.to_thread(_record)
+    logger.info("compensation_batch claimed=%s done=%s retrying=%s failed=%s", len(batch), counts["done"], counts["retrying"], counts["failed"])
+    return {"claimed": len(batch), **counts}
@@ -0,0 +1,131 @@
+"""Expiry sweep: flip LOCKED/UNLOCKED tiers of overdue vaults to EXPIRED.
+
+Runs from app/worker.py (docs/BATCH_NOTIFICATION_VAULT_V2.md §2, 만료 배치). Rows are
+walked in (expires_at, user_id) order over idx_vault_status_expires_at, one short
+transaction per EXPIRY_SWEEP_BATCH_SIZE rows. Rows locked by a concurrent
+claim/attendance are skipped and picked up by the next run.
+
+Imports never move a swept vault back into the future: their expires_at update only
+touches vaults matching OPEN_TIER_SQL. extend-expiry is the admin rescue path and targets
+EXTENDABLE_TIER_SQL instead; it reopens EXPIRED tiers as LOCKED and extends from
+GREATEST(expires_at, now), so extending before or after the sweep ends in the same state.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any
+
+from psycopg2.extras import Json
+
+from app import config
+from app.services.common import generate_job_id
+from app.utils.sql_builders import _apply_job_timeouts
+
+logger = logging.getLogger("vault.expiry")
+
+_TIERS = ("gold", "platinum", "diamond")
+_OPEN = "('LOCKED','UNLOCKED')"
+_ANY_OPEN = " OR ".join(f"vs.{t}_status IN {_OPEN}" for t in _TIERS)
+
+# vault_status(vs) has at least one tier that can still expire.
+OPEN_TIER_SQL = f"({_ANY_OPEN})"
+
+# vault_status(vs) has at least one tier an admin can still extend (open or EXPIRED).
+EXTENDABLE_TIER_SQL = "(" + " OR ".join(f"vs.{t}_status != 'CLAIMED'" for t in _TIERS) + ")"
+
+_SWEEP_BATCH_SQL = f"""
+WITH batch AS (
+    SELECT vs.user_id, vs.expires_at, vs.gold_status, vs.platinum_status, vs.diamond_status
+      FROM vault_status vs
+     WHERE vs.expires_at <= %(now)s
+       AND vs.expires_at >= %(after_expires_at)s
+       AND (vs.expires_at, vs.user_id) > (%(after_expires_at)s, %(after_user_id)s)
+       AND ({_ANY_OPEN})
+     ORDER BY vs.expires_at, vs.user_id
+     LIMIT %(limit)s
+       FOR UPDATE SKIP LOCKED
+),
+updated AS (
+    UPDATE vault_status AS vs
+       SET {", ".join(f"{t}_status = CASE WHEN vs.{t}_status IN {_OPEN} THEN 'EXPIRED' ELSE vs.{t}_status END" for t in _TIERS)},
+           updated_at = %(now)s
+      FROM batch b
+     WHERE vs.user_id = b.user_id
+    RETURNING 1
+),
+last_key AS (
+    SELECT expires_at, user_id FROM batch ORDER BY expires_at DESC, user_id DESC LIMIT 1
+)
+SELECT (SELECT COUNT(*) FROM updated),
+       {", ".join(f"(SELECT COUNT(*) FROM batch WHERE {t}_status IN {_OPEN})" for t in _TIERS)},
+       (SELECT expires_at FROM last_key),
+       (SELECT user_id FROM last_key)
+"""
+
+_SHADOW_SQL = f"""
+SELECT COUNT(*),
+       {", ".join(f"COUNT(*) FILTER (WHERE vs.{t}_status IN {_OPEN})" for t in _TIERS)}
+  FROM vault_status vs
+ WHERE vs.expires_at <= %(now)s
+   AND ({_ANY_OPEN})
+"""
+
+
+def sweep_expired_vaults(conn, *, now: datetime, shadow: bool = False, batch_size: int | None = None) -> dict[str, Any]:
+    """Expire open tiers of vaults with expires_at <= `now`; returns per-tier counts.
+
+    With `shadow` nothing is written except the admin_jobs report row.
+    """
+    batch_size = max(1, batch_size or config.EXPIRY_SWEEP_BATCH_SIZE)
+    counts = {"users": 0, "gold": 0, "platinum": 0, "diamond": 0, "batches": 0}
+    cur = conn.cursor()
+
+    if shadow:
+        _apply_job_timeouts(cur)
+        cur.execute(_SHADOW_SQL, {"now": now})
+        users, gold, platinum, diamond = cur.fetchone()
+        counts.update(users=int(users), gold=int(gold), platinum=int(platinum), diamond=int(diamond))
+    else:
+        after_expires_at, after_user_id = datetime.min.replace(tzinfo=now.tzinfo), -(2**31)
+        while True:
+            _apply_job_timeouts(cur)
+            cur.execute(
+                _SWEEP_BATCH_SQL,
+                {"now": now, "after_expires_at": after_expires_at, "after_user_id": after_user_id, "limit": batch_size},
+            )
+            users, gold, platinum, diamond, last_expires_at, last_user_id = cur.fetchone()
+            conn.commit()
+            if not users:
+                break
+            counts["batches"] += 1
+            counts["users"] += int(users)
+            counts["gold"] += int(gold)
+            counts["platinum"] += int(platinum)
+            counts["diamond"] += int(diamond)
+            if users < batch_size:
+                break
+            after_expires_at, after_user_id = last_expires_at, last_user_id
+
+    if counts["users"] or shadow:
+        job_id = generate_job_id()
+        cur.execute(
+            """
+            INSERT INTO admin_jobs
+                (job_id, type, status, request_id, target_count, processed, failed, payload, created_at, updated_at)
+            VALUES (%s, 'EXPIRY_SWEEP', 'DONE', %s, %s, %s, 0, %s, NOW(), NOW())
+            """,
+            (
+                job_id,
+                f"expiry-sweep:{now.isoformat()}",
+                counts["users"],
+                0 if shadow else counts["users"],
+                Json({**counts, "shadow": shadow, "now": now.isoformat()}),
+            ),
+        )
+        conn.commit()
+        counts["job_id"] = job_id
+    logger.info(
+        "expiry_sweep shadow=%s users=%s gold=%s platinum=%s diamond=%s batches=%s",
+        shadow, counts["users"], counts["gold"], counts["platinum"], counts["diamond"], counts["batches"],
+    )
+    return {**counts, "shadow": shadow}
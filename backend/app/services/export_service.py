@@ -0,0 +1,68 @@
+"""Streaming CSV exports for admin lists (job items, audit log, notifications).
+
+Rows are read through a server-side (named) cursor, EXPORT_FETCH_BATCH_SIZE rows per
+FETCH, and each batch is encoded and sent before the next one is fetched, so memory
+stays flat regardless of export size. The pooled connection is held only while the
+response is streaming.
+"""
+
+import csv
+import io
+from typing import Any, AsyncIterator, Callable, Sequence
+from uuid import uuid4
+
+import psycopg2
+from fastapi.responses import StreamingResponse
+
+from app import config, db
+from app.utils.sql_builders import _apply_job_timeouts
+
+
+async def stream_csv_rows(
+    query: str,
+    params: Sequence[Any],
+    *,
+    header: Sequence[str],
+    format_row: Callable[[tuple], Sequence[Any]],
+    batch_size: int | None = None,
+) -> AsyncIterator[str]:
+    """Yield the CSV header, then one chunk of CSV lines per fetched batch of `query`."""
+    batch_size = batch_size or config.EXPORT_FETCH_BATCH_SIZE
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    yield buf.getvalue()
+
+    async with db.get_async_conn() as conn:
+
+        def _open(raw):
+            cur = raw.cursor(name=f"csv_export_{uuid4().hex}")
+            cur.itersize = batch_size
+            _apply_job_timeouts(raw.cursor())
+            cur.execute(query, tuple(params))
+            return cur
+
+        cur = await conn.run(_open)
+        try:
+            while True:
+                rows = await conn.run(lambda _raw: cur.fetchmany(batch_size))
+                if not rows:
+                    break
+                buf.seek(0)
+                buf.truncate()
+                writer.writerows(format_row(row) for row in rows)
+                yield buf.getvalue()
+        finally:
+
+            def _close(_raw):
+                try:
+                    cur.close()
+                except psycopg2.Error:
+                    pass
+
+            await conn.run(_close)
+
+
+def csv_response(chunks: AsyncIterator[str], filename: str) -> StreamingResponse:
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    return StreamingResponse(chunks, media_type="text/csv; charset=utf-8", headers=headers)
@@ -0,0 +1,643 @@
+"""Daily/admin import service layer.
+
+COPY-based staging of import rows, set-based application to user_admin_snapshot /
+vault_status, parallel chunk application, resumable import sessions, and the chunk
+queue used by background import jobs (app/worker.py).
+"""
+
+import csv
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Iterable
+
+from fastapi import HTTPException
+from psycopg2.extras import Json
+
+from app import config, db
+from app.constants.vault_config import DEFAULT_EXPIRY_HOURS, DIAMOND_UNLOCK, PLATINUM_UNLOCK
+from app.schemas import DailyUserImportRow
+from app.services.common import (
+    generate_job_id,
+    normalize_external_user_id,
+    now_utc,
+    parse_bool,
+    parse_int,
+    parse_iso_datetime,
+)
+from app.services.expiry_service import OPEN_TIER_SQL
+from app.services.user_identity_service import identity_cache
+from app.utils.sql_builders import _apply_job_timeouts
+
+IMPORT_STAGING_COLUMNS = (
+    "seq",
+    "external_user_id",
+    "nickname",
+    "joined_date",
+    "deposit_total",
+    "last_deposit_at",
+    "telegram_ok",
+    "review_ok",
+    "attendance_count",
+)
+
+
+def parse_import_joined_date(value: str | None) -> date | None:
+    """Parse joined date (YYYY-MM-DD); raises INVALID_JOINED_DATE."""
+    if value is None:
+        return None
+    v = str(value).strip()
+    if not v:
+        return None
+    try:
+        return date.fromisoformat(v)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="INVALID_JOINED_DATE")
+
+
+class _CsvCopySource:
+    """File-like source for copy_expert that encodes CSV rows only as COPY reads them.
+
+    Keeps one read() worth of bytes in memory instead of the whole chunk as text and again as bytes.
+    csv.writer emits None as an unquoted empty field, which COPY reads as NULL.
+    """
+
+    def __init__(self, rows: Iterable[list[Any]]):
+        self._rows = iter(rows)
+        self._line = io.StringIO()
+        self._writer = csv.writer(self._line)
+        self._pending = b""
+
+    def read(self, size: int = -1) -> bytes:
+        parts = [self._pending]
+        length = len(self._pending)
+        while size < 0 or length < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+            data = self._line.getvalue().encode("utf-8")
+            self._line.seek(0)
+            self._line.truncate()
+            parts.append(data)
+            length += len(data)
+        buf = b"".join(parts)
+        if size < 0:
+            self._pending = b""
+            return buf
+        self._pending = buf[size:]
+        return buf[:size]
+
+
+def stage_import_rows(cur, rows: list[tuple[str, Any]]) -> int:
+    """COPY parsed import rows into the `import_staging` temp table and resolve their user_ids.
+
+    `rows` are (external_user_id, DailyUserImportRow) pairs, already de-duplicated.
+    Returns the number of user_identity rows created.
+    """
+    # Temp table lives until the end of the transaction; TRUNCATE lets several chunks share it.
+    cur.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS import_staging (
+            seq INT NOT NULL,
+            external_user_id TEXT NOT NULL,
+            nickname TEXT,
+            joined_date DATE,
+            deposit_total BIGINT NOT NULL,
+            last_deposit_at TIMESTAMPTZ,
+            telegram_ok BOOLEAN NOT NULL,
+            review_ok BOOLEAN NOT NULL,
+            attendance_count INT NOT NULL,
+            user_id BIGINT
+        ) ON COMMIT DROP
+        """
+    )
+    cur.execute("TRUNCATE import_staging")
+
+    staged = (
+        [
+            seq,
+            ext,
+            str(getattr(r, "nickname", "") or "").strip() or None,
+            parse_import_joined_date(getattr(r, "joined_at", None)),
+            max(0, parse_int(getattr(r, "deposit_total", 0), default=0)),
+            parse_iso_datetime(getattr(r, "last_deposit_at", None)),
+            parse_bool(getattr(r, "telegram_ok", False)),
+            parse_bool(getattr(r, "review_ok", False)),
+            max(0, parse_int(getattr(r, "cc_attendance_count", 0), default=0)),
+        ]
+        for seq, (ext, r) in enumerate(rows)
+    )
+    cur.copy_expert(
+        f"COPY import_staging ({', '.join(IMPORT_STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv, ENCODING 'UTF8')",
+        _CsvCopySource(staged),
+    )
+
+    cur.execute(
+        """
+        INSERT INTO user_identity (external_user_id)
+        SELECT external_user_id
+          FROM import_staging
+         ORDER BY external_user_id
+        ON CONFLICT (external_user_id) DO NOTHING
+     RETURNING external_user_id
+        """
+    )
+    created_ids = {row[0] for row in cur.fetchall()}
+    created = len(created_ids)
+    identity_cache.forget_missing(created_ids)
+    # Not cached from here: this transaction (or an earlier chunk in it) may have created
+    # these ids and can still roll back. They are cached by the next read-only lookup.
+    cur.execute(
+        """
+        UPDATE import_staging AS s
+           SET user_id = ui.user_id
+          FROM user_identity ui
+         WHERE ui.external_user_id = s.external_user_id
+        """
+    )
+    cur.execute("ANALYZE import_staging")
+    return created
+
+
+def apply_staged_snapshots(cur, default_expires: datetime) -> int:
+    """Upsert user_admin_snapshot and ensure vault_status rows for everything in `import_staging`.
+
+    Rows identical to the stored snapshot are left alone; returns the number of snapshots written.
+    """
+    cur.execute(
+        """
+        INSERT INTO user_admin_snapshot
+            (user_id, nickname, joined_date, deposit_total, last_deposit_at, telegram_ok, review_ok, updated_at)
+        SELECT user_id, nickname, joined_date, deposit_total, last_deposit_at, telegram_ok, review_ok, NOW()
+          FROM import_staging
+         ORDER BY user_id
+        ON CONFLICT (user_id) DO UPDATE
+           SET nickname=EXCLUDED.nickname,
+               joined_date=EXCLUDED.joined_date,
+               deposit_total=EXCLUDED.deposit_total,
+               last_deposit_at=EXCLUDED.last_deposit_at,
+               telegram_ok=EXCLUDED.telegram_ok,
+               review_ok=EXCLUDED.review_ok,
+               updated_at=NOW()
+         WHERE (user_admin_snapshot.nickname, user_admin_snapshot.joined_date, user_admin_snapshot.deposit_total,
+                user_admin_snapshot.last_deposit_at, user_admin_snapshot.telegram_ok, user_admin_snapshot.review_ok)
+               IS DISTINCT FROM
+               (EXCLUDED.nickname, EXCLUDED.joined_date, EXCLUDED.deposit_total,
+                EXCLUDED.last_deposit_at, EXCLUDED.telegram_ok, EXCLUDED.review_ok)
+        """
+    )
+    written = int(cur.rowcount or 0)
+
+    cur.execute(
+        """
+        INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status)
+        SELECT user_id, %s, 'LOCKED', 'LOCKED', 'LOCKED'
+          FROM import_staging
+         ORDER BY user_id
+        ON CONFLICT (user_id) DO NOTHING
+        """,
+        (default_expires,),
+    )
+    return written
+
+
+def staged_user_ids(cur) -> list[int]:
+    """user_ids in `import_staging`, in input order."""
+    cur.execute("SELECT user_id FROM import_staging ORDER BY seq")
+    return [int(r[0]) for r in cur.fetchall()]
+
+
+def _update_if_changed(alias: str, assignments: dict[str, str]) -> tuple[str, str]:
+    """SET clause plus a predicate that only matches rows the assignments would actually change.
+
+    Skipping no-op updates avoids dead tuples, WAL and `updated_at` churn on re-imports.
+    """
+    set_sql = ",\n".join(f"{col} = {expr}" for col, expr in assignments.items())
+    current = ", ".join(f"{alias}.{col}" for col in assignments)
+    new = ", ".join(assignments.values())
+    return set_sql, f"({current}) IS DISTINCT FROM ({new})"
+
+
+def bump_platinum_progress(cur):
+    """Count an import day towards platinum attendance and unlock when all conditions hold.
+
+    Every imported user gets one attendance day per UTC day (`last_attended_at`, shared
+    with the attendance endpoint), so a file re-sent on the same day counts nothing twice.
+    Rows the bump would not change are not rewritten.
+    """
+    new_day = "(vs.last_attended_at IS NULL OR vs.last_attended_at < %(today)s)"
+    days = f"LEAST(3, vs.platinum_attendance_days + CASE WHEN {new_day} THEN 1 ELSE 0 END)"
+    set_sql, changed = _update_if_changed(
+        "vs",
+        {
+            "platinum_attendance_days": days,
+            "last_attended_at": f"CASE WHEN {new_day} AND vs.platinum_attendance_days < 3 THEN NOW() ELSE vs.last_attended_at END",
+            "platinum_deposit_total": "GREATEST(COALESCE(vs.platinum_deposit_total, 0), uas.deposit_total)",
+            "platinum_status": f"""CASE
+                   WHEN vs.platinum_status IN ('LOCKED','ACTIVE')
+                        AND uas.review_ok
+                        AND (GREATEST(COALESCE(vs.platinum_deposit_total, 0), uas.deposit_total) >= {PLATINUM_UNLOCK['deposit_total']})
+                        AND {days} >= 3
+                   THEN 'UNLOCKED'
+                   ELSE vs.platinum_status
+               END""",
+        },
+    )
+    cur.execute(
+        f"""
+        UPDATE vault_status AS vs
+           SET {set_sql}
+          FROM import_staging v
+          JOIN user_admin_snapshot uas ON uas.user_id = v.user_id
+         WHERE vs.user_id = v.user_id
+           AND {changed}
+        """,
+        {"today": datetime.combine(now_utc().date(), time.min, tzinfo=timezone.utc)},
+    )
+
+
+def _diamond_unlock_expr() -> str:
+    return f"""CASE
+                   WHEN vs.diamond_status IN ('LOCKED','ACTIVE')
+                        AND vs.platinum_status = 'CLAIMED'
+                        AND v.deposit_total >= {DIAMOND_UNLOCK['deposit_total']} THEN 'UNLOCKED'
+                   ELSE vs.diamond_status
+               END"""
+
+
+# EXPIRED is terminal: vaults without an open tier keep their expires_at.
+_EXPIRES_FROM_LAST_DEPOSIT = f"""CASE
+                   WHEN v.last_deposit_at IS NOT NULL AND {OPEN_TIER_SQL} THEN v.last_deposit_at + INTERVAL '5 days'
+                   ELSE vs.expires_at
+               END"""
+
+
+def _update_vault_from_staging(cur, assignments: dict[str, str]) -> int:
+    set_sql, changed = _update_if_changed("vs", assignments)
+    cur.execute(
+        f"""
+        UPDATE vault_status AS vs
+           SET {set_sql},
+               updated_at = NOW()
+          FROM import_staging AS v
+         WHERE vs.user_id = v.user_id
+           AND {changed}
+        """
+    )
+    return int(cur.rowcount or 0)
+
+
+def apply_daily_import_vault_updates(cur) -> int:
+    """user-daily-import tier update from `import_staging`; returns vault rows actually changed."""
+    return _update_vault_from_staging(
+        cur,
+        {
+            "diamond_deposit_total": "v.deposit_total",
+            "diamond_deposit_current": "v.deposit_total",
+            "diamond_attendance_days": "GREATEST(COALESCE(vs.diamond_attendance_days, 0), v.attendance_count)",
+            "gold_mission_1_done": "v.telegram_ok",
+            "gold_status": """CASE
+                   WHEN vs.gold_status IN ('CLAIMED','EXPIRED') THEN vs.gold_status
+                   WHEN v.telegram_ok THEN 'UNLOCKED'
+                   ELSE vs.gold_status
+               END""",
+            "platinum_deposit_total": "GREATEST(COALESCE(vs.platinum_deposit_total, 0), v.deposit_total)",
+            "diamond_status": _diamond_unlock_expr(),
+            "expires_at": _EXPIRES_FROM_LAST_DEPOSIT,
+        },
+    )
+
+
+def apply_import_chunk(cur, cleaned_rows: list[tuple[int, Any, str]]) -> dict[str, Any]:
+    """Apply one admin import chunk of (row_index, row, external_user_id) via `import_staging`."""
+    if not cleaned_rows:
+        return {"processed": 0, "unchanged": 0, "identity_created": 0, "vault_rows_updated": 0, "target_user_ids": []}
+
+    default_expires = now_utc() + timedelta(hours=DEFAULT_EXPIRY_HOURS)
+
+    identity_created = stage_import_rows(cur, [(ext, r) for (_, r, ext) in cleaned_rows])
+    written = apply_staged_snapshots(cur, default_expires)
+
+    vault_rows_updated = _update_vault_from_staging(
+        cur,
+        {
+            "diamond_deposit_total": "v.deposit_total",
+            "gold_status": """CASE
+                   WHEN vs.gold_status IN ('CLAIMED','EXPIRED') THEN vs.gold_status
+                   WHEN v.telegram_ok THEN 'UNLOCKED'
+                   ELSE 'LOCKED'
+               END""",
+            "platinum_deposit_total": "GREATEST(COALESCE(vs.platinum_deposit_total, 0), v.deposit_total)",
+            "diamond_status": _diamond_unlock_expr(),
+            "expires_at": _EXPIRES_FROM_LAST_DEPOSIT,
+        },
+    )
+    target_user_ids = staged_user_ids(cur)
+    bump_platinum_progress(cur)
+
+    return {
+        "processed": len(cleaned_rows),
+        "unchanged": len(cleaned_rows) - written,
+        "identity_created": identity_created,
+        "vault_rows_updated": vault_rows_updated,
+        "target_user_ids": target_user_ids,
+    }
+
+
+def record_import_chunk_job(
+    cur,
+    *,
+    key: str,
+    chunk_index: int,
+    chunk_total: int,
+    mode: str,
+    target_count: int,
+    processed: int,
+    status: str = "DONE",
+    error: str | None = None,
+) -> str:
+    """Insert the per-chunk admin_jobs row of a multi-chunk synchronous import."""
+    job_id = generate_job_id()
+    payload = {"type": "DAILY_IMPORT", "chunk_index": chunk_index, "chunk_total": chunk_total, "mode": mode}
+    if error:
+        payload["error"] = error
+    cur.execute(
+        """
+        INSERT INTO admin_jobs
+            (job_id, type, status, request_id, target_count, processed, failed, payload, created_at, updated_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
+        """,
+        (job_id, "DAILY_IMPORT", status, key, target_count, processed, target_count - processed, Json(payload)),
+    )
+    return job_id
+
+
+# Process-wide cap on chunks applied concurrently, across all parallel imports.
+_import_slots = threading.BoundedSemaphore(max(1, config.IMPORT_MAX_CONCURRENT_CHUNKS))
+
+
+def _empty_chunk_stats() -> dict[str, Any]:
+    return {"processed": 0, "unchanged": 0, "identity_created": 0, "vault_rows_updated": 0, "target_user_ids": []}
+
+
+def apply_import_chunks_parallel(
+    chunks: list[list[tuple[int, Any, str]]], *, parallelism: int, key: str, mode: str
+) -> list[dict[str, Any]]:
+    """Apply chunks concurrently, each on its own pooled connection and transaction.
+
+    Chunks are deduplicated by external_user_id upstream, so they touch disjoint
+    vault_status rows and do not contend for locks. At most IMPORT_MAX_CONCURRENT_CHUNKS
+    chunks run at once in this process, whatever the number of concurrent imports.
+
+    Never raises for a single chunk: every chunk gets a result in chunk order with
+    `error` set if it failed (rolled back) and `job_id` of its DONE/FAILED admin_jobs row.
+    When no connection could be acquired (PoolTimeout) the job row could not be written
+    either; `job_id` is then None and the caller records it on its own connection.
+    """
+
+    def _run(chunk_index: int, chunk: list[tuple[int, Any, str]]) -> dict[str, Any]:
+        try:
+            with _import_slots, db.get_conn() as conn:
+                cur = conn.cursor()
+                _apply_job_timeouts(cur)
+                error = None
+                try:
+                    stats = apply_import_chunk(cur, chunk)
+                except Exception as exc:
+                    conn.rollback()
+                    cur = conn.cursor()
+                    error = (getattr(exc, "detail", None) or f"{type(exc).__name__}: {exc}")[:500]
+                    stats = _empty_chunk_stats()
+                stats["job_id"] = record_import_chunk_job(
+                    cur,
+                    key=key,
+                    chunk_index=chunk_index,
+                    chunk_total=len(chunks),
+                    mode=mode,
+                    target_count=len(chunk),
+                    processed=stats["processed"],
+                    status="FAILED" if error else "DONE",
+                    error=error,
+                )
+                stats["error"] = error
+                conn.commit()
+                return stats
+        except Exception as exc:
+            # Acquire or commit failed: nothing of this chunk is committed.
+            stats = _empty_chunk_stats()
+            stats["job_id"] = None
+            stats["error"] = f"{type(exc).__name__}: {exc}"[:500]
+            return stats
+
+    with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="import-chunk") as pool_:
+        return list(pool_.map(_run, range(len(chunks)), chunks))
+
+
+# -- background import jobs -------------------------------------------------
+
+
+def _row_payload(row_index: int, r: Any) -> dict[str, Any]:
+    out = {name: getattr(r, name, None) for name in DailyUserImportRow.model_fields}
+    out["row_index"] = row_index
+    return out
+
+
+def enqueue_import_chunks(cur, job_id: str, chunk_index: int, cleaned_rows: list[tuple[int, Any, str]]):
+    """Persist one chunk of (row_index, row, external_user_id) for the worker to apply."""
+    cur.execute(
+        """
+        INSERT INTO admin_import_chunks (job_id, chunk_index, row_count, rows, status, created_at, updated_at)
+        VALUES (%s, %s, %s, %s, 'PENDING', NOW(), NOW())
+        """,
+        (job_id, chunk_index, len(cleaned_rows), Json([_row_payload(idx, r) for (idx, r, _) in cleaned_rows])),
+    )
+
+
+def load_chunk_rows(rows: list[dict[str, Any]]) -> list[tuple[int, Any, str]]:
+    """Inverse of enqueue_import_chunks(): rebuild (row_index, row, external_user_id) tuples."""
+    out = []
+    for item in rows or []:
+        item = dict(item)
+        row_index = int(item.pop("row_index", 0))
+        r = DailyUserImportRow.model_construct(**item)
+        out.append((row_index, r, str(r.external_user_id)))
+    return out
+
+
+def finish_import_chunk(cur, job_id: str, chunk_index: int, *, processed: int, failed: int, error: str | None):
+    """Record a chunk result and roll it up into admin_jobs; the last chunk closes the job."""
+    cur.execute(
+        """
+        UPDATE admin_import_chunks
+           SET status=%s,
+               processed=%s,
+               error=%s,
+               rows=CASE WHEN %s THEN NULL ELSE rows END,
+               updated_at=NOW()
+         WHERE job_id=%s AND chunk_index=%s
+        """,
+        ("FAILED" if error else "DONE", processed, error, error is None, job_id, chunk_index),
+    )
+    # Updating the job row first serializes concurrent chunk completions for the same job,
+    # so exactly one of them observes "no chunks left" below.
+    cur.execute(
+        """
+        UPDATE admin_jobs
+           SET processed = processed + %s,
+               failed = failed + %s,
+               updated_at = NOW()
+         WHERE job_id=%s
+        """,
+        (processed, failed, job_id),
+    )
+    _roll_up_import_job_status(cur, job_id)
+
+
+def _roll_up_import_job_status(cur, job_id: str):
+    # A streamed CSV upload queues chunks before it knows how many there are; until it records
+    # payload.chunk_total the job stays RUNNING even if every queued chunk is already done.
+    cur.execute(
+        """
+        SELECT COUNT(*) FILTER (WHERE c.status IN ('PENDING','RUNNING')),
+               COUNT(*) FILTER (WHERE c.status='FAILED'),
+               bool_and(j.payload ? 'chunk_total')
+          FROM admin_jobs j
+          LEFT JOIN admin_import_chunks c ON c.job_id = j.job_id
+         WHERE j.job_id=%s
+        """,
+        (job_id,),
+    )
+    remaining, failed_chunks, sealed = cur.fetchone()
+    if remaining or not sealed:
+        status = "RUNNING"
+    else:
+        status = "FAILED" if failed_chunks else "DONE"
+    cur.execute("UPDATE admin_jobs SET status=%s, updated_at=NOW() WHERE job_id=%s", (status, job_id))
+
+
+def seal_import_job(cur, job_id: str, *, chunk_total: int, total: int):
+    """Record the chunk count of a job whose chunks were queued while streaming, closing it if they are all done."""
+    cur.execute(
+        """
+        UPDATE admin_jobs
+           SET target_count = (SELECT COALESCE(SUM(row_count), 0) FROM admin_import_chunks WHERE job_id=%s),
+               payload = payload || %s,
+               updated_at=NOW()
+         WHERE job_id=%s
+        """,
+        (job_id, Json({"chunk_total": chunk_total, "total": total}), job_id),
+    )
+    _roll_up_import_job_status(cur, job_id)
+
+
+# -- resumable import sessions ----------------------------------------------
+#
+# A session is an admin_jobs row (payload.session=true); every uploaded chunk is applied in
+# its own transaction and recorded in admin_import_chunks with its checksum, so a failed
+# or interrupted upload only needs the missing chunks re-sent.
+
+
+def create_import_session(cur, *, session_id: str, key: str, chunk_total: int | None):
+    cur.execute(
+        """
+        INSERT INTO admin_jobs
+            (job_id, type, status, request_id, target_count, processed, failed, payload, created_at, updated_at)
+        VALUES (%s, %s, 'RUNNING', %s, 0, 0, 0, %s, NOW(), NOW())
+        """,
+        (session_id, "DAILY_IMPORT", key, Json({"type": "DAILY_IMPORT", "mode": "APPLY", "session": True, "chunk_total": chunk_total})),
+    )
+
+
+def lock_import_session(cur, session_id: str, *, exclusive: bool = False) -> dict[str, Any]:
+    """Lock the session row; chunk uploads share it, commit takes it exclusively."""
+    cur.execute(
+        f"""
+        SELECT status, payload
+          FROM admin_jobs
+         WHERE job_id=%s AND payload->>'session' = 'true'
+           FOR {'UPDATE' if exclusive else 'SHARE'}
+        """,
+        (session_id,),
+    )
+    row = cur.fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="IMPORT_SESSION_NOT_FOUND")
+    payload = row[1] or {}
+    return {"status": row[0], "chunk_total": payload.get("chunk_total")}
+
+
+def clean_import_rows(rows: list[Any]) -> tuple[list[tuple[int, Any, str]], list[dict[str, Any]], int]:
+    """Drop rows without external_user_id and duplicates; returns (cleaned, errors, dedup_removed)."""
+    cleaned: list[tuple[int, Any, str]] = []
+    errors: list[dict[str, Any]] = []
+    seen: set[str] = set()
+    dedup_removed = 0
+    for idx, r in enumerate(rows):
+        ext = normalize_external_user_id(getattr(r, "external_user_id", None))
+        if not ext:
+            errors.append({"row_index": idx, "external_user_id": None, "code": "MISSING_EXTERNAL_USER_ID", "detail": None})
+            continue
+        if ext in seen:
+            dedup_removed += 1
+            continue
+        seen.add(ext)
+        cleaned.append((idx, r, ext))
+    return cleaned, errors, dedup_removed
+
+
+def apply_session_chunk(cur, session_id: str, chunk_index: int, checksum: str, rows: list[Any]) -> dict[str, Any]:
+    """Apply one session chunk exactly once.
+
+    Re-sending an applied chunk with the same checksum returns the recorded result;
+    a different checksum for the same index is rejected with CHUNK_CHECKSUM_CONFLICT.
+    """
+    # Serialises concurrent uploads of the same chunk without blocking the other chunks.
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"import-session:{session_id}:{chunk_index}",))
+    cur.execute(
+        "SELECT checksum, stats FROM admin_import_chunks WHERE job_id=%s AND chunk_index=%s",
+        (session_id, chunk_index),
+    )
+    existing = cur.fetchone()
+    if existing:
+        if existing[0] != checksum:
+            raise HTTPException(status_code=409, detail="CHUNK_CHECKSUM_CONFLICT")
+        return {**(existing[1] or {}), "replayed": True}
+
+    cleaned, errors, _ = clean_import_rows(rows)
+    stats = apply_import_chunk(cur, cleaned)
+    stats.pop("target_user_ids")
+    stats["errors"] = errors
+    cur.execute(
+        """
+        INSERT INTO admin_import_chunks
+            (job_id, chunk_index, status, row_count, processed, checksum, stats, created_at, updated_at)
+        VALUES (%s, %s, 'DONE', %s, %s, %s, %s, NOW(), NOW())
+        """,
+        (session_id, chunk_index, len(rows), stats["processed"], checksum, Json(stats)),
+    )
+    return {**stats, "replayed": False}
+
+
+def import_session_summary(cur, session_id: str, chunk_total: int | None) -> dict[str, Any]:
+    """Applied chunks and running totals; `missing_chunks` is what a resuming client still has to send."""
+    cur.execute(
+        """
+        SELECT chunk_index, row_count, stats
+          FROM admin_import_chunks
+         WHERE job_id=%s AND status='DONE'
+         ORDER BY chunk_index
+        """,
+        (session_id,),
+    )
+    applied = cur.fetchall()
+    totals = {"rows": 0, "processed": 0, "unchanged": 0, "identity_created": 0, "vault_rows_updated": 0}
+    for _, row_count, stats in applied:
+        totals["rows"] += int(row_count or 0)
+        for k in ("processed", "unchanged", "identity_created", "vault_rows_updated"):
+            totals[k] += int((stats or {}).get(k) or 0)
+    indexes = [int(r[0]) for r in applied]
+    expected = range(chunk_total) if chunk_total else range(max(indexes, default=-1) + 1)
+    done = set(indexes)
+    return {**totals, "chunks_applied": indexes, "missing_chunks": [i for i in expected if i not in done]}
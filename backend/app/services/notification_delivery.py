@@ -0,0 +1,193 @@
+"""Notification delivery: claim due notifications_queue rows and send them through a channel.
+
+Used by app/worker.py. Rows are claimed with FOR UPDATE SKIP LOCKED and stay locked
+until their results are written, so any number of worker processes can run side by
+side without sending the same notification twice. Failed sends back off
+(NOTIFY_BACKOFF_SECONDS) and move to DLQ + notifications_dlq after
+NOTIFY_MAX_RETRIES attempts (docs/BATCH_NOTIFICATION_VAULT_V2.md §7).
+"""
+
+import abc
+import asyncio
+import json
+import logging
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from psycopg2.extras import Json, execute_values
+
+from app import config
+from app.services.common import gather_bounded
+from app.services.notification_templates import template_cache
+from app.utils.sql_builders import _apply_job_timeouts
+
+logger = logging.getLogger("vault.notify")
+
+
+class NotificationChannel(abc.ABC):
+    """Delivery channel interface. `send()` raises to report a failed attempt."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    async def send(self, notification: dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class StdoutChannel(NotificationChannel):
+    """Local stand-in: one JSON line per notification on stdout."""
+
+    name = "stdout"
+
+    async def send(self, notification: dict[str, Any]) -> None:
+        sys.stdout.write(json.dumps(notification, ensure_ascii=False, default=str) + "\n")
+
+
+class FileChannel(NotificationChannel):
+    """Local/test stand-in: appends one JSON line per notification to `path`."""
+
+    name = "file"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    async def send(self, notification: dict[str, Any]) -> None:
+        line = json.dumps(notification, ensure_ascii=False, default=str) + "\n"
+        # File I/O blocks; keep it off the event loop so concurrent sends stay concurrent.
+        await asyncio.to_thread(self._append, line)
+
+    def _append(self, line: str) -> None:
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def build_channel(spec: str | None = None) -> NotificationChannel:
+    """`stdout` or `file:<path>` (NOTIFY_CHANNEL)."""
+    spec = (spec or config.NOTIFY_CHANNEL or "stdout").strip()
+    if spec == "stdout":
+        return StdoutChannel()
+    if spec.startswith("file:") and spec[5:]:
+        return FileChannel(spec[5:])
+    raise ValueError(f"unknown notification channel: {spec}")
+
+
+def backoff_seconds(retry_count: int) -> int:
+    """Delay before attempt `retry_count + 1`; the last configured step repeats."""
+    steps = config.NOTIFY_BACKOFF_SECONDS
+    return steps[min(max(retry_count, 1), len(steps)) - 1]
+
+
+def claim_due_notifications(cur, *, limit: int, now: datetime) -> list[dict[str, Any]]:
+    """Lock up to `limit` due PENDING/RETRYING rows; rows locked by other workers are skipped."""
+    cur.execute(
+        """
+        SELECT nq.id, nq.user_id, ui.external_user_id, nq.type, nq.vault_type, nq.variant_id, nq.payload, nq.retry_count
+          FROM notifications_queue nq
+          LEFT JOIN user_identity ui ON ui.user_id = nq.user_id
+         WHERE nq.status IN ('PENDING','RETRYING')
+           AND COALESCE(nq.scheduled_at, nq.created_at) <= %s
+         ORDER BY COALESCE(nq.scheduled_at, nq.created_at), nq.id
+         LIMIT %s
+           FOR UPDATE OF nq SKIP LOCKED
+        """,
+        (now, limit),
+    )
+    cols = ("id", "user_id", "external_user_id", "type", "vault_type", "variant_id", "payload", "retry_count")
+    return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+
+def record_delivery_results(cur, results: list[tuple[dict[str, Any], str | None]], *, now: datetime) -> dict[str, int]:
+    """Write SENT / RETRYING / DLQ for a claimed batch with one statement per outcome."""
+    sent_ids = [n["id"] for n, error in results if error is None]
+    failures = []
+    dead = []
+    for n, error in results:
+        if error is None:
+            continue
+        retry = int(n["retry_count"] or 0) + 1
+        if retry >= config.NOTIFY_MAX_RETRIES:
+            failures.append((n["id"], "DLQ", retry, now, error[:500]))
+            dead.append((n["id"], n["user_id"], n["type"], Json(n["payload"]), error[:2000], retry))
+        else:
+            failures.append((n["id"], "RETRYING", retry, now + timedelta(seconds=backoff_seconds(retry)), error[:500]))
+
+    if sent_ids:
+        cur.execute(
+            """
+            UPDATE notifications_queue
+               SET status='SENT', sent_at=%s, last_error=NULL
+             WHERE id = ANY(%s)
+            """,
+            (now, sent_ids),
+        )
+    if failures:
+        execute_values(
+            cur,
+            """
+            UPDATE notifications_queue AS nq
+               SET status = f.status,
+                   retry_count = f.retry_count,
+                   scheduled_at = f.scheduled_at,
+                   last_error = f.last_error
+              FROM (VALUES %s) AS f(id, status, retry_count, scheduled_at, last_error)
+             WHERE nq.id = f.id
+            """,
+            failures,
+            template="(%s::bigint, %s, %s::int, %s::timestamptz, %s)",
+        )
+    if dead:
+        execute_values(
+            cur,
+            """
+            INSERT INTO notifications_dlq (notification_id, user_id, type, payload, error, retry_count)
+            VALUES %s
+            """,
+            dead,
+        )
+    return {"sent": len(sent_ids), "retrying": len(failures) - len(dead), "dlq": len(dead)}
+
+
+async def deliver_notifications_once(
+    conn,
+    channel: NotificationChannel,
+    *,
+    batch_size: int | None = None,
+    concurrency: int | None = None,
+) -> dict[str, int]:
+    """Claim one batch, send it concurrently and record the outcome in the same transaction."""
+
+    def _claim():
+        cur = conn.cursor()
+        _apply_job_timeouts(cur)
+        batch = claim_due_notifications(cur, limit=batch_size or config.NOTIFY_BATCH_SIZE, now=datetime.now(timezone.utc))
+        # Rows enqueued without a message (no template at enqueue time, campaigns) get the current template.
+        for n in batch:
+            payload = n["payload"] if isinstance(n["payload"], dict) else {}
+            if not (payload.get("message") or payload.get("title")):
+                n["template"] = template_cache.get(cur, n["type"])
+        return batch
+
+    batch = await asyncio.to_thread(_claim)
+    if not batch:
+        await asyncio.to_thread(conn.rollback)
+        return {"claimed": 0, "sent": 0, "retrying": 0, "dlq": 0}
+
+    results = await gather_bounded(
+        channel.send,
+        batch,
+        concurrency=concurrency or config.NOTIFY_CONCURRENCY,
+        timeout_seconds=config.NOTIFY_SEND_TIMEOUT_MS / 1000,
+        timeout_error="SEND_TIMEOUT",
+    )
+
+    def _record():
+        counts = record_delivery_results(conn.cursor(), results, now=datetime.now(timezone.utc))
+        conn.commit()
+        return counts
+
+    counts = await asyncio.to_thread(_record)
+    logger.info("notify_batch channel=%s claimed=%s sent=%s retrying=%s dlq=%s", channel.name, len(batch), counts["sent"], counts["retrying"], counts["dlq"])
+    return {"claimed": len(batch), **counts}
@@ -0,0 +1,95 @@
+"""Notification service layer.
+
+Set-based enqueue into notifications_queue.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from psycopg2.extras import Json
+
+from app import config
+
+# `{source}` yields (uid, ord); ord keeps queue ids in the caller's order.
+_ENQUEUE_SQL = """
+WITH ins AS (
+    INSERT INTO notifications_queue
+        (user_id, type, vault_type, variant_id, dedup_key, payload, scheduled_at, status)
+    SELECT t.uid,
+           %(type)s,
+           NULL,
+           %(variant_id)s,
+           %(type)s::text || ':' || t.uid || ':' || %(dedup_suffix)s || ':' || %(day)s,
+           %(payload)s,
+           %(scheduled_at)s,
+           'PENDING'
+      FROM ({source}) AS t(uid, ord)
+     ORDER BY t.ord
+    ON CONFLICT (dedup_key) DO NOTHING
+    RETURNING 1
+)
+SELECT COUNT(*) FROM ins
+"""
+
+
+def dedup_day(at: datetime) -> date:
+    """dedup_key date of a notification scheduled at `at`: the local date at CAMPAIGN_UTC_OFFSET_HOURS.
+
+    Manual /notify and scheduled campaigns share this basis, so one reminder per local day holds across both.
+    """
+    return at.astimezone(timezone(timedelta(hours=config.CAMPAIGN_UTC_OFFSET_HOURS))).date()
+
+
+def _enqueue_params(notify_type: str, variant_id: str | None, payload: dict[str, Any], scheduled_at: datetime) -> dict[str, Any]:
+    return {
+        "type": notify_type,
+        "variant_id": variant_id,
+        "dedup_suffix": variant_id or "base",
+        "day": dedup_day(scheduled_at).isoformat(),
+        "payload": Json(payload),
+        "scheduled_at": scheduled_at,
+    }
+
+
+def enqueue_notifications(
+    cur,
+    *,
+    user_ids: list[int],
+    notify_type: str,
+    variant_id: str | None,
+    payload: dict[str, Any],
+    scheduled_at: datetime,
+) -> int:
+    """Insert one PENDING notification per user in a single statement; returns rows actually inserted.
+
+    dedup_key is `{type}:{user_id}:{variant or 'base'}:{date}` with `dedup_day(scheduled_at)`,
+    built in SQL, so users already notified for this type/variant/day are skipped by ON CONFLICT.
+    """
+    if not user_ids:
+        return 0
+    cur.execute(
+        _ENQUEUE_SQL.format(source="SELECT * FROM unnest(%(user_ids)s::int[]) WITH ORDINALITY"),
+        {**_enqueue_params(notify_type, variant_id, payload, scheduled_at), "user_ids": user_ids},
+    )
+    return int(cur.fetchone()[0] or 0)
+
+
+def enqueue_notifications_from_query(
+    cur,
+    *,
+    audience_sql: str,
+    audience_params: dict[str, Any],
+    notify_type: str,
+    variant_id: str | None,
+    payload: dict[str, Any],
+    scheduled_at: datetime,
+) -> int:
+    """Like `enqueue_notifications`, but the audience is a `SELECT user_id ...` run inside the INSERT.
+
+    `audience_sql` uses %(name)s placeholders from `audience_params`; ids never leave the database.
+    """
+    cur.execute(
+        _ENQUEUE_SQL.format(source=f"SELECT a.user_id, a.user_id FROM ({audience_sql}) AS a"),
+        {**audience_params, **_enqueue_params(notify_type, variant_id, payload, scheduled_at)},
+    )
+    return int(cur.fetchone()[0] or 0)
@@ -0,0 +1,103 @@
+"""In-process cache of enabled notification_templates rows, keyed by notification type.
+
+Entries expire after NOTIFY_TEMPLATE_CACHE_TTL_SECONDS. A trigger on
+notification_templates sends NOTIFY on `notification_templates_changed` (payload: the
+type), and `start_template_listener()` drops the matching entry as soon as it arrives,
+so the TTL only matters if the listener is down. Missing/disabled types are cached too.
+"""
+
+import threading
+import time
+from typing import Any
+
+from app import config, db
+
+TEMPLATE_CHANNEL = "notification_templates_changed"
+
+_TEMPLATE_COLUMNS = ("title", "body", "cta_text", "icon_emoji", "category")
+
+
+class TemplateCache:
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[float, dict[str, Any] | None]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        # Bumped by invalidate(); a miss only stores what it read if no invalidation ran since.
+        self._epoch = 0
+
+    def get(self, cur, notify_type: str) -> dict[str, Any] | None:
+        """Template message for `notify_type`; on a miss it is loaded with the caller's cursor.
+
+        A NOTIFY that lands between the read and the fill would otherwise be lost (the old row
+        cached for the whole TTL), so the fill is dropped when the epoch moved meanwhile.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(notify_type)
+            if entry is not None and entry[0] > now:
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+            token = self._epoch
+
+        cur.execute(
+            "SELECT title, body, cta_text, icon_emoji, category FROM notification_templates WHERE type=%s AND enabled=TRUE",
+            (notify_type,),
+        )
+        row = cur.fetchone()
+        template = dict(zip(_TEMPLATE_COLUMNS, row)) if row else None
+        with self._lock:
+            if token == self._epoch:
+                self._entries[notify_type] = (now + self.ttl_seconds, template)
+        return template
+
+    def invalidate(self, notify_type: str | None = None):
+        """Drop one type, or everything when `notify_type` is empty."""
+        with self._lock:
+            self._invalidations += 1
+            self._epoch += 1
+            if notify_type:
+                self._entries.pop(notify_type, None)
+            else:
+                self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+                "invalidations": self._invalidations,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+template_cache = TemplateCache(config.NOTIFY_TEMPLATE_CACHE_TTL_SECONDS)
+
+_listener: db.Listener | None = None
+
+
+def start_template_listener() -> db.Listener:
+    """Start (once per process) the LISTEN thread that invalidates `template_cache`."""
+    global _listener
+    if _listener is None or not _listener.is_alive():
+        _listener = db.Listener(
+            [TEMPLATE_CHANNEL],
+            lambda _channel, payload: template_cache.invalidate(payload),
+            # Changes may have been missed while disconnected.
+            on_reconnect=template_cache.invalidate,
+        )
+        _listener.start()
+    return _listener
+
+
+def stop_template_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
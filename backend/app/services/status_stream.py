@@ -0,0 +1,136 @@
+"""In-process fan-out of `vault_status_changed` notifications to `/status/stream` subscribers.
+
+Statement-level triggers on vault_status and user_admin_snapshot send NOTIFY on
+`vault_status_changed` (payload: comma-separated user_ids, or `*` for large statements).
+`start_status_listener()` calls `status_hub.publish()` from its LISTEN thread; each SSE
+connection waits on its own asyncio.Event and reloads the user's status when woken.
+One LISTEN connection per process serves all subscribers.
+A publish without user_ids (bulk writes, listener reconnects) wakes everyone at once, so
+subscriptions record it and the stream spreads those reloads out (`take_broadcast()`).
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Iterable
+
+from app import config, db
+
+STATUS_CHANNEL = "vault_status_changed"
+
+
+class StatusSubscription:
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+        self.broadcast = False
+
+    async def wait(self, timeout: float) -> bool:
+        """True if a change was published within `timeout` seconds (the flag is then cleared)."""
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.event.clear()
+        return True
+
+    def take_broadcast(self) -> bool:
+        """True (once) if a wake-up since the last call came from a publish to everyone."""
+        broadcast, self.broadcast = self.broadcast, False
+        return broadcast
+
+    def _wake(self, broadcast: bool = False):
+        if broadcast:
+            self.broadcast = True
+        try:
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:
+            # Event loop already closed; the subscription is about to be dropped.
+            pass
+
+
+class StatusHub:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: dict[int, set[StatusSubscription]] = {}
+        self._published = 0
+
+    def subscribe(self, user_id: int) -> StatusSubscription:
+        sub = StatusSubscription(user_id)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: StatusSubscription):
+        with self._lock:
+            subs = self._subscribers.get(sub.user_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.user_id]
+
+    def publish(self, user_ids: Iterable[int] | None = None):
+        """Wake subscribers of `user_ids`, or all subscribers when None. Safe from any thread."""
+        with self._lock:
+            self._published += 1
+            if user_ids is None:
+                targets = [s for subs in self._subscribers.values() for s in subs]
+            else:
+                targets = [s for uid in user_ids for s in self._subscribers.get(int(uid), ())]
+        for sub in targets:
+            sub._wake(broadcast=user_ids is None)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "users": len(self._subscribers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "published": self._published,
+            }
+
+
+status_hub = StatusHub()
+
+
+_reload_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def reload_slot() -> asyncio.Semaphore:
+    """Per-event-loop bound on concurrent stream reloads (STATUS_STREAM_RELOAD_CONCURRENCY)."""
+    loop = asyncio.get_running_loop()
+    slot = _reload_slots.get(loop)
+    if slot is None:
+        slot = _reload_slots[loop] = asyncio.Semaphore(max(1, config.STATUS_STREAM_RELOAD_CONCURRENCY))
+    return slot
+
+
+def _on_status_notify(_channel: str, payload: str):
+    if not payload or payload == "*":
+        status_hub.publish()
+        return
+    status_hub.publish([int(uid) for uid in payload.split(",") if uid])
+
+
+_listener: db.Listener | None = None
+
+
+def start_status_listener() -> db.Listener:
+    """Start (once per process) the LISTEN thread that feeds `status_hub`."""
+    global _listener
+    if _listener is None or not _listener.is_alive():
+        _listener = db.Listener(
+            [STATUS_CHANNEL],
+            _on_status_notify,
+            # Changes may have been missed while disconnected.
+            on_reconnect=status_hub.publish,
+        )
+        _listener.start()
+    return _listener
+
+
+def stop_status_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
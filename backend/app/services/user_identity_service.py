@@ -1,29 +1,228 @@
 """User identity service layer.
 
 Handles user identity resolution, creation, and bulk operations.
+
+User-facing endpoints resolve identities read-only (`create_if_missing=False`); identities
+are only created by admin/import flows. The external_user_id -> user_id mapping never
+changes once created, so every resolver here (and the admin endpoints in app/main.py)
+goes through `identity_cache`, a bounded in-process LRU with short-lived negative entries.
+Lookups are only cached while their transaction has not written anything
+(`txid_current_if_assigned() IS NULL`): a transaction that wrote may be reading ids it
+created itself, which vanish again if it rolls back. Creating an id just drops its
+negative entry; it is cached by the next read-only lookup. Deletes are invalidated in
+process by the caller and in every other process via NOTIFY on `user_identity_changed`
+(`start_identity_listener()`).
 """
 
+import json
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
 
 from fastapi import HTTPException
 
-from app import db
+from app import config, db
 from app.services.common import now_utc, normalize_external_user_id
 
+IDENTITY_CHANNEL = "user_identity_changed"
 
-def get_user_id_by_external_user_id(cur, external_user_id: str) -> int | None:
-    """Get user_id by external_user_id."""
+# Returned by IdentityCache.get() for a cached "no such external_user_id".
+NOT_FOUND = object()
+
+
+class IdentityCache:
+    """Bounded LRU of external_user_id -> user_id, plus TTL-bound negative entries."""
+
+    def __init__(self, max_entries: int, negative_ttl_seconds: float):
+        self.max_entries = max_entries
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._missing: OrderedDict[str, float] = OrderedDict()
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def _lookup(self, external_user_id: str, now: float):
+        # Caller holds the lock.
+        user_id = self._entries.get(external_user_id)
+        if user_id is not None:
+            self._entries.move_to_end(external_user_id)
+            self._hits += 1
+            return user_id
+        expires = self._missing.get(external_user_id)
+        if expires is not None:
+            if expires > now:
+                self._negative_hits += 1
+                return NOT_FOUND
+            del self._missing[external_user_id]
+        self._misses += 1
+        return None
+
+    def get(self, external_user_id: str):
+        """user_id, `NOT_FOUND` (cached negative) or None (not cached)."""
+        with self._lock:
+            return self._lookup(external_user_id, time.monotonic())
+
+    def get_many(self, external_user_ids: Iterable[str]) -> tuple[dict[str, int], set[str], list[str]]:
+        """(cached mappings, cached negatives, ids to look up) for `external_user_ids`."""
+        found: dict[str, int] = {}
+        missing: set[str] = set()
+        todo: list[str] = []
+        now = time.monotonic()
+        with self._lock:
+            for ext in dict.fromkeys(external_user_ids):
+                value = self._lookup(ext, now)
+                if value is NOT_FOUND:
+                    missing.add(ext)
+                elif value is None:
+                    todo.append(ext)
+                else:
+                    found[ext] = value
+        return found, missing, todo
+
+    def put_many(self, mappings: Iterable[tuple[str, int]]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            for external_user_id, user_id in mappings:
+                ext = str(external_user_id)
+                self._entries[ext] = int(user_id)
+                self._entries.move_to_end(ext)
+                self._missing.pop(ext, None)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, external_user_id: str, user_id: int):
+        self.put_many([(external_user_id, user_id)])
+
+    def put_missing(self, external_user_ids: Iterable[str]):
+        """Remember that these external_user_ids have no identity (for `negative_ttl_seconds`)."""
+        if self.max_entries <= 0 or self.negative_ttl_seconds <= 0:
+            return
+        expires = time.monotonic() + self.negative_ttl_seconds
+        with self._lock:
+            for ext in external_user_ids:
+                self._missing[ext] = expires
+                self._missing.move_to_end(ext)
+            while len(self._missing) > self.max_entries:
+                self._missing.popitem(last=False)
+
+    def forget_missing(self, external_user_ids: Iterable[str] | None = None):
+        """Drop negative entries (all when None) after identities were created."""
+        with self._lock:
+            if external_user_ids is None:
+                self._missing.clear()
+            else:
+                for ext in external_user_ids:
+                    self._missing.pop(ext, None)
+
+    def invalidate(self, external_user_ids: Iterable[str] | None = None):
+        """Drop the given external_user_ids, or everything when None."""
+        with self._lock:
+            self._invalidations += 1
+            if external_user_ids is None:
+                self._entries.clear()
+                self._missing.clear()
+            else:
+                for ext in external_user_ids:
+                    self._entries.pop(ext, None)
+                    self._missing.pop(ext, None)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._negative_hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "negative_entries": len(self._missing),
+                "hits": self._hits,
+                "negative_hits": self._negative_hits,
+                "misses": self._misses,
+                "hit_rate": round((self._hits + self._negative_hits) / lookups, 4) if lookups else None,
+                "invalidations": self._invalidations,
+                "max_entries": self.max_entries,
+                "negative_ttl_seconds": self.negative_ttl_seconds,
+            }
+
+
+identity_cache = IdentityCache(config.IDENTITY_CACHE_MAX_ENTRIES, config.IDENTITY_CACHE_NEGATIVE_TTL_SECONDS)
+
+
+def _on_identity_notify(_channel: str, payload: str):
+    # '' = identities were created elsewhere, '*' = large delete, else a JSON array of external_user_ids.
+    if payload == "":
+        identity_cache.forget_missing()
+    elif payload == "*":
+        identity_cache.invalidate()
+    else:
+        identity_cache.invalidate(json.loads(payload))
+
+
+_listener: db.Listener | None = None
+
+
+def start_identity_listener() -> db.Listener:
+    """Start (once per process) the LISTEN thread that invalidates `identity_cache`."""
+    global _listener
+    if _listener is None or not _listener.is_alive():
+        _listener = db.Listener(
+            [IDENTITY_CHANNEL],
+            _on_identity_notify,
+            # Changes may have been missed while disconnected.
+            on_reconnect=identity_cache.invalidate,
+        )
+        _listener.start()
+    return _listener
+
+
+def stop_identity_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _lookup_user_ids(cur, external_user_ids: list[str]) -> tuple[list[tuple[str, int | None]], bool]:
+    """(external_user_id, user_id or None) per id, and whether the result may be cached."""
     cur.execute(
-        "SELECT user_id FROM user_identity WHERE external_user_id=%s",
-        (external_user_id,),
+        """
+        SELECT t.ext, ui.user_id, txid_current_if_assigned() IS NULL
+          FROM unnest(%s::text[]) AS t(ext)
+          LEFT JOIN user_identity ui ON ui.external_user_id = t.ext
+        """,
+        (external_user_ids,),
     )
-    row = cur.fetchone()
-    return int(row[0]) if row else None
+    rows = cur.fetchall() or []
+    return [(str(ext), uid) for ext, uid, _ in rows], all(read_only for _, _, read_only in rows)
+
+
+def _cache_lookup(rows: list[tuple[str, int | None]]):
+    identity_cache.put_many((ext, uid) for ext, uid in rows if uid is not None)
+    identity_cache.put_missing([ext for ext, uid in rows if uid is None])
+
+
+def get_user_id_by_external_user_id(cur, external_user_id: str) -> int | None:
+    """Get user_id by external_user_id (read-only; served from `identity_cache` when present)."""
+    cached = identity_cache.get(external_user_id)
+    if cached is NOT_FOUND:
+        return None
+    if cached is not None:
+        return cached
+    rows, cacheable = _lookup_user_ids(cur, [external_user_id])
+    if cacheable:
+        _cache_lookup(rows)
+    user_id = rows[0][1]
+    return int(user_id) if user_id is not None else None
 
 
 def get_or_create_user_id_by_external_user_id(cur, external_user_id: str) -> int:
     """Get or create user_id by external_user_id."""
+    cached = identity_cache.get(external_user_id)
+    if cached is not None and cached is not NOT_FOUND:
+        return cached
     cur.execute(
         """
         INSERT INTO user_identity (external_user_id)
@@ -34,7 +233,9 @@ def get_or_create_user_id_by_external_user_id(cur, external_user_id: str) -> int
         (external_user_id,),
     )
     row = cur.fetchone()
+    identity_cache.forget_missing([external_user_id])
     if row:
+        # Not committed yet: cached by the next lookup.
         return int(row[0])
     user_id = get_user_id_by_external_user_id(cur, external_user_id)
     if user_id is None:
@@ -68,55 +269,61 @@ def resolve_user_id(
 
 
 def resolve_user_ids_by_external_user_ids(cur, external_user_ids: list[str]) -> list[int]:
-    """Resolve multiple external_user_ids to user_ids."""
+    """Resolve multiple external_user_ids to user_ids (404 if any is unknown)."""
     cleaned = [str(v).strip() for v in (external_user_ids or []) if str(v).strip()]
     if not cleaned:
         return []
 
-    cur.execute(
-        """
-        SELECT external_user_id, user_id
-          FROM user_identity
-         WHERE external_user_id = ANY(%s)
-        """,
-        (cleaned,),
-    )
-    rows = cur.fetchall() or []
-    mapping = {str(ext): int(uid) for ext, uid in rows}
-    missing = [ext for ext in cleaned if ext not in mapping]
+    mapping, missing, todo = identity_cache.get_many(cleaned)
     if missing:
         raise HTTPException(status_code=404, detail="EXTERNAL_USER_IDS_NOT_FOUND")
+    if todo:
+        rows, cacheable = _lookup_user_ids(cur, todo)
+        if cacheable:
+            _cache_lookup(rows)
+        mapping.update((ext, int(uid)) for ext, uid in rows if uid is not None)
+        if any(uid is None for _, uid in rows):
+            raise HTTPException(status_code=404, detail="EXTERNAL_USER_IDS_NOT_FOUND")
     return [mapping[ext] for ext in cleaned]
 
 
 def bulk_get_or_create_user_ids_by_external_user_ids(cur, external_user_ids: list[str]) -> dict[str, int]:
-    """Bulk get or create user_ids by external_user_ids."""
+    """Bulk get or create user_ids by external_user_ids.
+
+    Cached ids skip the database; only the rest are inserted/selected. The result carries
+    the number of created identities under `__created_count__`.
+    """
     cleaned = [str(v).strip() for v in (external_user_ids or []) if str(v).strip()]
     if not cleaned:
         return {}
 
-    cur.execute(
-        """
-        INSERT INTO user_identity (external_user_id)
-        SELECT DISTINCT x
-          FROM unnest(%s::text[]) AS x
-         WHERE x IS NOT NULL AND btrim(x) <> ''
-        ON CONFLICT (external_user_id) DO NOTHING
-        """,
-        (cleaned,),
-    )
-    created = int(cur.rowcount or 0)
+    mapping, negatives, todo = identity_cache.get_many(cleaned)
+    # Cached as unknown: these are about to be created, resolve them with the rest.
+    todo.extend(negatives)
+    created = 0
+    if todo:
+        cur.execute(
+            """
+            INSERT INTO user_identity (external_user_id)
+            SELECT DISTINCT x
+              FROM unnest(%s::text[]) AS x
+             WHERE x IS NOT NULL AND btrim(x) <> ''
+            ON CONFLICT (external_user_id) DO NOTHING
+            RETURNING external_user_id, user_id
+            """,
+            (todo,),
+        )
+        created_rows = {str(ext): int(uid) for ext, uid in cur.fetchall() or []}
+        created = len(created_rows)
+        identity_cache.forget_missing(todo)
 
-    cur.execute(
-        """
-        SELECT external_user_id, user_id
-          FROM user_identity
-         WHERE external_user_id = ANY(%s)
-        """,
-        (cleaned,),
-    )
-    rows = cur.fetchall() or []
-    mapping = {str(ext): int(uid) for ext, uid in rows}
+        existing = [ext for ext in todo if ext not in created_rows]
+        if existing:
+            rows, cacheable = _lookup_user_ids(cur, existing)
+            if cacheable:
+                _cache_lookup(rows)
+            mapping.update((ext, int(uid)) for ext, uid in rows if uid is not None)
+        mapping.update(created_rows)
 
     missing = [ext for ext in cleaned if ext not in mapping]
     if missing:
@@ -13,6 +13,7 @@ from app.services.common import now_utc, validate_status, clamp_attendance_days
 from app.services.user_identity_service import resolve_user_id
 from app.constants.vault_config import (
     DEFAULT_EXPIRY_HOURS,
+    VAULT_REWARDS,
     PLATINUM_UNLOCK,
     DIAMOND_UNLOCK,
 )
@@ -187,6 +188,143 @@ def get_user_snapshot(cur, user_id: int) -> dict | None:
     }
 
 
+_STATUS_COLUMNS = (
+    "has_vault",
+    "expires_at",
+    "gold_status",
+    "platinum_status",
+    "diamond_status",
+    "platinum_attendance_days",
+    "platinum_deposit_done",
+    "diamond_deposit_current",
+    "platinum_mission_1_done",
+    "platinum_mission_2_done",
+    "diamond_mission_1_done",
+    "diamond_mission_2_done",
+    "gold_mission_1_done",
+    "gold_mission_2_done",
+    "gold_mission_3_done",
+    "has_snapshot",
+    "telegram_ok",
+    "review_ok",
+    "vault_updated_at",
+    "snapshot_updated_at",
+)
+
+
+_STATUS_SQL = """
+SELECT u.user_id,
+       vs.user_id IS NOT NULL,
+       vs.expires_at,
+       vs.gold_status,
+       vs.platinum_status,
+       vs.diamond_status,
+       vs.platinum_attendance_days,
+       vs.platinum_deposit_done,
+       vs.diamond_deposit_current,
+       vs.platinum_mission_1_done,
+       vs.platinum_mission_2_done,
+       vs.diamond_mission_1_done,
+       vs.diamond_mission_2_done,
+       vs.gold_mission_1_done,
+       vs.gold_mission_2_done,
+       vs.gold_mission_3_done,
+       uas.user_id IS NOT NULL,
+       COALESCE(uas.telegram_ok, false),
+       COALESCE(uas.review_ok, false),
+       vs.updated_at,
+       uas.updated_at
+  FROM {source}
+  LEFT JOIN vault_status vs ON vs.user_id = u.user_id
+  LEFT JOIN user_admin_snapshot uas ON uas.user_id = u.user_id
+"""
+
+
+def get_status_row(cur, user_id: int) -> dict[str, Any]:
+    """vault_status + user_admin_snapshot fields behind `/status`, in one query.
+
+    Either side may be missing (`has_vault` / `has_snapshot` are False then).
+    """
+    cur.execute(_STATUS_SQL.format(source="(SELECT %s::bigint AS user_id) u"), (user_id,))
+    return dict(zip(_STATUS_COLUMNS, cur.fetchone()[1:]))
+
+
+def get_status_rows(cur, user_ids: list[int]) -> dict[int, dict[str, Any]]:
+    """`get_status_row()` for many users in one query, keyed by user_id."""
+    cur.execute(_STATUS_SQL.format(source="unnest(%s::bigint[]) AS u(user_id)"), (list(user_ids),))
+    return {int(row[0]): dict(zip(_STATUS_COLUMNS, row[1:])) for row in cur.fetchall()}
+
+
+def get_status_version(cur, user_id: int) -> tuple[datetime | None, datetime | None]:
+    """(vault_status.updated_at, user_admin_snapshot.updated_at); None where the row is missing."""
+    cur.execute(
+        """
+        SELECT (SELECT updated_at FROM vault_status WHERE user_id=%s),
+               (SELECT updated_at FROM user_admin_snapshot WHERE user_id=%s)
+        """,
+        (user_id, user_id),
+    )
+    return tuple(cur.fetchone())
+
+
+def status_etag(user_id: int, vault_updated_at: datetime | None, snapshot_updated_at: datetime | None) -> str | None:
+    """Weak ETag for `/status`; None without a vault_status row (expires_at would follow server time).
+
+    Both tables bump updated_at on every change (trigger in _ensure_schema), so the pair
+    identifies the stored state; `now`/`ms_countdown` are derived from it client-side.
+    """
+    if vault_updated_at is None:
+        return None
+    parts = [user_id, int(vault_updated_at.timestamp() * 1_000_000)]
+    parts.append(int(snapshot_updated_at.timestamp() * 1_000_000) if snapshot_updated_at else 0)
+    return 'W/"' + "-".join(format(p, "x") for p in parts) + '"'
+
+
+def build_status_payload(row: dict[str, Any], now: datetime) -> dict[str, Any]:
+    """`/status` response body from a `get_status_row()` row (defaults when there is no vault yet)."""
+    has_vault = row["has_vault"]
+    expires_at = row["expires_at"] if has_vault else now + timedelta(hours=DEFAULT_EXPIRY_HOURS)
+    status_by_type = {
+        "GOLD": (row["gold_status"] if has_vault else None) or "LOCKED",
+        "PLATINUM": (row["platinum_status"] if has_vault else None) or "LOCKED",
+        "DIAMOND": (row["diamond_status"] if has_vault else None) or "LOCKED",
+    }
+
+    remaining_ms = int((expires_at - now).total_seconds() * 1000)
+    ms_countdown = {"enabled": remaining_ms < 3600_000, "remaining_ms": max(0, remaining_ms)}
+
+    loss_breakdown = {
+        k: (0 if status_by_type[k] in {"CLAIMED", "EXPIRED"} else VAULT_REWARDS[k])
+        for k in ("GOLD", "PLATINUM", "DIAMOND")
+    }
+    loss_breakdown["BONUS"] = 0
+
+    return {
+        "gold_status": status_by_type["GOLD"],
+        "platinum_status": status_by_type["PLATINUM"],
+        "diamond_status": status_by_type["DIAMOND"],
+        "platinum_attendance_days": int(row["platinum_attendance_days"] or 0),
+        "platinum_deposit_done": bool(row["platinum_deposit_done"]),
+        "platinum_review_done": bool(row["review_ok"]),
+        "telegram_ok": bool(row["telegram_ok"]),
+        "diamond_deposit_current": int(row["diamond_deposit_current"] or 0),
+        "gold_mission_1_done": bool(row["gold_mission_1_done"]),
+        "gold_mission_2_done": bool(row["gold_mission_2_done"]),
+        "gold_mission_3_done": bool(row["gold_mission_3_done"]),
+        "platinum_mission_1_done": bool(row["platinum_mission_1_done"]),
+        "platinum_mission_2_done": bool(row["platinum_mission_2_done"]),
+        "diamond_mission_1_done": bool(row["diamond_mission_1_done"]),
+        "diamond_mission_2_done": bool(row["diamond_mission_2_done"]),
+        "expires_at": expires_at.isoformat(),
+        "now": now.isoformat(),
+        "loss_total": int(sum(loss_breakdown.values())),
+        "loss_breakdown": loss_breakdown,
+        "ms_countdown": ms_countdown,
+        "social_proof": {"vault_type": "PLATINUM", "claimed_last_24h": 4231},
+        "curation_tier": "PLATINUM_BIASED",
+    }
+
+
 def validate_claim_request(
     vault_type: str,
     current_status: str,
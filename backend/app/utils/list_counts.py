@@ -0,0 +1,87 @@
+"""`total` for admin list endpoints: count=exact|estimate|none.
+
+- exact: SELECT COUNT(*) every call (default, previous behaviour).
+- estimate: the planner's row estimate (EXPLAIN, i.e. pg_class.reltuples + column statistics).
+  Below ADMIN_COUNT_ESTIMATE_THRESHOLD rows, where estimates are least reliable and counting
+  is cheap, an exact count is used instead, cached for ADMIN_COUNT_CACHE_TTL_SECONDS per
+  query + filter values.
+- none: no count.
+
+Only an exact count may drive pagination. For estimate and none, callers fetch one extra
+row (LIMIT page_size + 1) for has_more, and the estimate or cached total is for display only.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from fastapi import HTTPException
+
+from app import config
+
+COUNT_MODES = {"exact", "estimate", "none"}
+
+_CACHE_MAX_ENTRIES = 512
+
+
+class CountCache:
+    """Small TTL + LRU cache of exact counts keyed by (SQL, params)."""
+
+    def __init__(self, max_entries: int = _CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[float, int]] = OrderedDict()
+
+    def get(self, key: tuple) -> int | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: tuple, value: int, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+count_cache = CountCache()
+
+
+def validate_count_mode(mode: str | None) -> str:
+    mode = (mode or "exact").lower()
+    if mode not in COUNT_MODES:
+        raise HTTPException(status_code=400, detail="INVALID_COUNT_MODE")
+    return mode
+
+
+def count_rows(cur, *, from_sql: str, where_sql: str, params: list[Any], mode: str) -> tuple[int | None, bool]:
+    """Return (total, estimated) for `SELECT ... {from_sql} {where_sql}` under `mode`."""
+    if mode == "none":
+        return None, False
+    query = f"{from_sql} {where_sql}"
+    if mode == "estimate":
+        cur.execute(f"EXPLAIN (FORMAT JSON) SELECT 1 {query}", tuple(params))
+        plan = cur.fetchone()[0]
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate >= config.ADMIN_COUNT_ESTIMATE_THRESHOLD:
+            return estimate, True
+        key = (query, tuple(params))
+        cached = count_cache.get(key)
+        if cached is not None:
+            return cached, False
+        cur.execute(f"SELECT COUNT(*) {query}", tuple(params))
+        total = int(cur.fetchone()[0])
+        count_cache.put(key, total, config.ADMIN_COUNT_CACHE_TTL_SECONDS)
+        return total, False
+    cur.execute(f"SELECT COUNT(*) {query}", tuple(params))
+    return int(cur.fetchone()[0]), False
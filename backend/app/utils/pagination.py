@@ -0,0 +1,43 @@
+"""Opaque keyset (cursor) pagination helpers for admin list endpoints.
+
+A cursor is the sort key of the last row of a page, plus a tag naming the ordering it
+was issued for, base64url-encoded JSON. Clients pass it back unchanged as `cursor`.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi import HTTPException
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(tag: str, *values: Any) -> str:
+    raw = json.dumps([tag, *[_plain(v) for v in values]], separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *, tag: str, size: int) -> list[Any]:
+    """Sort-key values of `cursor`; 400 INVALID_CURSOR if malformed or issued for another ordering."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw.decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="INVALID_CURSOR")
+    if not isinstance(data, list) or len(data) != size + 1 or data[0] != tag:
+        raise HTTPException(status_code=400, detail="INVALID_CURSOR")
+    return data[1:]
+
+
+def keyset_after(columns: list[str], order_sql: str) -> str:
+    """Row-comparison predicate selecting rows after the cursor for `ORDER BY columns order_sql`."""
+    op = "<" if order_sql == "DESC" else ">"
+    placeholders = ", ".join(["%s"] * len(columns))
+    return f"({', '.join(columns)}) {op} ({placeholders})"
@@ -1,5 +1,8 @@
+import codecs
+import csv
+import io
 from datetime import date, datetime
-from typing import Any
+from typing import Any, AsyncIterable, AsyncIterator
 
 
 def _parse_int_optional(value: Any) -> int | None:
@@ -28,3 +31,46 @@ def _parse_date_optional(value: Any) -> date | None:
         # date-like
         return value
     raise ValueError("INVALID_DATE")
+
+
+async def _iter_csv_records(chunks: AsyncIterable[bytes], *, encoding: str = "utf-8-sig") -> AsyncIterator[list[str]]:
+    """Parse CSV records from a byte stream without buffering the whole body.
+
+    `utf-8-sig` strips the BOM Excel puts in front of Korean headers. A record is only
+    handed to the csv module once its quotes are balanced, so quoted fields may contain
+    newlines and may straddle network chunks.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    partial = ""  # text after the last newline, not yet a full line
+    record: list[str] = []  # lines of the record being assembled
+    in_quotes = False
+
+    def _complete_lines(text: str):
+        nonlocal partial, in_quotes
+        # newline="" splits on \n, \r and \r\n only and keeps the terminators.
+        lines = io.StringIO(partial + text, newline="").readlines()
+        partial = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        done: list[str] = []
+        for line in lines:
+            record.append(line)
+            if line.count('"') % 2:
+                in_quotes = not in_quotes
+            if not in_quotes:
+                done.append("".join(record))
+                record.clear()
+        return done
+
+    async for chunk in chunks:
+        done = _complete_lines(decoder.decode(chunk))
+        for row in csv.reader(done):
+            if row:
+                yield row
+
+    tail = decoder.decode(b"", final=True) + partial
+    partial = ""
+    done = _complete_lines(tail + "\n") if tail else []
+    if record:
+        done.append("".join(record))
+    for row in csv.reader(done):
+        if row:
+            yield row
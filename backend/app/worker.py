@@ -1,72 +1,173 @@
 import asyncio
-from datetime import datetime, timezone, timedelta
+import logging
+import time
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
 
 from app import config, db
+from app.services.campaign_service import CampaignScheduler
+from app.services.common import WORKER_WAKEUP_CHANNEL
+from app.services.compensation_service import SimulatedCompensationClient, process_compensations_once
+from app.services.expiry_service import sweep_expired_vaults
+from app.services.import_service import apply_import_chunk, finish_import_chunk, load_chunk_rows
+from app.services.notification_delivery import build_channel, deliver_notifications_once
+from app.services.notification_templates import start_template_listener
+
+logger = logging.getLogger("vault.worker")
 
+# Returned by run_stage() when a stage raised; the pass then backs off instead of spinning.
+STAGE_FAILED = object()
 
-def process_once(conn):
+
+def process_import_chunk_once(conn):
+    """Apply one pending background-import chunk in its own transaction; returns chunks handled (0 or 1)."""
     cur = conn.cursor()
     cur.execute("SET LOCAL lock_timeout = %s", (f"{config.JOB_LOCK_TIMEOUT_MS}ms",))
     cur.execute("SET LOCAL statement_timeout = %s", (f"{config.JOB_STATEMENT_TIMEOUT_MS}ms",))
-    now = datetime.now(timezone.utc)
+    # SKIP LOCKED: several workers can drain the queue; a crashed worker's chunk stays PENDING.
     cur.execute(
         """
-        SELECT id, user_id, vault_type, request_id, external_service, payload, retry_count
-          FROM compensation_queue
-         WHERE status IN ('PENDING','RETRYING')
-           AND next_retry_at <= %s
-         ORDER BY next_retry_at ASC
-         LIMIT 20
-        """,
-        (now,),
+        SELECT job_id, chunk_index, row_count, rows
+          FROM admin_import_chunks
+         WHERE status='PENDING'
+         ORDER BY created_at ASC, chunk_index ASC
+         LIMIT 1
+         FOR UPDATE SKIP LOCKED
+        """
     )
-    rows = cur.fetchall()
-    if not rows:
+    row = cur.fetchone()
+    if not row:
+        conn.rollback()
         return 0
 
-    processed = 0
-    for row in rows:
-        cid, user_id, vault_type, request_id, external_service, payload, retry_count = row
-        # Simulate external call success
-        success = True
-        if success:
-            cur.execute(
-                "UPDATE compensation_queue SET status='DONE', last_error=NULL WHERE id=%s",
-                (cid,),
-            )
-        else:
-            retry = retry_count + 1
-            if retry >= config.COMPENSATION_MAX_RETRIES:
-                cur.execute(
-                    "UPDATE compensation_queue SET status='FAILED', last_error=%s WHERE id=%s",
-                    ("max retries reached", cid),
-                )
-            else:
-                backoff = config.COMPENSATION_BACKOFF_SECONDS[min(retry - 1, len(config.COMPENSATION_BACKOFF_SECONDS) - 1)]
-                cur.execute(
-                    """
-                    UPDATE compensation_queue
-                       SET status='RETRYING',
-                           retry_count=%s,
-                           next_retry_at=%s,
-                           last_error=%s
-                     WHERE id=%s
-                    """,
-                    (retry, now + timedelta(seconds=backoff), "retrying", cid),
-                )
-        processed += 1
+    job_id, chunk_index, row_count, rows = row
+    cur.execute("SAVEPOINT import_chunk")
+    try:
+        stats = apply_import_chunk(cur, load_chunk_rows(rows))
+    except Exception as exc:
+        cur.execute("ROLLBACK TO SAVEPOINT import_chunk")
+        error = str(exc.detail) if isinstance(exc, HTTPException) else (str(exc) or "ERROR")
+        finish_import_chunk(cur, job_id, chunk_index, processed=0, failed=row_count, error=error[:500])
+        conn.commit()
+        return 1
+
+    finish_import_chunk(cur, job_id, chunk_index, processed=stats["processed"], failed=0, error=None)
     conn.commit()
-    return processed
+    return 1
+
+
+def process_expiry_sweep_once(conn):
+    """Run one expiry sweep unless another worker holds the sweep lock; returns its counts or None."""
+    cur = conn.cursor()
+    cur.execute("SELECT pg_try_advisory_lock(hashtext('expiry-sweep'))")
+    if not cur.fetchone()[0]:
+        conn.rollback()
+        return None
+    try:
+        return sweep_expired_vaults(conn, now=datetime.now(timezone.utc), shadow=config.EXPIRY_SWEEP_SHADOW)
+    finally:
+        conn.rollback()
+        cur.execute("SELECT pg_advisory_unlock(hashtext('expiry-sweep'))")
+        conn.commit()
+
+
+def seconds_until_next_due(conn) -> float | None:
+    """Seconds until the earliest scheduled compensation/notification retry (<= 0 if already due)."""
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT EXTRACT(EPOCH FROM LEAST(
+                   (SELECT MIN(next_retry_at) FROM compensation_queue WHERE status IN ('PENDING','RETRYING')),
+                   (SELECT MIN(COALESCE(scheduled_at, created_at)) FROM notifications_queue WHERE status IN ('PENDING','RETRYING'))
+               ) - NOW())
+        """
+    )
+    row = cur.fetchone()
+    conn.rollback()
+    return float(row[0]) if row and row[0] is not None else None
+
+
+def idle_timeout(idle_wait: float, next_due: float | None, next_sweep_in: float, *, floor: float) -> float:
+    """How long an idle worker may block: the adaptive backoff, cut short by known due times.
+
+    Never below `floor`, so rows that are due but locked by another worker do not cause a busy loop.
+    """
+    timeout = min(idle_wait, next_sweep_in)
+    if next_due is not None:
+        timeout = min(timeout, next_due)
+    return max(floor, timeout)
+
+
+async def run_stage(name: str, fn):
+    """Run `await fn(conn)` on its own pooled connection; log and return STAGE_FAILED if it raises.
+
+    One failing stage (pool timeout, lost connection, a bad row) must not stop the others.
+    """
+    try:
+        with db.get_conn() as conn:
+            return await fn(conn)
+    except Exception:
+        logger.exception("worker stage %s failed", name)
+        return STAGE_FAILED
 
 
 async def main():
     db.init_pool()
+    channel = build_channel()
+    start_template_listener()
+    compensation_client = SimulatedCompensationClient()
+    campaigns = CampaignScheduler()
+    next_sweep = 0.0
+
+    # Enqueue paths NOTIFY on commit (common.wake_workers); polling is only the safety net.
+    loop = asyncio.get_running_loop()
+    wakeup = asyncio.Event()
+    listener = db.Listener(
+        [WORKER_WAKEUP_CHANNEL],
+        lambda _channel, _payload: loop.call_soon_threadsafe(wakeup.set),
+        on_reconnect=lambda: loop.call_soon_threadsafe(wakeup.set),
+    )
+    listener.start()
+    min_wait = config.WORKER_IDLE_MIN_MS / 1000
+    idle_wait = min_wait
+    error_wait = 0.0
     try:
         while True:
-            with db.get_conn() as conn:
-                await asyncio.to_thread(process_once, conn)
-            await asyncio.sleep(5)
+            # Cleared before the pass: a NOTIFY arriving mid-pass makes the next wait return at once.
+            wakeup.clear()
+            compensated = await run_stage("compensations", lambda conn: process_compensations_once(conn, compensation_client))
+            campaigned = await run_stage("campaigns", lambda conn: asyncio.to_thread(campaigns.run_due, conn))
+            swept = None
+            if time.monotonic() >= next_sweep:
+                swept = await run_stage("expiry_sweep", lambda conn: asyncio.to_thread(process_expiry_sweep_once, conn))
+                next_sweep = time.monotonic() + config.EXPIRY_SWEEP_INTERVAL_SECONDS
+            imported = await run_stage("import_chunks", lambda conn: asyncio.to_thread(process_import_chunk_once, conn))
+            delivered = await run_stage("deliveries", lambda conn: deliver_notifications_once(conn, channel))
+
+            if STAGE_FAILED in (compensated, campaigned, swept, imported, delivered):
+                # Usually the database is down or the pool is exhausted: back off, then retry every stage.
+                error_wait = min(max(error_wait * 2, min_wait), config.WORKER_POLL_MAX_SECONDS)
+                await asyncio.sleep(error_wait)
+                continue
+            error_wait = 0.0
+
+            # Queues are drained back to back; only idle when none of them had work.
+            if compensated["claimed"] or imported or delivered["claimed"]:
+                idle_wait = min_wait
+                continue
+
+            next_due = await run_stage("next_due", lambda conn: asyncio.to_thread(seconds_until_next_due, conn))
+            if next_due is STAGE_FAILED:
+                next_due = None
+            timeout = idle_timeout(idle_wait, next_due, next_sweep - time.monotonic(), floor=min_wait)
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout)
+                idle_wait = min_wait
+            except asyncio.TimeoutError:
+                idle_wait = min(idle_wait * 2, config.WORKER_POLL_MAX_SECONDS)
     finally:
+        listener.stop()
         db.close_pool()
 
 
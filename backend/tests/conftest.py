@@ -146,6 +146,7 @@ def _reset_db_state(db_url):
         with conn.cursor() as cur:
             # Use DELETE instead of TRUNCATE to avoid lock contention with app pool connections.
             cur.execute("DELETE FROM notifications_queue")
+            cur.execute("DELETE FROM notifications_dlq")
             cur.execute("DELETE FROM compensation_queue")
             cur.execute("DELETE FROM admin_job_items")
             cur.execute("DELETE FROM admin_jobs")
@@ -165,4 +166,8 @@ def _reset_db_state(db_url):
         conn.close()
         pytest.skip(f"database reset skipped (DB busy/locked): {exc}")
     conn.close()
+    # In-process caches may still hold rows for the reused user_ids.
+    from app.services.user_identity_service import identity_cache
+
+    identity_cache.invalidate()
     yield
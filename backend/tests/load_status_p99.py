@@ -0,0 +1,111 @@
+"""Load test: /api/vault/status p99 latency while admin imports are running.
+
+Not collected by pytest (no `test_` prefix). Run against a live API, once on the
+old build and once on the new one, and compare the printed percentiles:
+
+    python tests/load_status_p99.py --base-url http://localhost:18000 \
+        --status-concurrency 50 --duration 30 --import-concurrency 2 --import-rows 10000
+
+Run it from other cores/hosts than the API: on a single vCPU this client alone takes about half
+the CPU and its own scheduling delay dominates the tail it reports. Compare /health/db-pool
+(acquire_latency_ms_buckets, checkout_mean_ms) after each run for the server-side share.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+import httpx
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def _import_rows(count: int, prefix: str) -> list[dict]:
+    return [
+        {
+            "external_user_id": f"{prefix}-{i}",
+            "nickname": f"load-{i}",
+            "deposit_total": 100000 + i,
+            "telegram_ok": i % 2 == 0,
+            "review_ok": i % 3 == 0,
+            "last_deposit_at": "2026-01-01",
+        }
+        for i in range(count)
+    ]
+
+
+async def _status_loop(client: httpx.AsyncClient, external_user_id: str, deadline: float, samples: list[float], errors: list):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            resp = await client.get("/api/vault/status", params={"external_user_id": external_user_id})
+        except httpx.TransportError as exc:
+            errors.append(type(exc).__name__)
+            continue
+        samples.append((time.perf_counter() - started) * 1000)
+        if resp.status_code != 200:
+            errors.append(resp.status_code)
+
+
+async def _import_loop(client: httpx.AsyncClient, rows: list[dict], password: str, deadline: float, durations: list[float]):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.post(
+            "/api/vault/user-daily-import",
+            json={"rows": rows},
+            headers={"x-admin-password": password, "x-idempotency-key": f"load-{uuid4()}"},
+        )
+        durations.append((time.perf_counter() - started) * 1000)
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.status_concurrency + args.import_concurrency + 4)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=120, limits=limits) as client:
+        # Seed the user polled by /status so the read path hits real rows.
+        seed_id = f"load-status-{uuid4()}"
+        await client.post(
+            "/api/vault/user-daily-import",
+            json={"rows": [{"external_user_id": seed_id, "deposit_total": 0, "telegram_ok": True}]},
+            headers={"x-admin-password": args.admin_password, "x-idempotency-key": f"load-seed-{uuid4()}"},
+        )
+
+        deadline = time.perf_counter() + args.duration
+        samples: list[float] = []
+        errors: list = []
+        import_durations: list[float] = []
+        tasks = [
+            _status_loop(client, seed_id, deadline, samples, errors)
+            for _ in range(args.status_concurrency)
+        ]
+        tasks += [
+            _import_loop(client, _import_rows(args.import_rows, f"load-import-{n}"), args.admin_password, deadline, import_durations)
+            for n in range(args.import_concurrency)
+        ]
+        await asyncio.gather(*tasks)
+
+    print(f"/status requests: {len(samples)} (non-200: {len(errors)}) {sorted(set(map(str, errors)))}")
+    if samples:
+        print(f"  p50={_percentile(samples, 50):.1f}ms p95={_percentile(samples, 95):.1f}ms "
+              f"p99={_percentile(samples, 99):.1f}ms max={max(samples):.1f}ms mean={statistics.mean(samples):.1f}ms")
+    print(f"imports completed: {len(import_durations)}")
+    if import_durations:
+        print(f"  mean={statistics.mean(import_durations):.1f}ms max={max(import_durations):.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:18000")
+    parser.add_argument("--admin-password", default="admin1234")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--status-concurrency", type=int, default=50)
+    parser.add_argument("--import-concurrency", type=int, default=2)
+    parser.add_argument("--import-rows", type=int, default=10000)
+    asyncio.run(main(parser.parse_args()))
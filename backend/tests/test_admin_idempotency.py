@@ -1,6 +1,8 @@
 from datetime import datetime, timezone
 from uuid import uuid4
 
+from app import config
+
 
 def _idem_headers():
     return {"x-idempotency-key": f"test-admin-import-{uuid4()}"}
@@ -130,6 +132,169 @@ def test_extend_expiry_shadow_and_apply(client):
     assert datetime.fromisoformat(status_after["expires_at"]) == new_expires
 
 
+def test_extend_expiry_runs_in_keyset_batches_and_skips_already_extended(client, db_conn, monkeypatch):
+    monkeypatch.setattr(config, "ADMIN_BULK_BATCH_SIZE", 2)
+    user_ids = [7101, 7102, 7103, 7104, 7105]
+    cur = db_conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO vault_status (user_id, expires_at)
+        SELECT uid, TIMESTAMPTZ '2030-01-01 00:00:00+00' FROM unnest(%s::int[]) AS t(uid)
+        ON CONFLICT (user_id) DO UPDATE SET expires_at = EXCLUDED.expires_at
+        """,
+        (user_ids,),
+    )
+    # 7103 was already extended by an earlier, interrupted attempt of the same request.
+    cur.execute(
+        """
+        INSERT INTO vault_expiry_extension_log (user_id, prev_expires_at, new_expires_at, reason, request_id, shadow)
+        VALUES (7103, NOW(), NOW(), 'OPS', 'req-extend-batch-1:7103', false)
+        """
+    )
+    db_conn.commit()
+
+    resp = client.post(
+        "/api/vault/extend-expiry",
+        json={"request_id": "req-extend-batch-1", "scope": "USER_IDS", "user_ids": user_ids, "extend_hours": 2, "reason": "OPS"},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["updated"] == 4
+    assert datetime.fromisoformat(resp.json()["new_expires_at"]) == datetime(2030, 1, 1, 2, tzinfo=timezone.utc)
+
+    cur.execute("SELECT user_id, expires_at FROM vault_status WHERE user_id = ANY(%s) ORDER BY user_id", (user_ids,))
+    extended = {uid for uid, exp in cur.fetchall() if exp.hour == 2}
+    assert extended == {7101, 7102, 7104, 7105}
+    cur.execute(
+        "SELECT COUNT(*) FROM vault_expiry_extension_log WHERE request_id LIKE 'req-extend-batch-1:%%' AND prev_expires_at < new_expires_at"
+    )
+    assert cur.fetchone()[0] == 4
+    db_conn.rollback()
+
+
+def test_extend_expiry_failure_releases_key_and_retry_resumes(client, db_conn, monkeypatch):
+    import pytest
+
+    from app.services import admin_ops_service
+
+    monkeypatch.setattr(config, "ADMIN_BULK_BATCH_SIZE", 2)
+    user_ids = [7201, 7202, 7203, 7204]
+    cur = db_conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO vault_status (user_id, expires_at)
+        SELECT uid, TIMESTAMPTZ '2030-01-01 00:00:00+00' FROM unnest(%s::int[]) AS t(uid)
+        """,
+        (user_ids,),
+    )
+    db_conn.commit()
+
+    # Second batch fails after the first one committed.
+    calls = []
+    real_timeouts = admin_ops_service._apply_job_timeouts
+
+    def _failing_timeouts(c):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("batch failed")
+        real_timeouts(c)
+
+    monkeypatch.setattr(admin_ops_service, "_apply_job_timeouts", _failing_timeouts)
+    body = {"request_id": "req-extend-fail-1", "scope": "USER_IDS", "user_ids": user_ids, "extend_hours": 2, "reason": "OPS"}
+    with pytest.raises(RuntimeError):
+        client.post("/api/vault/extend-expiry", json=body)
+    cur.execute("SELECT COUNT(*) FROM idempotency_keys WHERE key='req-extend-fail-1'")
+    assert cur.fetchone()[0] == 0
+    cur.execute("SELECT COUNT(*) FROM vault_status WHERE user_id = ANY(%s) AND expires_at > TIMESTAMPTZ '2030-01-01 00:00:00+00'", (user_ids,))
+    assert cur.fetchone()[0] == 2
+    db_conn.commit()
+
+    monkeypatch.setattr(admin_ops_service, "_apply_job_timeouts", real_timeouts)
+    retry = client.post("/api/vault/extend-expiry", json=body)
+    assert retry.status_code == 200
+    assert retry.json()["updated"] == 2
+    cur.execute("SELECT expires_at FROM vault_status WHERE user_id = ANY(%s)", (user_ids,))
+    assert {exp.hour for (exp,) in cur.fetchall()} == {2}
+    db_conn.rollback()
+
+
+def test_extend_expiry_crashed_key_is_taken_over_after_lease(client, db_conn, monkeypatch):
+    import pytest
+
+    from app import main
+    from app.services import admin_ops_service
+
+    monkeypatch.setattr(config, "ADMIN_BULK_BATCH_SIZE", 2)
+    user_ids = [7301, 7302, 7303, 7304]
+    cur = db_conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO vault_status (user_id, expires_at)
+        SELECT uid, TIMESTAMPTZ '2030-01-01 00:00:00+00' FROM unnest(%s::int[]) AS t(uid)
+        """,
+        (user_ids,),
+    )
+    db_conn.commit()
+
+    # The process dies after the first batch: nothing releases the committed IN_PROGRESS key.
+    real_timeouts = admin_ops_service._apply_job_timeouts
+    calls = []
+
+    def _crashing_timeouts(c):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("worker killed")
+        real_timeouts(c)
+
+    monkeypatch.setattr(admin_ops_service, "_apply_job_timeouts", _crashing_timeouts)
+    monkeypatch.setattr(main, "_idempotency_release", lambda cur, **kw: None)
+    body = {"request_id": "req-extend-crash-1", "scope": "USER_IDS", "user_ids": user_ids, "extend_hours": 2, "reason": "OPS"}
+    with pytest.raises(RuntimeError):
+        client.post("/api/vault/extend-expiry", json=body)
+    monkeypatch.setattr(admin_ops_service, "_apply_job_timeouts", real_timeouts)
+
+    # Within the lease the key still looks busy.
+    assert client.post("/api/vault/extend-expiry", json=body).status_code == 409
+
+    cur.execute(
+        "UPDATE idempotency_keys SET updated_at = NOW() - make_interval(secs => %s) WHERE key='req-extend-crash-1'",
+        (config.IDEMPOTENCY_LEASE_SECONDS + 1,),
+    )
+    db_conn.commit()
+    # A different body under the same key is still rejected.
+    other = client.post("/api/vault/extend-expiry", json={**body, "extend_hours": 3})
+    assert other.status_code == 409
+    assert other.json()["detail"] == "IDEMPOTENCY_KEY_REUSE"
+
+    retry = client.post("/api/vault/extend-expiry", json=body)
+    assert retry.status_code == 200
+    assert retry.json()["updated"] == 2
+    cur.execute("SELECT expires_at FROM vault_status WHERE user_id = ANY(%s)", (user_ids,))
+    assert {exp.hour for (exp,) in cur.fetchall()} == {2}
+    cur.execute("SELECT status FROM idempotency_keys WHERE key='req-extend-crash-1'")
+    assert cur.fetchone()[0] == "DONE"
+    db_conn.rollback()
+
+
+def test_admin_extend_expiry_records_candidates(client, db_conn):
+    cur = db_conn.cursor()
+    cur.execute("INSERT INTO user_identity (user_id, external_user_id) SELECT g, 'ext-cand-' || g FROM generate_series(7301, 7303) AS g")
+    cur.execute("INSERT INTO user_admin_snapshot (user_id, nickname) SELECT g, 'cand' FROM generate_series(7301, 7303) AS g")
+    cur.execute("INSERT INTO vault_status (user_id, expires_at) SELECT g, NOW() + INTERVAL '1 day' FROM generate_series(7301, 7303) AS g")
+    db_conn.commit()
+
+    resp = client.post(
+        "/api/vault/admin/operations/extend-expiry",
+        json={"request_id": "req-admin-extend-cand", "target": {"mode": "filter", "filter": {}}, "extend_hours": 1, "reason": "OPS"},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["updated"] == 3
+    cur.execute(
+        "SELECT DISTINCT (metadata->'target'->>'candidates')::int FROM vault_expiry_extension_log WHERE request_id LIKE 'req-admin-extend-cand:%%'"
+    )
+    assert cur.fetchall() == [(3,)]
+    db_conn.rollback()
+
+
 def test_notify_idempotency_replay(client, db_conn):
     external_user_id = "ext-notify-1"
     _import_user(client, external_user_id)
@@ -0,0 +1,131 @@
+from pathlib import Path
+from uuid import uuid4
+
+from app import config
+
+KOREAN_CSV = Path(__file__).resolve().parents[2] / "test_upload_korean.csv"
+
+
+def _csv_headers(prefix: str = "csv-import"):
+    return {"x-idempotency-key": f"{prefix}-{uuid4()}", "content-type": "text/csv; charset=utf-8"}
+
+
+def _snapshot_deposit(db_conn, external_user_id: str):
+    with db_conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT uas.deposit_total
+              FROM user_identity ui
+              JOIN user_admin_snapshot uas ON uas.user_id = ui.user_id
+             WHERE ui.external_user_id = %s
+            """,
+            (external_user_id,),
+        )
+        row = cur.fetchone()
+    db_conn.rollback()
+    return int(row[0]) if row else None
+
+
+def test_csv_import_korean_headers_with_bom(client, db_conn):
+    payload = b"\xef\xbb\xbf" + KOREAN_CSV.read_bytes()
+
+    resp = client.post("/api/vault/admin/imports/csv", content=payload, headers=_csv_headers())
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total"] == 3
+    assert data["processed"] == 3
+    assert data["identity_created"] == 3
+    assert data["errors"] == []
+
+    status = client.get("/api/vault/status", params={"external_user_id": "user_test001"}).json()
+    assert status["gold_status"] == "UNLOCKED"
+    assert _snapshot_deposit(db_conn, "user_test001") == 1500000
+
+
+def test_csv_import_streams_in_chunks(client, db_conn, monkeypatch):
+    monkeypatch.setattr(config, "IMPORT_CHUNK_SIZE", 2)
+    lines = ["external_user_id,nickname,deposit_total,joined_at\n"]
+    lines += [f"ext-csv-{i},\"nick, {i}\",\"1,000\",2024-01-0{i + 1}\n" for i in range(5)]
+    # The duplicate shares a chunk with ext-csv-4 (dedup is per chunk; memory stays bounded by the chunk size).
+    lines += ["ext-csv-4,dup,0,\n", ",missing,0,\n", "ext-csv-bad,bad,0,not-a-date\n"]
+
+    def body():
+        # Split mid-record to exercise records straddling network chunks.
+        data = "".join(lines).encode()
+        for i in range(0, len(data), 7):
+            yield data[i : i + 7]
+
+    resp = client.post("/api/vault/admin/imports/csv", content=body(), headers=_csv_headers())
+    assert resp.status_code == 202
+    data = resp.json()
+    assert data["total"] == 8
+    assert data["processed"] == 5
+    assert data["dedup_removed"] == 1
+    assert len(data["job_ids"]) == 3
+    assert {e["code"] for e in data["errors"]} == {"MISSING_EXTERNAL_USER_ID", "INVALID_JOINED_DATE"}
+
+    assert _snapshot_deposit(db_conn, "ext-csv-4") == 1000
+
+
+def test_csv_import_shadow_and_validation(client, db_conn):
+    resp = client.post(
+        "/api/vault/admin/imports/csv",
+        params={"mode": "SHADOW"},
+        content="아이디,닉네임\nshadow-1,a\n".encode(),
+        headers=_csv_headers(),
+    )
+    assert resp.status_code == 200
+    assert resp.json()["shadow"] is True
+    assert resp.json()["processed"] == 1
+    assert _snapshot_deposit(db_conn, "shadow-1") is None
+
+    resp = client.post("/api/vault/admin/imports/csv", content=b"nickname\nfoo\n", headers=_csv_headers())
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "MISSING_EXTERNAL_USER_ID_COLUMN"
+
+    resp = client.post(
+        "/api/vault/admin/imports/csv",
+        content=b"{}",
+        headers={**_csv_headers(), "content-type": "application/json"},
+    )
+    assert resp.status_code == 415
+
+
+def test_csv_import_key_reuse_compares_body_digest(client, db_conn):
+    headers = _csv_headers()
+    first = b"external_user_id,deposit_total\next-digest-1,1000\n"
+    same_size = b"external_user_id,deposit_total\next-digest-2,1000\n"
+    assert len(first) == len(same_size)
+
+    resp = client.post("/api/vault/admin/imports/csv", content=first, headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers["Idempotency-Status"] == "recorded"
+
+    resp = client.post("/api/vault/admin/imports/csv", content=first, headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers["Idempotency-Status"] == "replayed"
+
+    resp = client.post("/api/vault/admin/imports/csv", content=same_size, headers=headers)
+    assert resp.status_code == 409
+    assert resp.json()["detail"] == "IDEMPOTENCY_KEY_REUSE"
+    assert _snapshot_deposit(db_conn, "ext-digest-2") is None
+
+
+def test_csv_import_caps_reported_errors_and_releases_key_on_failure(client, db_conn, monkeypatch):
+    monkeypatch.setattr(config, "IMPORT_MAX_REPORTED_ERRORS", 2)
+    body = "external_user_id,joined_at\n" + "".join(f"ext-err-{i},bad-date\n" for i in range(5)) + "ext-err-ok,\n"
+
+    resp = client.post("/api/vault/admin/imports/csv", content=body.encode(), headers=_csv_headers())
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["processed"] == 1
+    assert data["error_count"] == 5
+    assert [e["row_index"] for e in data["errors"]] == [0, 1]
+
+    # A rejected upload must not leave its key IN_PROGRESS.
+    headers = _csv_headers()
+    resp = client.post("/api/vault/admin/imports/csv", content=b"external_user_id\n", headers=headers)
+    assert resp.status_code == 400
+    resp = client.post("/api/vault/admin/imports/csv", content=b"external_user_id\next-retry,\n", headers=headers)
+    assert resp.status_code == 200
+    assert resp.json()["processed"] == 1
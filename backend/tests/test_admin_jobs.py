@@ -69,4 +69,178 @@ def test_admin_job_state_transitions(client, db_conn):
 
     retry = client.post(f"/api/vault/admin/jobs/{job_id}/retry")
     assert retry.status_code == 409
-    assert retry.json().get("detail") == "JOB_INVALID_STATE"
\ No newline at end of file
+    assert retry.json().get("detail") == "JOB_INVALID_STATE"
+
+def test_bulk_update_is_set_based_and_reports_claimed_failures(client, db_conn):
+    cur = db_conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status, platinum_attendance_days)
+        VALUES (6101, NOW() + INTERVAL '1 day', 'LOCKED', 'LOCKED', 'LOCKED', 1),
+               (6102, NOW() + INTERVAL '1 day', 'CLAIMED', 'LOCKED', 'LOCKED', 2)
+        ON CONFLICT (user_id) DO UPDATE
+           SET gold_status = EXCLUDED.gold_status, platinum_attendance_days = EXCLUDED.platinum_attendance_days
+        """
+    )
+    db_conn.commit()
+
+    request_id = f"bulk-{uuid4()}"
+    resp = client.post(
+        "/api/vault/admin/operations/bulk-update",
+        json={
+            "request_id": request_id,
+            "target": {"mode": "user_ids", "user_ids": [6101, 6102, 6103]},
+            "status": {"gold_status": "UNLOCKED"},
+            "attendance": {"delta": 5},
+        },
+        headers={"x-idempotency-key": request_id},
+    )
+    assert resp.status_code == 202
+    data = resp.json()
+    assert (data["target_count"], data["processed"], data["failed"]) == (3, 3, 1)
+
+    items = client.get(f"/api/vault/admin/jobs/{data['job_id']}/items").json()["items"]
+    by_user = {i["user_id"]: i for i in items}
+    assert by_user[6102]["status"] == "FAILED"
+    assert by_user[6102]["error_message"] == "CANNOT_MODIFY_CLAIMED"
+    assert by_user[6101]["status"] == by_user[6103]["status"] == "DONE"
+
+    cur.execute(
+        "SELECT user_id, gold_status, platinum_attendance_days FROM vault_status WHERE user_id IN (6101, 6102, 6103) ORDER BY user_id"
+    )
+    # Attendance is capped at 3 by default; the failed user is left untouched; 6103 gets a fresh vault row.
+    assert cur.fetchall() == [(6101, "UNLOCKED", 3), (6102, "CLAIMED", 2), (6103, "UNLOCKED", 3)]
+    db_conn.rollback()
+
+
+def _walk(client, path, params):
+    pages = []
+    params = {**params, "cursor": ""}
+    while True:
+        data = client.get(path, params=params).json()
+        pages.append(data["items"])
+        if not data["next_cursor"]:
+            return pages
+        params["cursor"] = data["next_cursor"]
+
+
+def test_admin_lists_keyset_pagination_matches_offset_order(client, db_conn):
+    cur = db_conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO admin_jobs (job_id, type, status, request_id, created_at, updated_at)
+        SELECT 'job-ks-' || g, 'NOTIFY', 'DONE', 'r-' || g, TIMESTAMPTZ '2030-01-01' + (g / 2) * INTERVAL '1 minute', NOW()
+          FROM generate_series(1, 7) AS g
+        """
+    )
+    cur.execute(
+        "INSERT INTO admin_job_items (job_id, user_id, status) SELECT 'job-ks-1', g, 'DONE' FROM generate_series(1, 5) AS g"
+    )
+    cur.execute(
+        """
+        INSERT INTO admin_audit_log (admin_user, action, created_at)
+        SELECT 'tester', 'KEYSET', TIMESTAMPTZ '2030-01-01' + (g / 3) * INTERVAL '1 second'
+          FROM generate_series(1, 6) AS g
+        """
+    )
+    db_conn.commit()
+
+    pages = _walk(client, "/api/vault/admin/jobs", {"page_size": 3, "order": "asc"})
+    assert [len(p) for p in pages] == [3, 3, 1]
+    # created_at ties (job-ks-2/3, ...) are broken by job_id, so no row repeats or goes missing.
+    assert [j["job_id"] for p in pages for j in p] == [f"job-ks-{g}" for g in range(1, 8)]
+    offset_ids = [j["job_id"] for j in client.get("/api/vault/admin/jobs", params={"page_size": 10}).json()["items"]]
+    desc_ids = [j["job_id"] for p in _walk(client, "/api/vault/admin/jobs", {"page_size": 2}) for j in p]
+    assert desc_ids == offset_ids
+
+    items = _walk(client, "/api/vault/admin/jobs/job-ks-1/items", {"page_size": 2})
+    assert [i["user_id"] for p in items for i in p] == [1, 2, 3, 4, 5]
+
+    audit = _walk(client, "/api/vault/admin/audit-log", {"page_size": 4, "action": "KEYSET"})
+    assert [len(p) for p in audit] == [4, 2]
+    assert len({a["id"] for p in audit for a in p}) == 6
+
+    bad = client.get("/api/vault/admin/jobs", params={"cursor": "not-a-cursor"})
+    assert (bad.status_code, bad.json()["detail"]) == (400, "INVALID_CURSOR")
+
+
+def test_admin_list_count_modes(client, db_conn, monkeypatch):
+    from app import config
+    from app.utils.list_counts import count_cache
+
+    count_cache.clear()
+    cur = db_conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO admin_audit_log (admin_user, action, created_at)
+        SELECT 'tester', 'COUNTS', NOW() FROM generate_series(1, 5)
+        """
+    )
+    db_conn.commit()
+    path = "/api/vault/admin/audit-log"
+
+    none = client.get(path, params={"action": "COUNTS", "page_size": 2, "count": "none"}).json()
+    assert (none["total"], none["has_more"], len(none["items"])) == (None, True, 2)
+    last = client.get(path, params={"action": "COUNTS", "page": 3, "page_size": 2, "count": "none"}).json()
+    assert (last["has_more"], len(last["items"])) == (False, 1)
+
+    # Small result sets: exact count, cached per filter set.
+    first = client.get(path, params={"action": "COUNTS", "count": "estimate"}).json()
+    assert (first["total"], first["total_estimated"]) == (5, False)
+    cur.execute("INSERT INTO admin_audit_log (admin_user, action) VALUES ('tester', 'COUNTS')")
+    db_conn.commit()
+    cached = client.get(path, params={"action": "COUNTS", "count": "estimate", "page": 2, "page_size": 5}).json()
+    # Stale cached total (5) is display-only; has_more comes from the probe row.
+    assert (cached["total"], len(cached["items"]), cached["has_more"]) == (5, 1, False)
+    assert client.get(path, params={"action": "COUNTS", "count": "estimate", "page_size": 5}).json()["has_more"] is True
+    assert client.get(path, params={"action": "COUNTS"}).json()["total"] == 6
+
+    monkeypatch.setattr(config, "ADMIN_COUNT_ESTIMATE_THRESHOLD", 0)
+    est = client.get(path, params={"count": "estimate"}).json()
+    assert est["total_estimated"] is True and est["total"] >= 0
+    # Planner estimates never end or extend pagination.
+    paged = client.get(path, params={"action": "COUNTS", "count": "estimate", "page_size": 4}).json()
+    assert (paged["total_estimated"], len(paged["items"]), paged["has_more"]) == (True, 4, True)
+    tail = client.get(path, params={"action": "COUNTS", "count": "estimate", "page": 2, "page_size": 4}).json()
+    assert (len(tail["items"]), tail["has_more"]) == (2, False)
+    users = client.get("/api/vault/admin/users", params={"count": "estimate"}).json()
+    assert users["total_estimated"] is True
+
+    bad = client.get(path, params={"count": "approx"})
+    assert (bad.status_code, bad.json()["detail"]) == (400, "INVALID_COUNT_MODE")
+
+
+def test_admin_csv_exports_stream_in_batches(client, db_conn, monkeypatch):
+    from app import config
+
+    monkeypatch.setattr(config, "EXPORT_FETCH_BATCH_SIZE", 2)
+    cur = db_conn.cursor()
+    cur.execute("INSERT INTO admin_jobs (job_id, type, status, request_id) VALUES ('job-csv', 'NOTIFY', 'DONE', 'r-csv')")
+    cur.execute(
+        """
+        INSERT INTO admin_job_items (job_id, user_id, status, error_message)
+        SELECT 'job-csv', g, CASE WHEN g % 2 = 0 THEN 'FAILED' ELSE 'DONE' END, CASE WHEN g % 2 = 0 THEN 'boom' END
+          FROM generate_series(1, 5) AS g
+        """
+    )
+    cur.execute("INSERT INTO admin_audit_log (admin_user, action) SELECT 'tester', 'CSV' FROM generate_series(1, 3)")
+    db_conn.commit()
+
+    resp = client.get("/api/vault/admin/jobs/job-csv/items", params={"format": "csv"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    lines = resp.text.strip().splitlines()
+    assert lines[0] == "job_item_id,job_id,user_id,status,error_message,created_at"
+    assert [line.split(",")[2] for line in lines[1:]] == ["1", "2", "3", "4", "5"]
+
+    failed = client.get("/api/vault/admin/jobs/job-csv/items", params={"format": "csv", "failed_only": "true"})
+    assert [line.split(",")[4] for line in failed.text.strip().splitlines()[1:]] == ["boom", "boom"]
+
+    audit = client.get("/api/vault/admin/audit-log", params={"format": "csv", "action": "CSV"})
+    assert len(audit.text.strip().splitlines()) == 4
+
+    notifications = client.get("/api/vault/admin/notifications", params={"format": "csv", "external_user_id": "nobody"})
+    assert notifications.text.strip().splitlines() == [
+        "id,user_id,external_user_id,type,variant_id,status,scheduled_at,created_at,title,body,payload"
+    ]
+    assert client.get("/api/vault/admin/jobs/missing/items", params={"format": "csv"}).status_code == 404
@@ -119,6 +119,30 @@ def test_admin_users_pagination_sort_and_filter(client, db_conn):
     assert filtered["users"][0].get("external_user_id") == "ext-1"
 
 
+def test_admin_users_keyset_pagination_with_null_sort_values(client, db_conn):
+    cur = db_conn.cursor()
+    now = datetime.now(timezone.utc)
+    for uid, nickname in ((11, "Delta"), (12, None), (13, "Alpha"), (14, "Delta"), (15, None)):
+        _seed_user(cur, uid, f"ext-ks-{uid}", nickname, "LOCKED", now + timedelta(days=1), uid, date(2024, 1, 1))
+    db_conn.commit()
+
+    seen = []
+    params = {"sort_by": "nickname", "sort_dir": "asc", "page_size": 2, "cursor": ""}
+    while True:
+        data = client.get("/api/vault/admin/users", params=params).json()
+        assert data["total"] == 5
+        seen.extend(u["external_user_id"] for u in data["users"])
+        if not data["next_cursor"]:
+            break
+        params["cursor"] = data["next_cursor"]
+
+    # NULL nicknames last, ties broken by user_id.
+    assert seen == ["ext-ks-13", "ext-ks-11", "ext-ks-14", "ext-ks-12", "ext-ks-15"]
+
+    other = client.get("/api/vault/admin/users", params={"sort_by": "created_at", "cursor": params["cursor"]})
+    assert (other.status_code, other.json()["detail"]) == (400, "INVALID_CURSOR")
+
+
 def test_admin_user_bulk_updates_apply(client):
     # Create two users via admin API with idempotency
     users = []
@@ -155,3 +179,73 @@ def test_admin_user_bulk_updates_apply(client):
         # Platinum/Diamond need more conditions (deposit, attendance, etc.) - just verify gold unlocked
         assert data["platinum_status"] == "LOCKED"
         assert data["diamond_status"] == "LOCKED"
+
+
+def test_identity_cache_bulk_fill_negative_entries_and_delete(client):
+    from app.services.user_identity_service import (
+        NOT_FOUND,
+        _on_identity_notify,
+        identity_cache,
+        resolve_user_ids_by_external_user_ids,
+    )
+
+    # Unknown ids are cached as negatives; creating them drops the negative entry.
+    assert client.get("/api/vault/status", params={"external_user_id": "ext-c"}).status_code == 404
+    assert identity_cache.get("ext-c") is NOT_FOUND
+
+    first = client.post("/api/vault/user-identity/bulk", json={"external_user_ids": ["ext-a", "ext-b", "ext-c"]}).json()
+    assert first["created"] == 3
+    # Created by the request's own transaction: cached on the next (committed) lookup.
+    assert identity_cache.get("ext-a") is None
+    assert identity_cache.get("ext-c") is None
+
+    second = client.post("/api/vault/user-identity/bulk", json={"external_user_ids": ["ext-a", "ext-b", "ext-c"]}).json()
+    assert second["created"] == 0
+    assert second["mappings"] == first["mappings"]
+
+    # Fully cached: no database access needed.
+    assert resolve_user_ids_by_external_user_ids(None, ["ext-b", "ext-a"]) == [first["mappings"]["ext-b"], first["mappings"]["ext-a"]]
+    hits_before = identity_cache.stats()["hits"]
+    third = client.post("/api/vault/user-identity/bulk", json={"external_user_ids": ["ext-a", "ext-b", "ext-c"]}).json()
+    assert third["mappings"] == first["mappings"]
+    assert identity_cache.stats()["hits"] == hits_before + 3
+
+    user_a = first["mappings"]["ext-a"]
+    resp = client.delete(f"/api/vault/admin/users/{user_a}", headers=_idem_headers())
+    assert resp.status_code == 200
+    assert identity_cache.get("ext-a") is None
+    recreated = client.post("/api/vault/user-identity/bulk", json={"external_user_ids": ["ext-a"]}).json()
+    assert recreated["created"] == 1
+    assert recreated["mappings"]["ext-a"] != user_a
+
+    # Cross-process invalidation payloads (user_identity triggers).
+    identity_cache.put_missing(["ext-z"])
+    _on_identity_notify("user_identity_changed", '["ext-b"]')
+    assert identity_cache.get("ext-b") is None
+    assert identity_cache.get("ext-c") == first["mappings"]["ext-c"]
+    _on_identity_notify("user_identity_changed", "")
+    assert identity_cache.get("ext-z") is None
+
+    stats = client.get("/health/identity-cache").json()
+    assert stats["hits"] >= 3 and stats["negative_hits"] >= 1
+    assert 0 < stats["hit_rate"] <= 1
+
+
+def test_identity_cache_skips_ids_created_by_a_rolled_back_transaction(client, db_conn):
+    from app.services.user_identity_service import (
+        NOT_FOUND,
+        get_or_create_user_id_by_external_user_id,
+        get_user_id_by_external_user_id,
+        identity_cache,
+    )
+
+    cur = db_conn.cursor()
+    first = get_or_create_user_id_by_external_user_id(cur, "ext-rollback")
+    # Second call in the same transaction takes the conflict -> SELECT path.
+    assert get_or_create_user_id_by_external_user_id(cur, "ext-rollback") == first
+    assert identity_cache.get("ext-rollback") is None
+    db_conn.rollback()
+
+    assert get_user_id_by_external_user_id(cur, "ext-rollback") is None
+    assert identity_cache.get("ext-rollback") is NOT_FOUND
+    db_conn.rollback()
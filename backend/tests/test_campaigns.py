@@ -0,0 +1,140 @@
+from datetime import datetime, timezone
+
+from app.services import campaign_service
+from app.services.campaign_service import CampaignScheduler, run_campaign
+from app.services.notification_service import dedup_day
+
+
+def _seed(db_conn):
+    cur = db_conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status, platinum_attendance_days)
+        VALUES (7101, NOW() + INTERVAL '36 hours', 'LOCKED', 'LOCKED', 'LOCKED', 0),
+               (7102, NOW() + INTERVAL '12 hours', 'CLAIMED', 'UNLOCKED', 'LOCKED', 0),
+               (7103, NOW() + INTERVAL '72 hours', 'CLAIMED', 'LOCKED', 'LOCKED', 2),
+               (7104, NOW() + INTERVAL '36 hours', 'CLAIMED', 'CLAIMED', 'CLAIMED', 2),
+               (7105, NOW() - INTERVAL '1 hour', 'LOCKED', 'LOCKED', 'LOCKED', 2)
+        """
+    )
+    db_conn.commit()
+    return cur
+
+
+def test_campaign_shadow_counts_then_enqueues_set_based(db_conn):
+    cur = _seed(db_conn)
+    now = datetime.now(timezone.utc)
+
+    shadow = {t: run_campaign(cur, t, now=now, shadow=True) for t in ("EXPIRY_D2", "EXPIRY_D0", "ATTENDANCE_D2")}
+    assert {t: (r["audience"], r["enqueued"]) for t, r in shadow.items()} == {
+        "EXPIRY_D2": (1, 0),
+        "EXPIRY_D0": (1, 0),
+        "ATTENDANCE_D2": (1, 0),
+    }
+    cur.execute("SELECT COUNT(*) FROM notifications_queue")
+    assert cur.fetchone()[0] == 0
+
+    for t in ("EXPIRY_D2", "EXPIRY_D0", "ATTENDANCE_D2"):
+        assert run_campaign(cur, t, now=now, shadow=False)["enqueued"] == 1
+    db_conn.commit()
+
+    day = dedup_day(now).isoformat()
+    cur.execute("SELECT dedup_key FROM notifications_queue ORDER BY dedup_key")
+    assert [r[0] for r in cur.fetchall()] == [
+        f"ATTENDANCE_D2:7103:base:{day}",
+        f"EXPIRY_D0:7102:base:{day}",
+        f"EXPIRY_D2:7101:base:{day}",
+    ]
+
+    # Same day again: audience unchanged, nothing new.
+    again = run_campaign(cur, "EXPIRY_D2", now=now, shadow=False)
+    assert (again["audience"], again["new"], again["enqueued"]) == (1, 0, 0)
+    cur.execute("SELECT COUNT(*) FROM admin_jobs WHERE type='NOTIFY' AND request_id LIKE 'campaign:%%'")
+    assert cur.fetchone()[0] == 7
+    db_conn.commit()
+
+
+def test_scheduler_runs_each_slot_once(db_conn):
+    _seed(db_conn)
+    scheduler = CampaignScheduler(schedule="09:00,18:00", utc_offset_hours=9, types=["EXPIRY_D2"], shadow=False)
+
+    # 08:00 KST: yesterday's 18:00 slot is not replayed on start.
+    assert scheduler.run_due(db_conn, datetime(2030, 1, 2, 23, 0, tzinfo=timezone.utc)) == []
+    # 09:30 KST: the 09:00 slot fires once.
+    reports = scheduler.run_due(db_conn, datetime(2030, 1, 3, 0, 30, tzinfo=timezone.utc))
+    assert [r["type"] for r in reports] == ["EXPIRY_D2"]
+    assert scheduler.run_due(db_conn, datetime(2030, 1, 3, 1, 0, tzinfo=timezone.utc)) == []
+    # 18:05 KST: next slot.
+    assert len(scheduler.run_due(db_conn, datetime(2030, 1, 3, 9, 5, tzinfo=timezone.utc))) == 1
+
+
+def test_expiry_reminder_once_per_local_day_across_d2_and_d0(db_conn):
+    cur = db_conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status)
+        VALUES (7111, TIMESTAMPTZ '2030-01-04 01:00:00+00', 'LOCKED', 'LOCKED', 'LOCKED')
+        """
+    )
+    db_conn.commit()
+    scheduler = CampaignScheduler(schedule="07:00,18:00", utc_offset_hours=9, types=["EXPIRY_D2", "EXPIRY_D0"], shadow=False)
+
+    # 07:30 KST Jan 3 (still Jan 2 in UTC): 27h left -> D-2, keyed by the local date.
+    reports = scheduler.run_due(db_conn, datetime(2030, 1, 2, 22, 30, tzinfo=timezone.utc))
+    assert [(r["type"], r["enqueued"]) for r in reports] == [("EXPIRY_D2", 1), ("EXPIRY_D0", 0)]
+    # 18:05 KST Jan 3: 16h left -> D-0 audience, but the user already had a reminder today.
+    reports = scheduler.run_due(db_conn, datetime(2030, 1, 3, 9, 5, tzinfo=timezone.utc))
+    assert [(r["type"], r["audience"], r["new"], r["enqueued"]) for r in reports] == [
+        ("EXPIRY_D2", 0, 0, 0),
+        ("EXPIRY_D0", 1, 0, 0),
+    ]
+
+    cur.execute("SELECT dedup_key FROM notifications_queue")
+    assert [r[0] for r in cur.fetchall()] == ["EXPIRY_D2:7111:base:2030-01-03"]
+    db_conn.commit()
+
+
+def test_manual_notify_and_campaign_share_the_local_dedup_day(client, db_conn):
+    cur = db_conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status)
+        VALUES (7121, TIMESTAMPTZ '2030-01-04 01:00:00+00', 'LOCKED', 'LOCKED', 'LOCKED')
+        """
+    )
+    db_conn.commit()
+
+    # 07:00 KST Jan 3 is still Jan 2 in UTC; the key uses the local date.
+    body = {"type": "EXPIRY_D2", "user_ids": [7121], "scheduled_at": "2030-01-02T22:00:00Z"}
+    resp = client.post("/api/vault/notify", json=body, headers={"x-idempotency-key": "test-campaign-manual-7121"})
+    assert resp.json()["enqueued"] == 1
+
+    scheduler = CampaignScheduler(schedule="07:00", utc_offset_hours=9, types=["EXPIRY_D2"], shadow=False)
+    reports = scheduler.run_due(db_conn, datetime(2030, 1, 2, 22, 30, tzinfo=timezone.utc))
+    assert [(r["audience"], r["new"], r["enqueued"]) for r in reports] == [(1, 0, 0)]
+
+    cur.execute("SELECT dedup_key FROM notifications_queue WHERE user_id = 7121")
+    assert cur.fetchall() == [("EXPIRY_D2:7121:base:2030-01-03",)]
+    db_conn.commit()
+
+
+def test_scheduler_retries_slot_after_campaign_failure(db_conn, monkeypatch):
+    _seed(db_conn)
+    scheduler = CampaignScheduler(schedule="00:00", utc_offset_hours=9, types=["EXPIRY_D2", "EXPIRY_D0"], shadow=False)
+    real_run_campaign = campaign_service.run_campaign
+    now = datetime.now(timezone.utc)
+
+    def flaky(cur, notify_type, **kwargs):
+        if notify_type == "EXPIRY_D0":
+            raise RuntimeError("boom")
+        return real_run_campaign(cur, notify_type, **kwargs)
+
+    monkeypatch.setattr(campaign_service, "run_campaign", flaky)
+    reports = scheduler.run_due(db_conn, now)
+    assert [(r["type"], r["enqueued"]) for r in reports] == [("EXPIRY_D2", 1)]
+
+    # The slot is still due; EXPIRY_D2 re-runs harmlessly, EXPIRY_D0 finally goes out.
+    monkeypatch.setattr(campaign_service, "run_campaign", real_run_campaign)
+    reports = scheduler.run_due(db_conn, now)
+    assert [(r["type"], r["enqueued"]) for r in reports] == [("EXPIRY_D2", 0), ("EXPIRY_D0", 1)]
+    assert scheduler.run_due(db_conn, now) == []
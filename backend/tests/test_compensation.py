@@ -25,3 +25,117 @@ def test_compensation_enqueue(client, db_conn):
     row = cur.fetchone()
     assert row is not None
     assert row[0] in {"PENDING", "RETRYING", "DONE"}
+
+
+def test_compensation_worker_batches_concurrently_and_records_outcomes(db_conn, db_url):
+    import asyncio
+
+    import psycopg2
+
+    from app.services.compensation_service import CompensationClient, process_compensations_once
+
+    class _Client(CompensationClient):
+        def __init__(self):
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+        async def call(self, item):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            if item["payload"].get("fail"):
+                raise RuntimeError("reward service 503")
+
+    cur = db_conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO compensation_queue (user_id, vault_type, request_id, external_service, payload, status, retry_count, next_retry_at)
+        SELECT g, 'GOLD', 'comp-batch-' || g, 'reward-system',
+               CASE WHEN g > 1408 THEN '{"fail": true}'::jsonb ELSE '{}'::jsonb END,
+               'PENDING', CASE WHEN g = 1410 THEN 4 ELSE 0 END, NOW() - INTERVAL '1 second'
+          FROM generate_series(1401, 1410) AS g
+        """
+    )
+    db_conn.commit()
+
+    conn_a = psycopg2.connect(db_url)
+    conn_b = psycopg2.connect(db_url)
+    client = _Client()
+    try:
+
+        async def _run():
+            return await asyncio.gather(
+                process_compensations_once(conn_a, client, batch_size=5, concurrency=3),
+                process_compensations_once(conn_b, client, batch_size=5, concurrency=3),
+            )
+
+        a, b = asyncio.run(_run())
+    finally:
+        conn_a.close()
+        conn_b.close()
+
+    assert a["claimed"] + b["claimed"] == 10
+    assert client.max_in_flight <= 6
+    cur.execute("SELECT user_id, status, retry_count FROM compensation_queue ORDER BY user_id")
+    rows = cur.fetchall()
+    db_conn.commit()
+    assert rows[:8] == [(uid, "DONE", 0) for uid in range(1401, 1409)]
+    assert rows[8:] == [(1409, "RETRYING", 1), (1410, "FAILED", 5)]
+
+
+def test_compensation_enqueue_wakes_worker_on_commit(client, db_url):
+    import select
+
+    import psycopg2
+
+    from app.services.common import WORKER_WAKEUP_CHANNEL
+    from app.worker import idle_timeout
+
+    listener = psycopg2.connect(db_url)
+    listener.autocommit = True
+    try:
+        listener.cursor().execute(f'LISTEN "{WORKER_WAKEUP_CHANNEL}"')
+        payload = {
+            "user_id": 1302,
+            "vault_type": "GOLD",
+            "request_id": "test-comp-wake",
+            "external_service": "reward-system",
+            "payload": {},
+        }
+        assert client.post("/api/vault/compensation-enqueue", json=payload).status_code == 202
+        assert select.select([listener], [], [], 5) != ([], [], [])
+        listener.poll()
+        assert [n.payload for n in listener.notifies] == ["compensation"]
+        listener.notifies.clear()
+
+        # Duplicate request_id: nothing inserted, no wake-up.
+        assert client.post("/api/vault/compensation-enqueue", json=payload).status_code == 202
+        assert select.select([listener], [], [], 0.2) == ([], [], [])
+    finally:
+        listener.close()
+
+    assert idle_timeout(30, None, 600, floor=0.5) == 30
+    assert idle_timeout(30, 2.5, 600, floor=0.5) == 2.5
+    assert idle_timeout(30, -1, 600, floor=0.5) == 0.5
+
+
+def test_worker_stage_failure_is_logged_and_isolated(client, caplog):
+    import asyncio
+
+    from app import db
+    from app.worker import STAGE_FAILED, run_stage
+
+    async def _broken(conn):
+        conn.cursor().execute("SELECT * FROM no_such_table")
+
+    async def _healthy(conn):
+        return await asyncio.to_thread(lambda: conn.cursor().execute("SELECT 1") or "ok")
+
+    async def _pass():
+        return await run_stage("broken", _broken), await run_stage("healthy", _healthy)
+
+    in_use = db.pool_stats()["in_use"]
+    assert asyncio.run(_pass()) == (STAGE_FAILED, "ok")
+    assert db.pool_stats()["in_use"] == in_use
+    assert any("worker stage broken failed" in r.getMessage() for r in caplog.records)
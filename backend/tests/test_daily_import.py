@@ -5,6 +5,22 @@ def _idem_headers():
     return {"x-idempotency-key": f"test-import-{uuid4()}"}
 
 
+def _next_day(db_conn, external_user_id):
+    """Pretend the last attendance day was yesterday, so the next import counts a new day."""
+    cur = db_conn.cursor()
+    cur.execute(
+        """
+        UPDATE vault_status vs
+           SET last_attended_at = vs.last_attended_at - INTERVAL '1 day'
+          FROM user_identity ui
+         WHERE ui.user_id = vs.user_id
+           AND ui.external_user_id = %s
+        """,
+        (external_user_id,),
+    )
+    db_conn.commit()
+
+
 def test_daily_import_unlocks_gold_and_diamond(client):
     body = {
         "rows": [
@@ -33,7 +49,7 @@ def test_daily_import_unlocks_gold_and_diamond(client):
     assert int(s.get("diamond_deposit_current")) == 2500000
 
 
-def test_daily_import_unlocks_platinum_after_three_days_and_review(client):
+def test_daily_import_unlocks_platinum_after_three_days_and_review(client, db_conn):
     external_user_id = "ext-import-platinum-1"
 
     # Day 1: +100,000
@@ -59,6 +75,7 @@ def test_daily_import_unlocks_platinum_after_three_days_and_review(client):
     s1 = client.get("/api/vault/status", params={"external_user_id": external_user_id}).json()
     assert s1.get("platinum_status") in {"LOCKED", "ACTIVE"}
     assert int(s1.get("platinum_attendance_days")) == 1
+    _next_day(db_conn, external_user_id)
 
     # Day 2: +100,000 (cumulative 200,000)
     resp = client.post(
@@ -82,6 +99,7 @@ def test_daily_import_unlocks_platinum_after_three_days_and_review(client):
     s2 = client.get("/api/vault/status", params={"external_user_id": external_user_id}).json()
     assert int(s2.get("platinum_attendance_days")) == 2
     assert s2.get("platinum_status") in {"LOCKED", "ACTIVE"}
+    _next_day(db_conn, external_user_id)
 
     # Day 3: +100,000 (cumulative 300,000 > 200,000) + review_ok=true
     # platinum_deposit_count needs to be >= 3 - set via admin
@@ -108,3 +126,151 @@ def test_daily_import_unlocks_platinum_after_three_days_and_review(client):
     # Platinum UNLOCKED: deposit_total >= 200k, attendance >= 3, review_ok=True
     # Note: deposit_count check may be bypassed in daily-import flow
     assert s3.get("platinum_status") == "UNLOCKED"
+
+
+def test_daily_import_accepts_more_than_10k_rows(client, db_conn):
+    rows = [
+        {"external_user_id": f"ext-bulk-{i}", "deposit_total": i, "telegram_ok": i % 2 == 0}
+        for i in range(12000)
+    ]
+    # Nickname with a comma/quote and a missing joined_at must survive the COPY round trip.
+    rows[0].update({"nickname": 'kim, "jr"', "joined_at": None})
+    rows[1]["nickname"] = "김철수"
+
+    resp = client.post("/api/vault/user-daily-import", json={"rows": rows}, headers=_idem_headers())
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["processed"] == 12000
+    assert data["identity_created"] == 12000
+    assert data["vault_rows_updated"] == 12000
+
+    with db_conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT uas.nickname, uas.joined_date, vs.gold_status
+              FROM user_identity ui
+              JOIN user_admin_snapshot uas ON uas.user_id = ui.user_id
+              JOIN vault_status vs ON vs.user_id = ui.user_id
+             WHERE ui.external_user_id = 'ext-bulk-0'
+            """
+        )
+        assert cur.fetchone() == ('kim, "jr"', None, "UNLOCKED")
+        cur.execute(
+            """
+            SELECT uas.nickname
+              FROM user_identity ui
+              JOIN user_admin_snapshot uas ON uas.user_id = ui.user_id
+             WHERE ui.external_user_id = 'ext-bulk-1'
+            """
+        )
+        assert cur.fetchone() == ("김철수",)
+        cur.execute(
+            """
+            SELECT COUNT(*)
+              FROM vault_status vs
+              JOIN user_identity ui ON ui.user_id = vs.user_id
+             WHERE ui.external_user_id LIKE 'ext-bulk-%' AND vs.gold_status = 'UNLOCKED'
+            """
+        )
+        assert cur.fetchone()[0] == 6000
+    db_conn.rollback()
+
+
+def test_copy_source_encodes_rows_on_demand():
+    from app.services.import_service import _CsvCopySource
+
+    rows = [[1, "김, \"a\"", None], [2, "b", True]]
+    source = _CsvCopySource(iter(rows))
+    parts = []
+    while True:
+        part = source.read(5)
+        if not part:
+            break
+        assert len(part) <= 5
+        parts.append(part)
+    assert b"".join(parts).decode("utf-8").splitlines() == ['1,"김, ""a""",', "2,b,True"]
+
+
+def test_daily_import_skips_unchanged_rows(client, db_conn):
+    rows = [
+        {"external_user_id": f"ext-diff-{i}", "deposit_total": 100 + i, "telegram_ok": True, "last_deposit_at": "2025-01-01T00:00:00Z"}
+        for i in range(3)
+    ]
+    first = client.post("/api/vault/user-daily-import", json={"rows": rows}, headers=_idem_headers()).json()
+    assert first["unchanged"] == 0
+    assert first["vault_rows_updated"] == 3
+
+    def _updated_at():
+        with db_conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT ui.external_user_id, uas.updated_at, vs.diamond_deposit_total
+                  FROM user_identity ui
+                  JOIN user_admin_snapshot uas ON uas.user_id = ui.user_id
+                  JOIN vault_status vs ON vs.user_id = ui.user_id
+                 WHERE ui.external_user_id LIKE 'ext-diff-%'
+                 ORDER BY 1
+                """
+            )
+            out = cur.fetchall()
+        db_conn.rollback()
+        return out
+
+    before = _updated_at()
+
+    rows[2]["deposit_total"] = 999
+    second = client.post("/api/vault/user-daily-import", json={"rows": rows}, headers=_idem_headers()).json()
+    assert second["processed"] == 3
+    assert second["unchanged"] == 2
+    assert second["vault_rows_updated"] == 1
+
+    after = _updated_at()
+    assert after[:2] == before[:2]
+    assert after[2][1] > before[2][1]
+    assert after[2][2] == 999
+
+
+
+
+def test_daily_import_resent_same_day_does_not_bump_platinum_progress(client, db_conn):
+    row = {"external_user_id": "ext-import-same-1", "deposit_total": 100000, "last_deposit_at": "2025-12-20"}
+    cur = db_conn.cursor()
+
+    def _progress():
+        cur.execute(
+            """
+            SELECT vs.platinum_attendance_days, vs.updated_at
+              FROM vault_status vs
+              JOIN user_identity ui ON ui.user_id = vs.user_id
+             WHERE ui.external_user_id = %s
+            """,
+            (row["external_user_id"],),
+        )
+        result = cur.fetchone()
+        db_conn.commit()
+        return result
+
+    assert client.post("/api/vault/user-daily-import", json={"rows": [row]}, headers=_idem_headers()).status_code == 200
+    first = _progress()
+    assert first[0] == 1
+
+    # Same file again on the same day: no second attendance day and no vault_status write.
+    assert client.post("/api/vault/user-daily-import", json={"rows": [row]}, headers=_idem_headers()).status_code == 200
+    assert _progress() == first
+
+
+def test_daily_import_identical_rows_on_three_days_unlock_platinum(client, db_conn):
+    row = {
+        "external_user_id": "ext-import-same-2",
+        "deposit_total": 300000,
+        "last_deposit_at": "2025-12-20",
+        "review_ok": True,
+    }
+    for day in (1, 2, 3):
+        if day > 1:
+            _next_day(db_conn, row["external_user_id"])
+        assert client.post("/api/vault/user-daily-import", json={"rows": [row]}, headers=_idem_headers()).status_code == 200
+        status = client.get("/api/vault/status", params={"external_user_id": row["external_user_id"]}).json()
+        assert int(status["platinum_attendance_days"]) == day
+
+    assert status["platinum_status"] == "UNLOCKED"
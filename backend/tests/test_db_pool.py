@@ -0,0 +1,157 @@
+import threading
+import time
+
+import psycopg2
+import pytest
+from psycopg2 import OperationalError
+
+from app import db
+
+
+@pytest.fixture
+def make_pool(db_url):
+    try:
+        psycopg2.connect(db_url, connect_timeout=3).close()
+    except OperationalError as exc:  # pragma: no cover - skip if DB unavailable
+        pytest.skip(f"database not reachable: {exc}")
+
+    pools = []
+
+    def _make(**overrides):
+        opts = {"min_size": 0, "max_size": 2, "acquire_timeout": 0.2, "max_lifetime": 60, "max_idle": 60}
+        opts.update(overrides)
+        p = db.ConnectionPool(db_url, **opts)
+        pools.append(p)
+        return p
+
+    yield _make
+    for p in pools:
+        p.close()
+
+
+def test_exhausted_pool_times_out_instead_of_failing_fast(make_pool):
+    p = make_pool(max_size=1, acquire_timeout=0.2)
+    held = p.acquire()
+
+    started = time.monotonic()
+    with pytest.raises(db.PoolTimeout):
+        p.acquire()
+    assert time.monotonic() - started >= 0.15
+
+    p.release(held)
+    stats = p.stats()
+    assert stats["acquire_timeouts"] == 1
+    assert stats["in_use"] == 0
+    assert stats["idle"] == 1
+
+
+def test_waiter_gets_released_connection(make_pool):
+    p = make_pool(max_size=1, acquire_timeout=2)
+    held = p.acquire()
+    got = []
+
+    t = threading.Thread(target=lambda: got.append(p.acquire()))
+    t.start()
+    deadline = time.monotonic() + 2
+    while p.stats()["waiters"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert p.stats()["waiters"] == 1
+
+    p.release(held)
+    t.join(2)
+    assert got == [held]
+    assert p.stats()["waiters"] == 0
+    p.release(got[0])
+
+
+def test_counters_track_checkouts(make_pool):
+    p = make_pool()
+    for _ in range(3):
+        conn = p.acquire()
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        p.release(conn)
+
+    stats = p.stats()
+    assert stats["acquire_count"] == 3
+    assert stats["checkout_count"] == 3
+    assert stats["connections_opened"] == 1
+    assert sum(stats["acquire_latency_ms_buckets"].values()) == 3
+    assert stats["checkout_max_ms"] >= stats["checkout_mean_ms"] > 0
+
+
+def test_expired_connection_is_replaced(make_pool):
+    p = make_pool(max_lifetime=0)
+    first = p.acquire()
+    p.release(first)
+    assert first.closed
+
+    second = p.acquire()
+    assert second is not first
+    p.release(second)
+    assert p.stats()["connections_closed"] == 2
+
+
+def test_idle_connections_reaped_down_to_min_size(make_pool):
+    p = make_pool(min_size=1, max_size=3, max_idle=0)
+    conns = [p.acquire() for _ in range(3)]
+    for conn in conns:
+        p.release(conn)
+
+    stats = p.stats()
+    assert stats["size"] == 1
+    assert stats["idle"] == 1
+
+
+def test_db_pool_health_requires_admin(client):
+    assert client.get("/health/db-pool", headers={"x-admin-password": "wrong"}).status_code == 401
+    resp = client.get("/health/db-pool", headers={"x-admin-password": "admin1234"})
+    assert resp.status_code == 200
+    assert {"in_use", "idle", "waiters", "acquire_latency_ms_buckets"} <= set(resp.json())
+
+
+def test_async_waiters_are_served_in_arrival_order(make_pool):
+    import asyncio
+
+    p = make_pool(max_size=1, acquire_timeout=2)
+
+    async def scenario():
+        held = await p.acquire_async()
+        order = []
+
+        async def waiter(n):
+            conn = await p.acquire_async()
+            order.append(n)
+            await asyncio.sleep(0.01)
+            p.release(conn)
+
+        tasks = []
+        for n in range(3):
+            tasks.append(asyncio.create_task(waiter(n)))
+            await asyncio.sleep(0.01)
+        assert p.stats()["waiters"] == 3
+        p.release(held)
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == [0, 1, 2]
+    stats = p.stats()
+    assert (stats["waiters"], stats["in_use"], stats["idle"]) == (0, 0, 1)
+
+
+def test_async_waiter_timeout_does_not_leak_the_slot(make_pool):
+    import asyncio
+
+    p = make_pool(max_size=1, acquire_timeout=0.1)
+
+    async def scenario():
+        held = await p.acquire_async()
+        with pytest.raises(db.PoolTimeout):
+            await p.acquire_async()
+        p.release(held)
+        again = await p.acquire_async()
+        p.release(again)
+
+    asyncio.run(scenario())
+    stats = p.stats()
+    assert (stats["acquire_timeouts"], stats["waiters"], stats["in_use"], stats["size"]) == (1, 0, 0, 1)
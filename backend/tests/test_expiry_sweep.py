@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+import pytest
+
+from app.services.expiry_service import sweep_expired_vaults
+
+
+@pytest.fixture
+def worker_conn(db_url):
+    conn = psycopg2.connect(db_url)
+    yield conn
+    conn.close()
+
+
+def _seed(db_conn):
+    cur = db_conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status)
+        SELECT g, NOW() - g * INTERVAL '1 minute', 'CLAIMED', 'UNLOCKED', 'LOCKED'
+          FROM generate_series(7201, 7205) AS g
+        """
+    )
+    cur.execute(
+        """
+        INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status)
+        VALUES (7206, NOW() + INTERVAL '1 hour', 'LOCKED', 'LOCKED', 'LOCKED'),
+               (7207, NOW() - INTERVAL '1 hour', 'CLAIMED', 'CLAIMED', 'CLAIMED')
+        """
+    )
+    db_conn.commit()
+    return cur
+
+
+def test_expiry_sweep_shadow_then_apply_in_batches(client, db_conn, worker_conn):
+    cur = _seed(db_conn)
+    now = datetime.now(timezone.utc)
+
+    shadow = sweep_expired_vaults(worker_conn, now=now, shadow=True)
+    assert (shadow["users"], shadow["gold"], shadow["platinum"], shadow["diamond"]) == (5, 0, 5, 5)
+    cur.execute("SELECT COUNT(*) FROM vault_status WHERE platinum_status='EXPIRED'")
+    assert cur.fetchone()[0] == 0
+    db_conn.commit()
+
+    result = sweep_expired_vaults(worker_conn, now=now, batch_size=2)
+    assert (result["users"], result["platinum"], result["diamond"], result["batches"]) == (5, 5, 5, 3)
+
+    cur.execute("SELECT user_id, gold_status, platinum_status, diamond_status FROM vault_status ORDER BY user_id")
+    rows = cur.fetchall()
+    db_conn.commit()
+    assert rows[:5] == [(uid, "CLAIMED", "EXPIRED", "EXPIRED") for uid in range(7201, 7206)]
+    assert rows[5:] == [(7206, "LOCKED", "LOCKED", "LOCKED"), (7207, "CLAIMED", "CLAIMED", "CLAIMED")]
+
+    assert sweep_expired_vaults(worker_conn, now=now)["users"] == 0
+
+    jobs = client.get("/api/vault/admin/jobs", params={"type": "EXPIRY_SWEEP"}).json()
+    assert jobs["total"] == 2
+    assert client.get(f"/api/vault/admin/jobs/{result['job_id']}").json()["processed"] == 5
+
+    status = client.get("/api/vault/status", params={"user_id": 7201}).json()
+    assert status["loss_breakdown"]["PLATINUM"] == 0
+
+
+def test_expiry_sweep_skips_rows_locked_by_claims(db_conn, worker_conn, db_url):
+    _seed(db_conn)
+    blocker = psycopg2.connect(db_url)
+    try:
+        bcur = blocker.cursor()
+        bcur.execute("SELECT 1 FROM vault_status WHERE user_id=7203 FOR UPDATE")
+        result = sweep_expired_vaults(worker_conn, now=datetime.now(timezone.utc), batch_size=2)
+        assert result["users"] == 4
+    finally:
+        blocker.rollback()
+        blocker.close()
+    assert sweep_expired_vaults(worker_conn, now=datetime.now(timezone.utc))["users"] == 1
+
+
+def test_swept_vault_stays_expired_after_import_and_extend_reopens_it(client, db_conn, worker_conn):
+    ext = "ext-sweep-terminal-1"
+    row = {"external_user_id": ext, "nickname": "nick", "deposit_total": 0, "last_deposit_at": "2025-12-20", "telegram_ok": False}
+    headers = {"x-idempotency-key": "test-sweep-terminal-import-1"}
+    assert client.post("/api/vault/user-daily-import", json={"rows": [row]}, headers=headers).status_code == 200
+
+    cur = db_conn.cursor()
+    cur.execute("SELECT user_id FROM user_identity WHERE external_user_id=%s", (ext,))
+    user_id = cur.fetchone()[0]
+    db_conn.commit()
+
+    assert sweep_expired_vaults(worker_conn, now=datetime.now(timezone.utc))["users"] == 1
+    cur.execute("SELECT expires_at FROM vault_status WHERE user_id=%s", (user_id,))
+    swept_expires_at = cur.fetchone()[0]
+    db_conn.commit()
+
+    # Imports never reopen a swept vault.
+    row.update(telegram_ok=True, last_deposit_at=datetime.now(timezone.utc).date().isoformat())
+    headers = {"x-idempotency-key": "test-sweep-terminal-import-2"}
+    assert client.post("/api/vault/user-daily-import", json={"rows": [row]}, headers=headers).status_code == 200
+
+    cur.execute("SELECT expires_at, gold_status, platinum_status, diamond_status FROM vault_status WHERE user_id=%s", (user_id,))
+    assert cur.fetchone() == (swept_expires_at, "EXPIRED", "EXPIRED", "EXPIRED")
+    db_conn.commit()
+
+    # extend-expiry is the admin rescue path: it reopens the tiers and extends from now.
+    before = datetime.now(timezone.utc)
+    resp = client.post(
+        "/api/vault/extend-expiry",
+        json={"request_id": "req-sweep-terminal-1", "scope": "USER_IDS", "user_ids": [user_id], "extend_hours": 24, "reason": "OPS"},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["updated"] == 1
+
+    cur.execute("SELECT expires_at, gold_status, platinum_status, diamond_status FROM vault_status WHERE user_id=%s", (user_id,))
+    expires_at, *statuses = cur.fetchone()
+    cur.execute("SELECT prev_expires_at FROM vault_expiry_extension_log WHERE request_id=%s", (f"req-sweep-terminal-1:{user_id}",))
+    assert cur.fetchone()[0] == swept_expires_at
+    db_conn.commit()
+    assert statuses == ["LOCKED", "LOCKED", "LOCKED"]
+    assert expires_at >= before + timedelta(hours=24)
+
+    assert sweep_expired_vaults(worker_conn, now=datetime.now(timezone.utc))["users"] == 0
@@ -0,0 +1,270 @@
+import hashlib
+import json
+from uuid import uuid4
+
+import psycopg2
+import pytest
+
+from app import config
+from app.worker import process_import_chunk_once
+
+
+def _idem_headers(prefix: str = "import-job"):
+    return {"x-idempotency-key": f"{prefix}-{uuid4()}"}
+
+
+@pytest.fixture
+def worker_conn(db_url):
+    conn = psycopg2.connect(db_url)
+    yield conn
+    conn.close()
+
+
+def _drain(conn) -> int:
+    handled = 0
+    while process_import_chunk_once(conn):
+        handled += 1
+    return handled
+
+
+def test_background_import_applied_by_worker_chunk_by_chunk(client, worker_conn, monkeypatch):
+    monkeypatch.setattr(config, "IMPORT_CHUNK_SIZE", 2)
+    rows = [{"external_user_id": f"ext-bg-{i}", "deposit_total": 1000 + i, "telegram_ok": True} for i in range(5)]
+
+    resp = client.post(
+        "/api/vault/admin/imports",
+        json={"mode": "APPLY", "rows": rows, "background": True},
+        headers=_idem_headers(),
+    )
+    assert resp.status_code == 202
+    job_id = resp.json()["job_id"]
+    assert resp.json()["processed"] == 0
+
+    job = client.get(f"/api/vault/admin/jobs/{job_id}").json()
+    assert job["status"] == "PENDING"
+    assert job["target_count"] == 5
+
+    assert process_import_chunk_once(worker_conn) == 1
+    job = client.get(f"/api/vault/admin/jobs/{job_id}").json()
+    assert job["status"] == "RUNNING"
+    assert job["processed"] == 2
+
+    assert _drain(worker_conn) == 2
+    job = client.get(f"/api/vault/admin/jobs/{job_id}").json()
+    assert job["status"] == "DONE"
+    assert job["processed"] == 5
+    assert job["failed"] == 0
+
+    status = client.get("/api/vault/status", params={"external_user_id": "ext-bg-4"}).json()
+    assert status["gold_status"] == "UNLOCKED"
+
+
+def test_background_import_failed_chunk_can_be_retried(client, db_conn, worker_conn, monkeypatch):
+    monkeypatch.setattr(config, "IMPORT_CHUNK_SIZE", 2)
+    rows = [
+        {"external_user_id": "ext-bg-ok-1", "deposit_total": 1},
+        {"external_user_id": "ext-bg-ok-2", "deposit_total": 2},
+        {"external_user_id": "ext-bg-bad", "joined_at": "not-a-date"},
+    ]
+    resp = client.post(
+        "/api/vault/admin/imports",
+        json={"mode": "APPLY", "rows": rows, "background": True},
+        headers=_idem_headers(),
+    )
+    job_id = resp.json()["job_id"]
+
+    assert _drain(worker_conn) == 2
+    job = client.get(f"/api/vault/admin/jobs/{job_id}").json()
+    assert job["status"] == "FAILED"
+    assert (job["processed"], job["failed"]) == (2, 1)
+
+    # Fix the bad row in place, then retry: only the failed chunk is re-applied.
+    cur = db_conn.cursor()
+    cur.execute(
+        """
+        UPDATE admin_import_chunks
+           SET rows = jsonb_set(rows, '{0,joined_at}', 'null')
+         WHERE job_id=%s AND status='FAILED'
+        """,
+        (job_id,),
+    )
+    db_conn.commit()
+
+    assert client.post(f"/api/vault/admin/jobs/{job_id}/retry").status_code == 200
+    assert _drain(worker_conn) == 1
+    job = client.get(f"/api/vault/admin/jobs/{job_id}").json()
+    assert job["status"] == "DONE"
+    assert (job["processed"], job["failed"]) == (3, 0)
+
+
+def test_background_csv_import(client, worker_conn, monkeypatch):
+    monkeypatch.setattr(config, "IMPORT_CHUNK_SIZE", 2)
+    payload = "아이디,입금액\nbg-csv-1,10\nbg-csv-2,20\nbg-csv-3,30\n".encode()
+
+    resp = client.post(
+        "/api/vault/admin/imports/csv",
+        params={"background": "true"},
+        content=payload,
+        headers={**_idem_headers(), "content-type": "text/csv"},
+    )
+    assert resp.status_code == 202
+    job_id = resp.json()["job_id"]
+    assert resp.json()["job_ids"] == [job_id]
+
+    assert _drain(worker_conn) == 2
+    job = client.get(f"/api/vault/admin/jobs/{job_id}").json()
+    assert job["status"] == "DONE"
+    assert job["target_count"] == 3
+    assert job["processed"] == 3
+
+
+def test_streamed_job_stays_running_until_sealed(client, worker_conn):
+    from app.main import _csv_import_enqueue_chunk, _seal_import_job
+    from app.services.import_service import load_chunk_rows
+
+    job_id = f"job-stream-{uuid4()}"
+    rows = load_chunk_rows([{"row_index": 0, "external_user_id": "stream-1", "deposit_total": 10}])
+    _csv_import_enqueue_chunk(worker_conn, rows, job_id=job_id, key="stream-key", scope="test", endpoint="/api/vault/admin/imports/csv", chunk_index=0, mode="APPLY")
+
+    # The upload is still streaming: every queued chunk is done, but more may follow.
+    assert _drain(worker_conn) == 1
+    assert client.get(f"/api/vault/admin/jobs/{job_id}").json()["status"] == "RUNNING"
+
+    with worker_conn.cursor() as cur:
+        _seal_import_job(cur, job_id, chunk_total=1, total=1)
+    worker_conn.commit()
+    job = client.get(f"/api/vault/admin/jobs/{job_id}").json()
+    assert (job["status"], job["target_count"], job["processed"]) == ("DONE", 1, 1)
+
+
+def test_parallel_import_applies_chunks_on_separate_connections(client, monkeypatch):
+    monkeypatch.setattr(config, "IMPORT_CHUNK_SIZE", 2)
+    rows = [{"external_user_id": f"ext-par-{i}", "deposit_total": 10 + i, "telegram_ok": True} for i in range(5)]
+    rows.append({"external_user_id": "ext-par-bad", "joined_at": "not-a-date"})
+
+    resp = client.post(
+        "/api/vault/admin/imports",
+        json={"mode": "APPLY", "rows": rows, "parallelism": 3},
+        headers=_idem_headers("import-par"),
+    )
+    assert resp.status_code == 202
+    data = resp.json()
+    assert data["processed"] == 4
+    assert len(data["job_ids"]) == 3
+    # Only the chunk holding the bad row is rolled back.
+    assert {(e["external_user_id"], e["code"]) for e in data["errors"]} == {
+        ("ext-par-4", "CHUNK_FAILED"),
+        ("ext-par-bad", "CHUNK_FAILED"),
+    }
+
+    jobs = [client.get(f"/api/vault/admin/jobs/{job_id}").json() for job_id in data["job_ids"]]
+    assert [j["status"] for j in jobs] == ["DONE", "DONE", "FAILED"]
+
+    assert client.get("/api/vault/status", params={"external_user_id": "ext-par-3"}).json()["gold_status"] == "UNLOCKED"
+
+
+def test_parallel_import_reports_pool_timeouts_and_caps_concurrency(client, monkeypatch):
+    import threading
+
+    from app import db
+    from app.services import import_service
+
+    monkeypatch.setattr(config, "IMPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(import_service, "_import_slots", threading.BoundedSemaphore(1))
+    running, peak = [0], [0]
+    real_apply, real_get_conn = import_service.apply_import_chunk, db.get_conn
+    acquired = []
+
+    def _apply(cur, chunk):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        try:
+            return real_apply(cur, chunk)
+        finally:
+            running[0] -= 1
+
+    def _get_conn():
+        if threading.current_thread().name.startswith("import-chunk"):
+            acquired.append(1)
+            if len(acquired) == 2:
+                raise db.PoolTimeout("no connection available")
+        return real_get_conn()
+
+    monkeypatch.setattr(import_service, "apply_import_chunk", _apply)
+    monkeypatch.setattr(db, "get_conn", _get_conn)
+    rows = [{"external_user_id": f"ext-cap-{i}", "deposit_total": i} for i in range(6)]
+    resp = client.post(
+        "/api/vault/admin/imports",
+        json={"mode": "APPLY", "rows": rows, "parallelism": 3},
+        headers=_idem_headers("import-cap"),
+    )
+    assert resp.status_code == 202
+    data = resp.json()
+    assert peak[0] == 1
+    assert data["processed"] == 4
+    assert len(data["job_ids"]) == 3
+    assert {e["code"] for e in data["errors"]} == {"CHUNK_FAILED"} and len(data["errors"]) == 2
+    jobs = [client.get(f"/api/vault/admin/jobs/{job_id}").json() for job_id in data["job_ids"]]
+    assert sorted(j["status"] for j in jobs) == ["DONE", "DONE", "FAILED"]
+
+
+def _put_session_chunk(client, session_id: str, index: int, rows, key: str | None = None):
+    raw = json.dumps({"rows": rows}).encode()
+    return client.put(
+        f"/api/vault/admin/imports/sessions/{session_id}/chunks/{index}",
+        content=raw,
+        headers={
+            "x-idempotency-key": key or f"import-session-chunk-{uuid4()}",
+            "x-content-sha256": hashlib.sha256(raw).hexdigest(),
+            "content-type": "application/json",
+        },
+    )
+
+
+def test_import_session_resumes_and_tolerates_chunk_retries(client):
+    resp = client.post("/api/vault/admin/imports/sessions", json={"chunk_total": 2}, headers=_idem_headers("import-session"))
+    assert resp.status_code == 200
+    session_id = resp.json()["session_id"]
+    assert resp.json()["missing_chunks"] == [0, 1]
+
+    chunk0 = [{"external_user_id": f"ext-sess-{i}", "deposit_total": i, "telegram_ok": True} for i in range(3)]
+    chunk1 = [{"external_user_id": "ext-sess-9", "deposit_total": 9}]
+
+    key = f"import-session-chunk-{uuid4()}"
+    first = _put_session_chunk(client, session_id, 0, chunk0, key=key)
+    assert first.status_code == 200
+    assert first.json()["processed"] == 3
+    assert first.json()["replayed"] is False
+    # Same key: idempotency replay. New key, same body: answered from the stored chunk result.
+    assert _put_session_chunk(client, session_id, 0, chunk0, key=key).headers["Idempotency-Status"] == "replayed"
+    assert _put_session_chunk(client, session_id, 0, chunk0).json()["replayed"] is True
+    assert _put_session_chunk(client, session_id, 0, chunk1).json()["detail"] == "CHUNK_CHECKSUM_CONFLICT"
+    assert _put_session_chunk(client, session_id, 2, chunk1).json()["detail"] == "CHUNK_INDEX_OUT_OF_RANGE"
+
+    raw = json.dumps({"rows": chunk1}).encode()
+    bad = client.put(
+        f"/api/vault/admin/imports/sessions/{session_id}/chunks/1",
+        content=raw,
+        headers={**_idem_headers(), "x-content-sha256": "0" * 64, "content-type": "application/json"},
+    )
+    assert bad.status_code == 400
+    assert bad.json()["detail"] == "CHECKSUM_MISMATCH"
+
+    commit = client.post(f"/api/vault/admin/imports/sessions/{session_id}/commit", headers=_idem_headers())
+    assert commit.status_code == 409
+    assert commit.json()["detail"] == "IMPORT_SESSION_INCOMPLETE"
+
+    # Resume: the session reports what is still missing.
+    state = client.get(f"/api/vault/admin/imports/sessions/{session_id}").json()
+    assert (state["chunks_applied"], state["missing_chunks"]) == ([0], [1])
+    assert _put_session_chunk(client, session_id, 1, chunk1).status_code == 200
+
+    commit = client.post(f"/api/vault/admin/imports/sessions/{session_id}/commit", headers=_idem_headers())
+    assert commit.status_code == 200
+    assert commit.json()["status"] == "DONE"
+    assert commit.json()["processed"] == 4
+
+    job = client.get(f"/api/vault/admin/jobs/{session_id}").json()
+    assert (job["status"], job["processed"], job["target_count"]) == ("DONE", 4, 4)
+    closed = _put_session_chunk(client, session_id, 1, chunk1)
+    assert (closed.status_code, closed.json()["detail"]) == (409, "IMPORT_SESSION_CLOSED")
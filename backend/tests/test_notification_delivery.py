@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import psycopg2
+import pytest
+
+from app.services.notification_delivery import FileChannel, NotificationChannel, deliver_notifications_once
+
+
+class _FailingChannel(NotificationChannel):
+    name = "failing"
+
+    async def send(self, notification):
+        raise RuntimeError("provider down")
+
+
+@pytest.fixture
+def worker_conn(db_url):
+    conn = psycopg2.connect(db_url)
+    yield conn
+    conn.close()
+
+
+def _enqueue(cur, n: int, *, retry_count: int = 0):
+    cur.execute(
+        """
+        INSERT INTO notifications_queue (user_id, type, dedup_key, payload, scheduled_at, status, retry_count)
+        SELECT g, 'EXPIRY_D2', 'EXPIRY_D2:' || g || ':base:test', '{"title": "t"}'::jsonb, NOW() - INTERVAL '1 minute', 'PENDING', %s
+          FROM generate_series(1, %s) AS g
+        """,
+        (retry_count, n),
+    )
+
+
+def test_delivery_sends_due_batch_through_channel(db_conn, worker_conn, tmp_path):
+    cur = db_conn.cursor()
+    _enqueue(cur, 3)
+    db_conn.commit()
+
+    out = tmp_path / "sent.jsonl"
+    counts = asyncio.run(deliver_notifications_once(worker_conn, FileChannel(str(out)), batch_size=10))
+    assert counts == {"claimed": 3, "sent": 3, "retrying": 0, "dlq": 0}
+
+    lines = [json.loads(line) for line in out.read_text().splitlines()]
+    assert sorted(line["user_id"] for line in lines) == [1, 2, 3]
+    cur.execute("SELECT COUNT(*) FROM notifications_queue WHERE status='SENT' AND sent_at IS NOT NULL")
+    assert cur.fetchone()[0] == 3
+    assert asyncio.run(deliver_notifications_once(worker_conn, FileChannel(str(out))))["claimed"] == 0
+
+
+def test_delivery_failures_back_off_then_move_to_dlq(db_conn, worker_conn):
+    cur = db_conn.cursor()
+    _enqueue(cur, 1)
+    cur.execute(
+        """
+        INSERT INTO notifications_queue (user_id, type, dedup_key, payload, scheduled_at, status, retry_count)
+        VALUES (9, 'EXPIRY_D0', 'EXPIRY_D0:9:base:test', '{}'::jsonb, NOW() - INTERVAL '1 minute', 'RETRYING', 4)
+        """
+    )
+    db_conn.commit()
+
+    counts = asyncio.run(deliver_notifications_once(worker_conn, _FailingChannel()))
+    assert counts == {"claimed": 2, "sent": 0, "retrying": 1, "dlq": 1}
+
+    cur.execute("SELECT user_id, status, retry_count, scheduled_at > NOW(), last_error FROM notifications_queue ORDER BY user_id")
+    first, dead = cur.fetchall()
+    assert first[:4] == (1, "RETRYING", 1, True)
+    assert "provider down" in first[4]
+    assert dead[1:3] == ("DLQ", 5)
+
+    cur.execute("SELECT user_id, type, retry_count, error FROM notifications_dlq")
+    assert cur.fetchall() == [(9, "EXPIRY_D0", 5, "RuntimeError: provider down")]
+    # The retried row is not due yet.
+    assert asyncio.run(deliver_notifications_once(worker_conn, _FailingChannel()))["claimed"] == 0
+
+
+def test_concurrent_workers_claim_disjoint_batches(db_conn, db_url, tmp_path):
+    cur = db_conn.cursor()
+    _enqueue(cur, 6)
+    db_conn.commit()
+
+    conn_a = psycopg2.connect(db_url)
+    conn_b = psycopg2.connect(db_url)
+    try:
+        out = tmp_path / "sent.jsonl"
+
+        async def _run():
+            return await asyncio.gather(
+                deliver_notifications_once(conn_a, FileChannel(str(out)), batch_size=3),
+                deliver_notifications_once(conn_b, FileChannel(str(out)), batch_size=3),
+            )
+
+        a, b = asyncio.run(_run())
+    finally:
+        conn_a.close()
+        conn_b.close()
+
+    assert a["sent"] + b["sent"] == 6
+    sent_ids = [json.loads(line)["id"] for line in out.read_text().splitlines()]
+    assert len(sent_ids) == len(set(sent_ids)) == 6
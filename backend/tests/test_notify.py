@@ -50,3 +50,90 @@ def test_notify_requires_users(client):
     resp = client.post("/api/vault/notify", json={"type": "EXPIRY_D2", "external_user_ids": []})
     assert resp.status_code == 400
     assert resp.json().get("detail") == "EMPTY_USER_IDS"
+
+
+def test_notify_bulk_enqueue_skips_existing_dedup_keys(client, db_conn):
+    cur = db_conn.cursor()
+    cur.execute("DELETE FROM notifications_queue")
+    db_conn.commit()
+
+    user_ids = list(range(8001, 8501))
+    body = {"type": "EXPIRY_D0", "user_ids": user_ids[:100], "scheduled_at": "2030-01-02T09:00:00Z"}
+    assert client.post("/api/vault/notify", json=body, headers=_idem_headers()).json()["enqueued"] == 100
+
+    body["user_ids"] = user_ids
+    assert client.post("/api/vault/notify", json=body, headers=_idem_headers()).json()["enqueued"] == 400
+
+    cur.execute("SELECT dedup_key FROM notifications_queue WHERE user_id = 8001")
+    assert cur.fetchall() == [("EXPIRY_D0:8001:base:2030-01-02",)]
+    cur.execute("SELECT COUNT(*) FROM notifications_queue WHERE type='EXPIRY_D0'")
+    assert cur.fetchone()[0] == 500
+    db_conn.rollback()
+
+    # Keyset pages over the same rows: no repeats, nothing skipped.
+    ids, params = [], {"type": "EXPIRY_D0", "page_size": 200, "cursor": ""}
+    while params["cursor"] is not None:
+        data = client.get("/api/vault/admin/notifications", params=params).json()
+        ids.extend(n["id"] for n in data["items"])
+        params["cursor"] = data["next_cursor"]
+    assert len(ids) == len(set(ids)) == 500
+    assert ids == sorted(ids, reverse=True)
+
+
+def test_notify_template_cache_hits_and_listen_invalidation(client, db_conn):
+    import time
+
+    from app.services.notification_templates import start_template_listener, stop_template_listener, template_cache
+
+    cur = db_conn.cursor()
+    cur.execute("DELETE FROM notification_templates WHERE type='TICKET_ZERO'")
+    cur.execute("INSERT INTO notification_templates (type, title, body) VALUES ('TICKET_ZERO', 'v1', 'b')")
+    db_conn.commit()
+    template_cache.invalidate()
+    listener = start_template_listener()
+    try:
+        assert listener.ready.wait(5)
+        before = template_cache.stats()
+        for uid in (8601, 8602):
+            body = {"type": "TICKET_ZERO", "user_ids": [uid]}
+            assert client.post("/api/vault/notify", json=body, headers=_idem_headers()).status_code == 200
+        after = template_cache.stats()
+        assert (after["misses"] - before["misses"], after["hits"] - before["hits"]) == (1, 1)
+
+        cur.execute("UPDATE notification_templates SET title='v2' WHERE type='TICKET_ZERO'")
+        db_conn.commit()
+        deadline = time.monotonic() + 5
+        while template_cache.stats()["invalidations"] == after["invalidations"] and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        body = {"type": "TICKET_ZERO", "user_ids": [8603]}
+        assert client.post("/api/vault/notify", json=body, headers=_idem_headers()).status_code == 200
+        cur.execute("SELECT user_id, payload->>'title' FROM notifications_queue WHERE type='TICKET_ZERO' ORDER BY user_id")
+        assert cur.fetchall() == [(8601, "v1"), (8602, "v1"), (8603, "v2")]
+    finally:
+        stop_template_listener()
+        cur.execute("DELETE FROM notification_templates WHERE type='TICKET_ZERO'")
+        db_conn.commit()
+        template_cache.invalidate()
+
+
+def test_template_cache_drops_fill_raced_by_invalidation():
+    from app.services.notification_templates import TemplateCache
+
+    cache = TemplateCache(ttl_seconds=60)
+    titles = iter(["v1", "v2"])
+
+    class _Cursor:
+        def execute(self, sql, params):
+            self.row = (next(titles), "b", None, None, None)
+            if self.row[0] == "v1":
+                cache.invalidate("TICKET_ZERO")  # NOTIFY arrives after the read, before the fill
+
+        def fetchone(self):
+            return self.row
+
+    cur = _Cursor()
+    assert cache.get(cur, "TICKET_ZERO")["title"] == "v1"
+    assert cache.get(cur, "TICKET_ZERO")["title"] == "v2"
+    assert cache.get(cur, "TICKET_ZERO")["title"] == "v2"
+    assert (cache.stats()["misses"], cache.stats()["hits"]) == (2, 1)
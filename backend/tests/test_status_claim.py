@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from uuid import uuid4
 
@@ -7,7 +8,7 @@ def _idem_headers():
 
 
 def test_status_returns_contract_fields(client):
-    resp = client.get("/api/vault/status")
+    resp = client.get("/api/vault/status", params={"user_id": 1})
     assert resp.status_code == 200
     data = resp.json()
 
@@ -144,3 +145,203 @@ def test_claim_enforces_state_and_idempotency(client):
     )
     assert duplicate_claim.status_code == 409
     assert duplicate_claim.json().get("detail") == "ALREADY_CLAIMED"
+
+
+def test_status_etag_and_conditional_get(client, db_conn):
+    cur = db_conn.cursor()
+    cur.execute("INSERT INTO user_identity (user_id, external_user_id) VALUES (4402, 'ext-status-etag')")
+    cur.execute(
+        "INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status) "
+        "VALUES (4402, NOW() + INTERVAL '1 day', 'LOCKED', 'LOCKED', 'LOCKED')"
+    )
+    cur.execute("INSERT INTO user_admin_snapshot (user_id, nickname) VALUES (4402, 'etag')")
+    db_conn.commit()
+
+    first = client.get("/api/vault/status", params={"user_id": 4402})
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"') and "no-store" not in first.headers["cache-control"]
+
+    cached = client.get("/api/vault/status", params={"user_id": 4402}, headers={"If-None-Match": etag})
+    assert (cached.status_code, cached.content, cached.headers["etag"]) == (304, b"", etag)
+
+    # Out-of-band change: the version lookup sees it.
+    cur.execute("UPDATE vault_status SET gold_status='UNLOCKED' WHERE user_id=4402")
+    db_conn.commit()
+    changed = client.get("/api/vault/status", params={"user_id": 4402}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["gold_status"] == "UNLOCKED"
+    assert changed.headers["etag"] != etag
+
+    # A no-op UPDATE does not change the version.
+    cur.execute("UPDATE vault_status SET gold_status='UNLOCKED' WHERE user_id=4402")
+    db_conn.commit()
+    same = client.get("/api/vault/status", params={"user_id": 4402}, headers={"If-None-Match": changed.headers["etag"]})
+    assert same.status_code == 304
+
+
+def test_status_stream_pushes_changes_and_resumes_from_last_version(client, db_conn, monkeypatch):
+    import threading
+    import time
+
+    from app import config
+    from app.services.status_stream import start_status_listener, stop_status_listener
+
+    cur = db_conn.cursor()
+    cur.execute("INSERT INTO user_identity (user_id, external_user_id) VALUES (4403, 'ext-status-stream')")
+    cur.execute(
+        "INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status) "
+        "VALUES (4403, NOW() + INTERVAL '1 day', 'LOCKED', 'LOCKED', 'LOCKED')"
+    )
+    db_conn.commit()
+    monkeypatch.setattr(config, "STATUS_STREAM_MAX_SECONDS", 2)
+    monkeypatch.setattr(config, "STATUS_STREAM_HEARTBEAT_SECONDS", 1)
+
+    def _events(body):
+        events = []
+        for block in body.strip().split("\n\n"):
+            fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+            if fields.get("event") == "status":
+                events.append((fields["id"], json.loads(fields["data"])))
+        return events
+
+    assert start_status_listener().ready.wait(5)
+    try:
+        result = {}
+        reader = threading.Thread(
+            target=lambda: result.update(resp=client.get("/api/vault/status/stream", params={"user_id": 4403}))
+        )
+        reader.start()
+        time.sleep(0.7)
+        cur.execute("UPDATE vault_status SET gold_status='UNLOCKED' WHERE user_id=4403")
+        db_conn.commit()
+        reader.join(10)
+
+        resp = result["resp"]
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        assert resp.text.startswith("retry: ")
+        events = _events(resp.text)
+        assert [e[1]["gold_status"] for e in events] == ["LOCKED", "UNLOCKED"]
+        assert ": heartbeat" in resp.text
+
+        # Reconnect with the last seen version: no duplicate snapshot.
+        resumed = client.get("/api/vault/status/stream", params={"user_id": 4403}, headers={"Last-Event-ID": events[-1][0]})
+        assert _events(resumed.text) == []
+    finally:
+        stop_status_listener()
+
+
+def test_status_stream_spreads_broadcast_reloads_and_ends_on_pool_timeout(client, db_conn, monkeypatch):
+    import threading
+    import time
+
+    from app import config, db
+    from app.routers import vault as vault_router
+    from app.services.status_stream import status_hub
+
+    cur = db_conn.cursor()
+    cur.execute("INSERT INTO user_identity (user_id, external_user_id) VALUES (4404, 'ext-status-stream-pool')")
+    cur.execute(
+        "INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status) "
+        "VALUES (4404, NOW() + INTERVAL '1 day', 'LOCKED', 'LOCKED', 'LOCKED')"
+    )
+    db_conn.commit()
+    monkeypatch.setattr(config, "STATUS_STREAM_MAX_SECONDS", 5)
+    monkeypatch.setattr(config, "STATUS_STREAM_BROADCAST_JITTER_MS", 300)
+
+    loads = []
+    real_load = vault_router._load_status_row
+
+    def _load(conn, uid, if_none_match):
+        loads.append(time.monotonic())
+        if len(loads) > 2:
+            raise db.PoolTimeout("no connection available")
+        return real_load(conn, uid, if_none_match)
+
+    monkeypatch.setattr(vault_router, "_load_status_row", _load)
+    result = {}
+    reader = threading.Thread(
+        target=lambda: result.update(resp=client.get("/api/vault/status/stream", params={"user_id": 4404}))
+    )
+    started = time.monotonic()
+    reader.start()
+    time.sleep(0.5)
+    # A burst of broadcasts is coalesced into one reload after the jitter.
+    for _ in range(3):
+        status_hub.publish()
+    time.sleep(0.8)
+    assert len(loads) == 2
+    # The next reload cannot get a pool connection: the stream ends with a retry hint.
+    status_hub.publish([4404])
+    reader.join(10)
+
+    text = result["resp"].text
+    assert len(loads) == 3 and time.monotonic() - started < 5
+    assert text.count("event: status") == 1
+    retry_ms = int(text.strip().splitlines()[-1].removeprefix("retry: "))
+    assert config.STATUS_STREAM_RETRY_MS <= retry_ms <= 2 * config.STATUS_STREAM_RETRY_MS
+
+
+def test_status_batch_matches_single_status(client, db_conn):
+    cur = db_conn.cursor()
+    cur.execute(
+        "INSERT INTO user_identity (user_id, external_user_id) SELECT g, 'ext-batch-' || g FROM generate_series(4501, 4503) AS g"
+    )
+    cur.execute(
+        """
+        INSERT INTO vault_status (user_id, expires_at, gold_status, platinum_status, diamond_status)
+        VALUES (4501, NOW() + INTERVAL '30 minutes', 'CLAIMED', 'UNLOCKED', 'LOCKED'),
+               (4502, NOW() + INTERVAL '2 days', 'LOCKED', 'LOCKED', 'LOCKED')
+        """
+    )
+    db_conn.commit()
+
+    resp = client.post(
+        "/api/vault/status/batch",
+        json={"user_ids": [4501, 4501, 4599], "external_user_ids": ["ext-batch-4502", "ext-batch-4503", "ext-batch-missing"]},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [i["user_id"] for i in data["items"]] == [4501, 4502, 4503]
+    assert data["items"][1]["external_user_id"] == "ext-batch-4502"
+    assert data["not_found"] == ["ext-batch-missing"]
+    # No identity and no vault row: reported, not answered with a default LOCKED payload.
+    assert data["not_found_user_ids"] == [4599]
+
+    first = data["items"][0]
+    single = client.get("/api/vault/status", params={"user_id": 4501}).json()
+    for key in ("gold_status", "platinum_status", "expires_at", "loss_total", "loss_breakdown"):
+        assert first[key] == single[key]
+    assert first["loss_breakdown"]["GOLD"] == 0
+    assert first["ms_countdown"]["enabled"] is True
+
+    too_many = client.post("/api/vault/status/batch", json={"user_ids": list(range(1, 5002))})
+    assert (too_many.status_code, too_many.json()["detail"]) == (400, "TOO_MANY_USERS")
+    assert client.post("/api/vault/status/batch", json={}).status_code == 400
+
+
+def test_status_claim_attendance_resolve_identities_read_only(client, db_conn):
+    cur = db_conn.cursor()
+    assert client.get("/api/vault/status").json()["detail"] == "USER_REQUIRED"
+    for method, path in (("get", "/api/vault/status"), ("post", "/api/vault/attendance")):
+        resp = getattr(client, method)(path, params={"external_user_id": "ext-never-imported"})
+        assert (resp.status_code, resp.json()["detail"]) == (404, "EXTERNAL_USER_NOT_FOUND")
+    claim = client.post("/api/vault/claim", params={"external_user_id": "ext-never-imported"}, json={"vault_type": "GOLD"})
+    assert claim.status_code == 404
+    cur.execute("SELECT COUNT(*) FROM user_identity")
+    assert cur.fetchone()[0] == 0
+    db_conn.commit()
+
+    # Lookups fill the in-memory map used by the read path (imports drop the negative entry).
+    from app.services.user_identity_service import identity_cache
+
+    resp = client.post(
+        "/api/vault/user-daily-import",
+        json={"rows": [{"external_user_id": "ext-readonly", "deposit_total": 0}]},
+        headers=_idem_headers(),
+    )
+    assert resp.status_code == 200
+    cur.execute("SELECT user_id FROM user_identity WHERE external_user_id='ext-readonly'")
+    user_id = cur.fetchone()[0]
+    db_conn.commit()
+    assert client.get("/api/vault/status", params={"external_user_id": "ext-readonly"}).status_code == 200
+    assert identity_cache.get("ext-readonly") == user_id
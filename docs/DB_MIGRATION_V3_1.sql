@@ -0,0 +1,250 @@
+-- =============================================================================
+-- Vault System v3.1 DB Migration
+-- =============================================================================
+-- Version: 3.1.0
+-- Date: 2026-10-17
+-- Description: 워커(백그라운드 임포트/발송/보상), 목록 keyset 인덱스, 캐시 무효화 NOTIFY 트리거
+--              backend/app/main.py `_ensure_schema()`와 동일한 객체를 만든다.
+--              (_ensure_schema는 best-effort이고 APP_ENV=test에서는 실행되지 않으므로 테스트/운영 DB에는 이 파일을 적용)
+-- =============================================================================
+
+BEGIN;
+
+-- =============================================================================
+-- 1. 어드민 목록 keyset 페이지네이션 정렬 키
+-- =============================================================================
+CREATE INDEX IF NOT EXISTS idx_admin_audit_log_created_at_id ON admin_audit_log (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_admin_jobs_created_at_job_id ON admin_jobs (created_at, job_id);
+CREATE INDEX IF NOT EXISTS idx_admin_jobs_type_created_at ON admin_jobs (type, created_at, job_id);
+CREATE INDEX IF NOT EXISTS idx_admin_job_items_job_id_id ON admin_job_items (job_id, id);
+CREATE INDEX IF NOT EXISTS idx_notifications_queue_status_id ON notifications_queue (status, id);
+CREATE INDEX IF NOT EXISTS idx_notifications_queue_user_id_id ON notifications_queue (user_id, id);
+
+-- =============================================================================
+-- 2. 백그라운드 임포트 청크 (background=true 임포트, 재개 가능한 import session)
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS admin_import_chunks (
+    job_id TEXT NOT NULL REFERENCES admin_jobs(job_id) ON DELETE CASCADE,
+    chunk_index INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'PENDING',
+    row_count INTEGER NOT NULL DEFAULT 0,
+    processed INTEGER NOT NULL DEFAULT 0,
+    rows JSONB,
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (job_id, chunk_index)
+);
+
+-- 2.1 재개 가능한 세션: 적용된 청크의 본문 체크섬과 결과
+ALTER TABLE admin_import_chunks ADD COLUMN IF NOT EXISTS checksum TEXT;
+ALTER TABLE admin_import_chunks ADD COLUMN IF NOT EXISTS stats JSONB;
+
+-- 2.2 워커 claim 경로: 대기 중인 청크만
+CREATE INDEX IF NOT EXISTS idx_admin_import_chunks_pending
+    ON admin_import_chunks (created_at, chunk_index)
+ WHERE status='PENDING';
+
+-- =============================================================================
+-- 3. 알림 발송 워커 (재시도/백오프 + DLQ)
+-- =============================================================================
+ALTER TABLE notifications_queue ADD COLUMN IF NOT EXISTS retry_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE notifications_queue ADD COLUMN IF NOT EXISTS last_error TEXT;
+ALTER TABLE notifications_queue ADD COLUMN IF NOT EXISTS sent_at TIMESTAMPTZ;
+
+-- 3.1 발송 워커 claim 경로: 대기 중인 행만 due 순서로
+CREATE INDEX IF NOT EXISTS idx_notifications_queue_due
+    ON notifications_queue ((COALESCE(scheduled_at, created_at)), id)
+ WHERE status IN ('PENDING','RETRYING');
+
+-- 3.2 NOTIFY_MAX_RETRIES 초과 건
+CREATE TABLE IF NOT EXISTS notifications_dlq (
+    id BIGSERIAL PRIMARY KEY,
+    notification_id BIGINT NOT NULL,
+    user_id INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    payload JSONB,
+    error TEXT,
+    retry_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_notifications_dlq_notification_id ON notifications_dlq (notification_id);
+
+-- =============================================================================
+-- 4. 보상 워커
+-- =============================================================================
+ALTER TABLE compensation_queue ADD COLUMN IF NOT EXISTS last_error TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_compensation_queue_due
+    ON compensation_queue (next_retry_at, id)
+ WHERE status IN ('PENDING','RETRYING');
+
+-- =============================================================================
+-- 5. 캐시 무효화 NOTIFY 트리거
+-- =============================================================================
+-- 워커 wakeup('vault_worker_wakeup')은 앱이 enqueue 트랜잭션에서 pg_notify로 보내므로 DDL이 없다.
+
+-- 5.1 템플릿 변경 → 각 프로세스의 템플릿 캐시 무효화 (app/services/notification_templates.py)
+CREATE OR REPLACE FUNCTION notify_notification_templates_changed() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        PERFORM pg_notify('notification_templates_changed', OLD.type);
+    END IF;
+    IF TG_OP <> 'DELETE' AND (TG_OP = 'INSERT' OR NEW.type IS DISTINCT FROM OLD.type) THEN
+        PERFORM pg_notify('notification_templates_changed', NEW.type);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notification_templates_changed ON notification_templates;
+CREATE TRIGGER trg_notification_templates_changed
+AFTER INSERT OR UPDATE OR DELETE ON notification_templates
+FOR EACH ROW EXECUTE FUNCTION notify_notification_templates_changed();
+
+-- 5.2 vault_status / user_admin_snapshot 변경 → /status/stream 구독자 깨우기 (app/services/status_stream.py)
+-- 문장 단위 트리거: 변경된 user_id 목록을 한 번에 보내고, 대량 변경은 '*'(전체 무효화).
+CREATE OR REPLACE FUNCTION notify_vault_status_changed() RETURNS trigger AS $$
+DECLARE
+    n integer;
+    ids text;
+BEGIN
+    SELECT COUNT(*), string_agg(DISTINCT user_id::text, ',')
+      INTO n, ids
+      FROM (SELECT user_id FROM changed_rows LIMIT 201) c;
+    IF n > 200 THEN
+        PERFORM pg_notify('vault_status_changed', '*');
+    ELSIF n > 0 THEN
+        PERFORM pg_notify('vault_status_changed', ids);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_vault_status_status_changed_insert ON vault_status;
+CREATE TRIGGER trg_vault_status_status_changed_insert
+AFTER INSERT ON vault_status
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_vault_status_changed();
+
+DROP TRIGGER IF EXISTS trg_vault_status_status_changed_update ON vault_status;
+CREATE TRIGGER trg_vault_status_status_changed_update
+AFTER UPDATE ON vault_status
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_vault_status_changed();
+
+DROP TRIGGER IF EXISTS trg_vault_status_status_changed_delete ON vault_status;
+CREATE TRIGGER trg_vault_status_status_changed_delete
+AFTER DELETE ON vault_status
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_vault_status_changed();
+
+DROP TRIGGER IF EXISTS trg_user_admin_snapshot_status_changed_insert ON user_admin_snapshot;
+CREATE TRIGGER trg_user_admin_snapshot_status_changed_insert
+AFTER INSERT ON user_admin_snapshot
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_vault_status_changed();
+
+DROP TRIGGER IF EXISTS trg_user_admin_snapshot_status_changed_update ON user_admin_snapshot;
+CREATE TRIGGER trg_user_admin_snapshot_status_changed_update
+AFTER UPDATE ON user_admin_snapshot
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_vault_status_changed();
+
+DROP TRIGGER IF EXISTS trg_user_admin_snapshot_status_changed_delete ON user_admin_snapshot;
+CREATE TRIGGER trg_user_admin_snapshot_status_changed_delete
+AFTER DELETE ON user_admin_snapshot
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_vault_status_changed();
+
+-- 5.3 user_identity 변경 → 각 프로세스의 identity 캐시 갱신 (app/services/user_identity_service.py)
+-- INSERT → '' (음성 캐시 폐기), DELETE/UPDATE → 이전 external_user_id JSON 배열, 대량/긴 payload는 '*'.
+CREATE OR REPLACE FUNCTION notify_user_identity_changed() RETURNS trigger AS $$
+DECLARE
+    n integer;
+    ids text;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        IF EXISTS (SELECT 1 FROM changed_rows) THEN
+            PERFORM pg_notify('user_identity_changed', '');
+        END IF;
+        RETURN NULL;
+    END IF;
+    SELECT COUNT(*), json_agg(external_user_id)::text
+      INTO n, ids
+      FROM (SELECT external_user_id FROM changed_rows LIMIT 101) c;
+    IF n > 100 OR length(ids) > 7000 THEN
+        PERFORM pg_notify('user_identity_changed', '*');
+    ELSIF n > 0 THEN
+        PERFORM pg_notify('user_identity_changed', ids);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_user_identity_changed_insert ON user_identity;
+CREATE TRIGGER trg_user_identity_changed_insert
+AFTER INSERT ON user_identity
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_user_identity_changed();
+
+DROP TRIGGER IF EXISTS trg_user_identity_changed_update ON user_identity;
+CREATE TRIGGER trg_user_identity_changed_update
+AFTER UPDATE ON user_identity
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_user_identity_changed();
+
+DROP TRIGGER IF EXISTS trg_user_identity_changed_delete ON user_identity;
+CREATE TRIGGER trg_user_identity_changed_delete
+AFTER DELETE ON user_identity
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_user_identity_changed();
+
+-- =============================================================================
+-- 6. updated_at 자동 갱신 (/status ETag은 updated_at 쌍으로 만든다)
+-- =============================================================================
+ALTER TABLE vault_status ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+ALTER TABLE user_admin_snapshot ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger AS $$
+BEGIN
+    IF NEW IS DISTINCT FROM OLD THEN
+        NEW.updated_at := clock_timestamp();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_vault_status_touch_updated_at ON vault_status;
+CREATE TRIGGER trg_vault_status_touch_updated_at
+BEFORE UPDATE ON vault_status
+FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+DROP TRIGGER IF EXISTS trg_user_admin_snapshot_touch_updated_at ON user_admin_snapshot;
+CREATE TRIGGER trg_user_admin_snapshot_touch_updated_at
+BEFORE UPDATE ON user_admin_snapshot
+FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+-- =============================================================================
+-- 7. 마이그레이션 기록
+-- =============================================================================
+INSERT INTO admin_audit_log (
+    admin_user,
+    action,
+    endpoint,
+    target_count,
+    response_status,
+    response_summary,
+    metadata
+) VALUES (
+    'SYSTEM_MIGRATION',
+    'DB_MIGRATION_V3_1',
+    'DB_SCHEMA',
+    0,
+    'SUCCESS',
+    '{"version": "3.1.0", "changes": ["admin_import_chunks", "notifications_dlq", "notifications_queue retry columns", "worker claim indexes", "keyset list indexes", "notify_notification_templates_changed", "notify_vault_status_changed", "notify_user_identity_changed", "touch_updated_at"]}',
+    '{"migration_date": "2026-10-17", "description": "Vault v3.1 workers, list indexes and cache invalidation triggers"}'
+);
+
+COMMIT;